@@ -0,0 +1,268 @@
+"""
+Budget governor for parameter sweeps.
+
+Accumulates tokens, estimated cost and wall time of each combination as it
+finishes (from the stage metrics ingested into its results entry) and, before
+each new combination starts, projects the cost and wall time of the rest of
+the sweep from the observed averages. When the projection would breach
+--max-cost / --max-wall-time, the next combinations drop to cheaper reasoning
+levels; once even the cheapest level would breach a ceiling, no new
+combinations are scheduled. The sweep then ends normally and the report covers
+the completed combinations.
+
+Costs use MODEL_PRICES (USD per million tokens, longest model-name prefix
+wins); reasoning tokens are billed as output tokens and are already part of
+output_tokens in the usage the pipelines report. A pipeline run that reports
+no tokens (no stage metrics sidecar) is charged the offline per-case estimate
+of token_budget.py instead, so --max-cost still applies; without an estimate
+the governor warns once that the cost ceiling cannot be enforced.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# USD per 1M (input, output) tokens
+MODEL_PRICES = {
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5": (1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+# Cheapest last; a downgrade moves one step towards the end
+REASONING_ORDER = ("high", "medium", "low", "minimal")
+# Relative cost of reasoning levels, used until a level has been observed
+REASONING_COST_FACTORS = {"high": 2.0, "medium": 1.0, "low": 0.5, "minimal": 0.25}
+
+
+def model_price(model: str, prices: Optional[Dict[str, Tuple[float, float]]] = None) -> Tuple[float, float]:
+    """(input, output) USD per 1M tokens; unknown models get the most expensive known price."""
+    prices = prices or MODEL_PRICES
+    matches = [name for name in prices if model.startswith(name)]
+    if matches:
+        return prices[max(matches, key=len)]
+    return max(prices.values(), key=lambda price: price[0] + price[1])
+
+
+def estimates_from_budget(report: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """
+    Per-case tokens of one pipeline run from a token_budget.budget_matrix() report.
+
+    Returns:
+        {case: {"input_tokens", "output_tokens"}} summed over the stages (first persona row of each case)
+    """
+    estimates: Dict[str, Dict[str, int]] = {}
+    for row in report.get("rows", []):
+        if row["case"] not in estimates:
+            estimates[row["case"]] = {
+                "input_tokens": sum(cell["input_tokens"] for cell in row["stages"].values()),
+                "output_tokens": sum(cell["output_tokens"] for cell in row["stages"].values()),
+            }
+    return estimates
+
+
+def combination_usage(combination_results: Any, model: str,
+                      prices: Optional[Dict[str, Tuple[float, float]]] = None,
+                      estimate: Optional[Dict[str, int]] = None) -> Dict[str, float]:
+    """
+    Tokens and cost spent by a combination in this execution (restored cache entries cost nothing).
+
+    Args:
+        estimate: Tokens charged for a pipeline run that reports none ({"input_tokens", "output_tokens"})
+
+    Returns:
+        {"input_tokens", "output_tokens", "cost", "estimated": runs charged the estimate,
+         "unmeasured": runs that reported no tokens and had no estimate}
+    """
+    usage = {"input_tokens": 0, "output_tokens": 0, "cost": 0.0, "estimated": 0, "unmeasured": 0}
+    if not isinstance(combination_results, dict):
+        return usage
+    input_price, output_price = model_price(model, prices)
+    for entry in combination_results.values():
+        if not isinstance(entry, dict) or "exit_code" not in entry or entry.get("cached"):
+            continue
+        metrics = entry.get("metrics") or {}
+        tokens = {field: metrics.get(field, 0) or 0 for field in ("input_tokens", "output_tokens")}
+        if not any(tokens.values()):
+            if estimate is None:
+                usage["unmeasured"] += 1
+                continue
+            tokens = estimate
+            usage["estimated"] += 1
+        usage["input_tokens"] += tokens["input_tokens"]
+        usage["output_tokens"] += tokens["output_tokens"]
+    usage["cost"] = (usage["input_tokens"] * input_price + usage["output_tokens"] * output_price) / 1_000_000
+    return usage
+
+
+def _effort(job: Dict[str, Any]) -> str:
+    return job["combination"]["reasoning"]["effort"]
+
+
+class BudgetGovernor:
+    """
+    Admission control for sweep jobs under cost and wall-time ceilings.
+
+    Args:
+        jobs: Planned sweep jobs (from main._build_sweep_jobs)
+        max_cost: Ceiling in USD, or None
+        max_wall_time: Ceiling in seconds for the whole sweep, or None
+        workers: Number of combinations running concurrently
+        prices: Price table overriding MODEL_PRICES
+        estimates: Per-case tokens charged for runs that report none (see estimates_from_budget)
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], max_cost: Optional[float] = None,
+                 max_wall_time: Optional[float] = None, workers: int = 1,
+                 prices: Optional[Dict[str, Tuple[float, float]]] = None,
+                 estimates: Optional[Dict[str, Dict[str, int]]] = None):
+        self.max_cost = max_cost
+        self.max_wall_time = max_wall_time
+        self.workers = max(1, workers)
+        self.prices = prices
+        self.estimates = estimates or {}
+        self._warned_unmeasured = False
+        self.start_time = time.perf_counter()
+        self.pending = {job["key"]: job for job in jobs}
+        self.planned_keys = set(self.pending)
+        self.spent = {"input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+        self.observed: Dict[Tuple[str, str], List[Tuple[float, float]]] = {}
+        self.admitted: Dict[str, str] = {}
+        # Estimated cost of admitted combinations that have not finished yet
+        self.in_flight: Dict[str, float] = {}
+        self.downgraded: List[Dict[str, str]] = []
+        self.skipped: List[str] = []
+        self.stopped_reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_cost is not None or self.max_wall_time is not None
+
+    def _estimate(self, job: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+        """(cost, wall_time) of a job from observed combinations of its model, scaled by reasoning level."""
+        model = job["combination"]["model"]
+        effort = _effort(job)
+        same = self.observed.get((model, effort))
+        if same:
+            return (sum(c for c, _ in same) / len(same), sum(w for _, w in same) / len(same))
+        # Scale the observations of other reasoning levels (any model as a last resort)
+        samples = [(e, s) for (m, e), runs in self.observed.items() if m == model for s in runs]
+        if not samples:
+            samples = [(e, s) for (_, e), runs in self.observed.items() for s in runs]
+        if not samples:
+            return None
+        factor = REASONING_COST_FACTORS.get(effort, 1.0)
+        scaled = [(s[0] / REASONING_COST_FACTORS.get(e, 1.0) * factor, s[1] / REASONING_COST_FACTORS.get(e, 1.0) * factor)
+                  for e, s in samples]
+        return (sum(c for c, _ in scaled) / len(scaled), sum(w for _, w in scaled) / len(scaled))
+
+    def _fits(self, estimate: Tuple[float, float], elapsed: float, later: List[Tuple[float, float]]) -> bool:
+        """True when spending estimate now plus the later estimates stays within both ceilings."""
+        cost = self.spent["cost"] + sum(self.in_flight.values()) + estimate[0] + sum(c for c, _ in later)
+        wall = elapsed + (estimate[1] + sum(w for _, w in later)) / self.workers
+        return ((self.max_cost is None or cost <= self.max_cost)
+                and (self.max_wall_time is None or wall <= self.max_wall_time))
+
+    def _cheaper(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """The job at each cheaper reasoning level whose combination is not already planned or admitted."""
+        effort = _effort(job)
+        if effort not in REASONING_ORDER:
+            return []
+        candidates = []
+        for level in REASONING_ORDER[REASONING_ORDER.index(effort) + 1:]:
+            key = f"_{level}_".join(job["key"].rsplit(f"_{effort}_", 1))
+            if key in self.planned_keys or key in self.admitted.values():
+                continue
+            combination = dict(job["combination"], reasoning=dict(job["combination"]["reasoning"], effort=level))
+            candidates.append(dict(job, key=key, combination=combination))
+        return candidates
+
+    def admit(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Decide how job runs: as planned, downgraded to a cheaper reasoning level, or not at all (None).
+        """
+        with self._lock:
+            self.pending.pop(job["key"], None)
+            if not self.enabled:
+                self.admitted[job["key"]] = job["key"]
+                return job
+            elapsed = time.perf_counter() - self.start_time
+            if self.stopped_reason is None and self.max_wall_time is not None and elapsed >= self.max_wall_time:
+                self.stopped_reason = f"wall time {elapsed:.0f}s reached the {self.max_wall_time:.0f}s ceiling"
+            if self.stopped_reason:
+                self.skipped.append(job["key"])
+                return None
+
+            estimate = self._estimate(job)
+            if estimate is None:
+                self.admitted[job["key"]] = job["key"]
+                return job  # Nothing observed yet: no basis for a projection
+            later = [e for e in (self._estimate(j) for j in self.pending.values()) if e is not None]
+            if self._fits(estimate, elapsed, later):
+                self.admitted[job["key"]] = job["key"]
+                self.in_flight[job["key"]] = estimate[0]
+                return job
+
+            # The projected sweep breaches a ceiling: the first cheaper level that keeps
+            # the projection within budget, else the cheapest one that fits on its own
+            options = [(candidate, self._estimate(candidate)) for candidate in self._cheaper(job)]
+            chosen = next((c for c, e in options if e is not None and self._fits(e, elapsed, later)), None)
+            if chosen is None:
+                chosen = next((c for c, e in reversed(options) if e is not None and self._fits(e, elapsed, [])), None)
+            if chosen is None and self._fits(estimate, elapsed, []):
+                chosen = job
+            if chosen is None:
+                self.stopped_reason = (f"next combination would exceed the budget (spent ${self.spent['cost']:.2f}, "
+                                       f"elapsed {elapsed:.0f}s)")
+                self.skipped.append(job["key"])
+                print(f"[BUDGET] Stopping: {self.stopped_reason}")
+                return None
+            if chosen is not job:
+                self.downgraded.append({"from": job["key"], "to": chosen["key"]})
+                print(f"[BUDGET] Downgrading {job['key']} to reasoning {_effort(chosen)} to stay within budget")
+            self.admitted[job["key"]] = chosen["key"]
+            self.in_flight[chosen["key"]] = (self._estimate(chosen) or estimate)[0]
+            return chosen
+
+    def record(self, job: Dict[str, Any], combination_results: Any, wall_time: float) -> None:
+        """Account for a finished (admitted) job."""
+        usage = combination_usage(combination_results, job["combination"]["model"], self.prices,
+                                  self.estimates.get(job["case"]))
+        with self._lock:
+            self.in_flight.pop(job["key"], None)
+            for field in self.spent:
+                self.spent[field] += usage[field]
+            if self.max_cost is not None and (usage["estimated"] or usage["unmeasured"]) and not self._warned_unmeasured:
+                self._warned_unmeasured = True
+                if usage["unmeasured"]:
+                    print(f"[BUDGET] Warning: {job['key']} reported no token usage (no stage metrics) and there is "
+                          f"no estimate for case {job['case']}; --max-cost cannot account for such runs")
+                else:
+                    print(f"[BUDGET] Warning: {job['key']} reported no token usage (no stage metrics); charging the "
+                          f"offline token estimate of case {job['case']} for such runs")
+            if usage["input_tokens"] or usage["output_tokens"]:
+                # Cache restores say nothing about the cost of running a combination
+                self.observed.setdefault((job["combination"]["model"], _effort(job)), []).append(
+                    (usage["cost"], wall_time))
+            if self.enabled:
+                print(f"[BUDGET] {job['key']}: ${usage['cost']:.4f}, {wall_time:.1f}s | spent "
+                      f"${self.spent['cost']:.4f} of {'$%.2f' % self.max_cost if self.max_cost is not None else 'no limit'}, "
+                      f"elapsed {time.perf_counter() - self.start_time:.0f}s")
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_cost": self.max_cost,
+                "max_wall_time": self.max_wall_time,
+                "spent_cost": self.spent["cost"],
+                "input_tokens": self.spent["input_tokens"],
+                "output_tokens": self.spent["output_tokens"],
+                "wall_time": time.perf_counter() - self.start_time,
+                "downgraded": list(self.downgraded),
+                "skipped": list(self.skipped),
+                "stopped_reason": self.stopped_reason,
+            }
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Deterministic checker for the LUCIM Operation Model rules.
+
+Evaluates the mechanical rules of RULES_LUCIM_Operation_model.md in a single
+pass over the operation model JSON: JSON-only output (LOM0), Act* actor type
+names (LOM1), camelCase ie*/oe* event names (LOM2/LOM3), event directions
+(LOM4/LOM5), condition arrays (LOM6/LOM7) and the per-actor event counts
+(LOM8/LOM9). The report has the same shape as the LLM auditor output, so
+cheap failures can go straight to the corrector and the audit iterations are
+spent on semantic issues only (see audit_shortcut).
+
+Usage:
+    python check_lucim_operation_model.py operation_model.json
+"""
+import argparse
+import json
+import re
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RULE_IDS = {
+    0: "LOM0-JSON-BLOCK-ONLY",
+    1: "LOM1-ACT-TYPE-FORMAT",
+    2: "LOM2-IE-EVENT-NAME-FORMAT",
+    3: "LOM3-OE-EVENT-NAME-FORMAT",
+    4: "LOM4-IE-EVENT-DIRECTION",
+    5: "LOM5-OE-EVENT-DIRECTION",
+    6: "LOM6-CONDITIONS-DEFINITION",
+    7: "LOM7-CONDITIONS-VALIDATION",
+    8: "LOM8-INPUT-EVENTS-LIMITATION",
+    9: "LOM9-OUTPUT-EVENTS-LIMITATION",
+}
+
+FIX_HINTS = {
+    0: ("delete", "Remove Markdown code fences and any text outside the JSON object"),
+    1: ("rename", "Rename the actor type as Act followed by a capitalized name, e.g. ActEcologist"),
+    2: ("rename", "Rename the input event as ie followed by a camelCase name, e.g. ieRainUpdate"),
+    3: ("rename", "Rename the output event as oe followed by a camelCase name, e.g. oeSetClock"),
+    4: ("reverse_direction", "Set source to System and target to the actor type"),
+    5: ("reverse_direction", "Set source to the actor type and target to System"),
+    6: ("other", "Write each condition as {\"id\": ..., \"text\": ...}"),
+    7: ("add", "Provide preF and preP arrays and a non-empty postF array"),
+    8: ("add", "Add at least one input event to the actor"),
+    9: ("add", "Add at least one output event to the actor"),
+}
+
+_ACTOR_TYPE_RE = re.compile(r'^Act[A-Z][A-Za-z0-9]*$')
+_EVENT_NAME_RE = {
+    "input": re.compile(r'^ie[A-Z][A-Za-z0-9]*$'),
+    "output": re.compile(r'^oe[A-Z][A-Za-z0-9]*$'),
+}
+_FENCED_RE = re.compile(r'```(?:json)?\s*(.*?)```', re.DOTALL)
+
+
+def load_operation_model(text: str) -> Tuple[Optional[Any], List[str]]:
+    """
+    Parse operation model output, tolerating fences so the other rules can still be checked.
+
+    Returns:
+        (data, lom0_problems) where data is None when no JSON object could be parsed
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), []
+    except ValueError:
+        pass
+    problems = []
+    match = _FENCED_RE.search(stripped)
+    candidate = match.group(1) if match else stripped[stripped.find("{"):stripped.rfind("}") + 1]
+    problems.append("Markdown code fences around the JSON" if match else "Text outside the JSON object")
+    try:
+        return json.loads(candidate), problems
+    except ValueError as e:
+        return None, problems + [f"Invalid JSON: {e}"]
+
+
+def iter_actors(model: Dict[str, Any]) -> Iterator[Tuple[str, Optional[Dict[str, Any]], List[Tuple[str, str, Any]]]]:
+    """
+    Yield (actor_type, actor, events) with events as (kind, name, event).
+
+    Supports the generator format (events nested under each actor) and the flat
+    format of the valid examples (top-level input_events/output_events whose
+    target/source names the actor). Flat events whose owner is not a declared
+    actor (e.g. a reversed event owned by "System") come last, grouped by owner
+    with actor None, so that no event is dropped.
+    """
+    actors = model.get("actors") or {}
+    flat: Dict[str, List[Tuple[str, str, Any]]] = {}
+    for kind, key in (("input", "input_events"), ("output", "output_events")):
+        for name, event in (model.get(key) or {}).items():
+            owner = (event or {}).get("target" if kind == "input" else "source") if isinstance(event, dict) else None
+            flat.setdefault(str(owner), []).append((kind, name, event))
+
+    for actor_key, actor in actors.items():
+        actor = actor if isinstance(actor, dict) else {}
+        actor_type = actor.get("type") or actor_key
+        events = []
+        for kind, key in (("input", "input_events"), ("output", "output_events")):
+            for name, event in (actor.get(key) or {}).items():
+                events.append((kind, name, event))
+        events.extend(flat.pop(actor_key, []))
+        if actor.get("name") and actor["name"] != actor_key:
+            events.extend(flat.pop(actor["name"], []))
+        yield actor_type, actor, events
+    for owner, events in flat.items():
+        yield owner, None, events
+
+
+def _events_are_flat(model: Dict[str, Any]) -> bool:
+    """True for the flat valid-example format, which carries no pre/post conditions."""
+    return "input_events" in model or "output_events" in model
+
+
+def check_operation_model(text: str) -> Dict[str, Any]:
+    """
+    Check operation model output against the LOM rules.
+
+    Args:
+        text: Operation model output as produced by the generator (JSON text)
+
+    Returns:
+        Auditor-shaped report {"data": {"verdict", "non-compliant-rules",
+        "fix_suggestions", "coverage"}, "errors": None}
+    """
+    violations: List[Dict[str, Any]] = []
+    not_applicable: List[str] = []
+
+    def violation(rule: int, where: str, msg: str) -> None:
+        violations.append({"rule": RULE_IDS[rule], "line": where, "msg": msg})
+
+    data, problems = load_operation_model(text)
+    for problem in problems:
+        violation(0, "", problem)
+    if isinstance(data, dict) and "data" in data:
+        errors = data.get("errors")
+        data = data["data"]
+        if data is None and errors:
+            violation(0, "", f"The generator returned no operation model: {errors}")
+    if not isinstance(data, dict) or not isinstance(data.get("actors"), dict):
+        if not violations:
+            violation(0, "", "No 'actors' object in the operation model")
+        evaluated = [RULE_IDS[0]]
+    else:
+        check_conditions = not _events_are_flat(data)
+        evaluated = [rule_id for n, rule_id in RULE_IDS.items() if check_conditions or n not in (6, 7)]
+        if not check_conditions:
+            # The flat format of the valid examples carries no pre/post conditions
+            not_applicable = [RULE_IDS[6], RULE_IDS[7]]
+        for actor_type, actor, events in iter_actors(data):
+            declared = actor is not None
+            path = f"actors.{actor_type}" if declared else ""
+            if declared and not _ACTOR_TYPE_RE.match(actor_type):
+                violation(1, path, f"Actor type '{actor_type}' is not Act followed by a capitalized name")
+            counts = {"input": 0, "output": 0}
+            for kind, name, event in events:
+                counts[kind] += 1
+                event_path = f"{path}.{kind}_events.{name}".lstrip(".")
+                if not _EVENT_NAME_RE[kind].match(name):
+                    prefix = "ie" if kind == "input" else "oe"
+                    violation(2 if kind == "input" else 3, event_path,
+                              f"{kind.capitalize()} event '{name}' is not {prefix} followed by a camelCase name")
+                if not isinstance(event, dict):
+                    violation(6, event_path, f"Event '{name}' is not an object")
+                    continue
+                source, target = event.get("source"), event.get("target")
+                if kind == "input" and source != "System":
+                    violation(4, event_path, f"Input event '{name}' has source '{source}' but must be 'System'")
+                if kind == "output" and target != "System":
+                    violation(5, event_path, f"Output event '{name}' has target '{target}' but must be 'System'")
+                if kind == "input" and target == "System":
+                    violation(4, event_path, f"Input event '{name}' has target 'System' but must be an actor")
+                if kind == "output" and source == "System":
+                    violation(5, event_path, f"Output event '{name}' has source 'System' but must be an actor")
+                if not declared and actor_type != "System":
+                    end = "target" if kind == "input" else "source"
+                    violation(4 if kind == "input" else 5, event_path,
+                              f"{kind.capitalize()} event '{name}' has {end} '{actor_type}', which is not a declared actor")
+                if check_conditions:
+                    _check_conditions(event, event_path, name, violation)
+            if not declared:
+                continue
+            if counts["input"] == 0:
+                violation(8, path, f"Actor '{actor_type}' has no input event")
+            if counts["output"] == 0:
+                violation(9, path, f"Actor '{actor_type}' has no output event")
+
+    fix_suggestions = []
+    for v in violations:
+        number = int(v["rule"].split("-", 1)[0][3:])
+        change_type, proposed = FIX_HINTS[number]
+        fix_suggestions.append({"rule": v["rule"], "line": v["line"], "change_type": change_type,
+                                "proposed_change": proposed})
+
+    return {
+        "data": {
+            "verdict": "non-compliant" if violations else "compliant",
+            "non-compliant-rules": violations,
+            "fix_suggestions": fix_suggestions,
+            "coverage": {
+                "evaluated": evaluated,
+                "not_applicable": not_applicable,
+                "missing_evaluation": [rule_id for rule_id in RULE_IDS.values()
+                                       if rule_id not in evaluated and rule_id not in not_applicable],
+                "total_rules_in_dsl": str(len(RULE_IDS)),
+            },
+        },
+        "errors": None,
+    }
+
+
+def _check_conditions(event: Dict[str, Any], path: str, name: str, violation) -> None:
+    for key in ("preF", "preP", "postF"):
+        conditions = event.get(key)
+        if not isinstance(conditions, list):
+            violation(7, f"{path}.{key}", f"Event '{name}' has no '{key}' array")
+            continue
+        if key == "postF" and not conditions:
+            violation(7, f"{path}.{key}", f"Event '{name}' has an empty postF array")
+        for i, condition in enumerate(conditions):
+            if not isinstance(condition, dict) or not str(condition.get("text") or "").strip():
+                violation(6, f"{path}.{key}[{i}]", f"Condition {i} of '{name}'.{key} has no text")
+
+
+def audit_shortcut(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the local report when a LOM rule is violated, otherwise None.
+
+    A clean local pass does not prove compliance (readability and condition
+    semantics need the LLM auditor), so only failures short-circuit the audit.
+    """
+    report = check_operation_model(text)
+    return report if report["data"]["non-compliant-rules"] else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check an operation model against the LUCIM LOM rules")
+    parser.add_argument("operation_model", help="Path to the operation model JSON output")
+    args = parser.parse_args(argv)
+
+    with open(args.operation_model, "r", encoding="utf-8") as f:
+        report = check_operation_model(f.read())
+    print(json.dumps(report, indent=2))
+    return 1 if report["data"]["non-compliant-rules"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
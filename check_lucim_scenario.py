@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Deterministic checker for the LUCIM Scenario rules, with incremental re-checks.
+
+Evaluates the rules of RULES_LUCIM_Scenario.md that need no judgement: JSON
+only (LSC0), actor count (LSC2), per-actor input/output events (LSC3/LSC4),
+message directions (LSC7-LSC10) and, given the operation model, actor type and
+event name consistency (LSC12, LSC14-LSC17). The temporal rules LSC5/LSC6 are
+left to the LLM auditor.
+
+ScenarioChecker keeps the results of each message between calls: after a
+corrector pass only the messages that changed are re-checked and the actor
+counts are updated from the message diff, so audit/correct loops on long
+scenarios cost milliseconds locally.
+
+Usage:
+    python check_lucim_scenario.py scenario.json [--operation-model operation_model.json]
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from check_lucim_operation_model import iter_actors, load_operation_model
+
+RULE_IDS = {
+    0: "LSC0-JSON-BLOCK-ONLY",
+    2: "LSC2-ACTORS-LIMITATION",
+    3: "LSC3-INPUT-EVENTS-LIMITATION",
+    4: "LSC4-OUTPUT-EVENTS-LIMITATION",
+    5: "LSC5-EVENT-SEQUENCE",
+    6: "LSC6-PARAMETERS-VALUE",
+    7: "LSC7-SYSTEM-NO-SELF-LOOP",
+    8: "LSC8-ACTOR-NO-SELF-LOOP",
+    9: "LSC9-INPUT-EVENT-ALLOWED-EVENTS",
+    10: "LSC10-OUTPUT-EVENT-DIRECTION",
+    12: "LSC12-ACTOR-TYPE-NAME-CONSISTENCY",
+    14: "LSC14-INPUT-EVENT-NAME-CONSISTENCY",
+    15: "LSC15-OUTPUT-EVENT-NAME-CONSISTENCY",
+    16: "LSC16-ACTORS-PERSISTENCE",
+    17: "LSC17-EVENTS-PERSISTENCE",
+}
+
+# Rules that need the LLM auditor (pre/post conditions of the operation model)
+SEMANTIC_RULES = (5, 6)
+# Rules that compare the scenario with the operation model
+OPERATION_MODEL_RULES = (12, 14, 15, 16, 17)
+
+MAX_ACTORS = 5
+
+FIX_HINTS = {
+    0: ("delete", "Remove Markdown code fences and any text outside the JSON object"),
+    2: ("delete", f"Keep at most {MAX_ACTORS} actors in the scenario"),
+    3: ("add", "Add an input event from System to the actor"),
+    4: ("add", "Add an output event from the actor to System"),
+    7: ("delete", "Remove the System to System message"),
+    8: ("delete", "Remove the actor to actor message or route it through System"),
+    9: ("reverse_direction", "Send input events from System to an actor"),
+    10: ("reverse_direction", "Send output events from an actor to System"),
+    12: ("rename", "Use the actor type name exactly as in the operation model"),
+    14: ("rename", "Use the input event name exactly as in the operation model"),
+    15: ("rename", "Use the output event name exactly as in the operation model"),
+    16: ("rename", "Use only actor types defined in the operation model"),
+    17: ("rename", "Use only events defined in the operation model"),
+}
+
+# (source, target, event_type, event_name, parameters)
+MessageKey = Tuple[str, str, str, str, str]
+
+
+def _event_kind(event_type: str) -> Optional[str]:
+    """'input' / 'output' from inputEvent, input_event, ... or None."""
+    normalized = event_type.replace("_", "").replace("-", "").lower()
+    if normalized in ("inputevent", "ie", "input"):
+        return "input"
+    if normalized in ("outputevent", "oe", "output"):
+        return "output"
+    return None
+
+
+def _message_key(message: Any) -> MessageKey:
+    if not isinstance(message, dict):
+        return ("", "", "", "", json.dumps(message))
+    parameters = message.get("parameters", "")
+    if not isinstance(parameters, str):
+        parameters = json.dumps(parameters)
+    return (str(message.get("source") or ""), str(message.get("target") or ""),
+            str(message.get("event_type") or ""), str(message.get("event_name") or ""), parameters)
+
+
+def _is_system(endpoint: str) -> bool:
+    return endpoint.strip().lower() == "system"
+
+
+def _actor(endpoint: str) -> Tuple[str, Optional[str]]:
+    """'bill:ActAdministrator' -> ('bill', 'ActAdministrator')"""
+    instance, sep, actor_type = endpoint.partition(":")
+    return instance.strip(), (actor_type.strip() if sep else None)
+
+
+def index_operation_model(operation_model: Any) -> Dict[str, Dict[str, str]]:
+    """
+    Index actor types and event names of an operation model (dict or JSON text).
+
+    Returns:
+        {"actors": {lower: name}, "input": {lower: name}, "output": {lower: name}};
+        lower-cased keys let near misses be reported as naming inconsistencies
+    """
+    if isinstance(operation_model, str):
+        operation_model, _ = load_operation_model(operation_model)
+    model = operation_model or {}
+    if isinstance(model, dict) and isinstance(model.get("data"), dict):
+        model = model["data"]
+    index: Dict[str, Dict[str, str]] = {"actors": {}, "input": {}, "output": {}}
+    if not isinstance(model, dict):
+        return index
+    for actor_type, actor, events in iter_actors(model):
+        if actor is not None:
+            index["actors"][actor_type.lower()] = actor_type
+        # Events of undeclared owners are still defined, only their direction is wrong
+        for kind, name, _ in events:
+            index[kind][name.lower()] = name
+    return index
+
+
+def _check_name(known: Dict[str, str], name: str) -> Optional[str]:
+    """None when name is defined; 'case' for a near miss; 'unknown' otherwise."""
+    if known.get(name.lower()) == name:
+        return None
+    return "case" if name.lower() in known else "unknown"
+
+
+class ScenarioChecker:
+    """
+    Scenario checker that re-checks only the messages changed since the previous call.
+
+    Per-message violations depend only on the message (and the operation
+    model), so they are cached by message content. Actor event counts are
+    updated from the multiset difference between the previous and current
+    messages.
+    """
+
+    def __init__(self, operation_model: Any = None):
+        self.model_index = index_operation_model(operation_model) if operation_model is not None else None
+        self._message_results: Dict[MessageKey, List[Tuple[int, str]]] = {}
+        self._messages: Counter = Counter()
+        self._actor_counts: Dict[str, Counter] = {}
+        self.last_stats = {"messages": 0, "checked": 0, "reused": 0}
+
+    def _check_message(self, key: MessageKey) -> List[Tuple[int, str]]:
+        source, target, event_type, event_name, _ = key
+        found: List[Tuple[int, str]] = []
+        src_system, dst_system = _is_system(source), _is_system(target)
+        if src_system and dst_system:
+            found.append((7, f"Event '{event_name}' goes from System to System"))
+        elif not src_system and not dst_system:
+            found.append((8, f"Event '{event_name}' goes from actor '{source}' to actor '{target}'"))
+
+        kind = _event_kind(event_type)
+        if kind is None:
+            kind = "input" if src_system else "output"
+        if kind == "input" and not (src_system and not dst_system):
+            found.append((9, f"Input event '{event_name}' must go from System to an actor "
+                             f"(found '{source}' -> '{target}')"))
+        if kind == "output" and not (dst_system and not src_system):
+            found.append((10, f"Output event '{event_name}' must go from an actor to System "
+                              f"(found '{source}' -> '{target}')"))
+
+        index = self.model_index
+        if index is None:
+            return found
+        for endpoint in (source, target):
+            if _is_system(endpoint):
+                continue
+            instance, actor_type = _actor(endpoint)
+            if not actor_type:
+                found.append((12, f"Actor '{instance}' has no actor type (expected 'instance:ActType')"))
+                continue
+            problem = _check_name(index["actors"], actor_type)
+            if problem:
+                found.append((12, f"Actor type '{actor_type}' does not match the operation model"
+                              + (f" ('{index['actors'][actor_type.lower()]}')" if problem == "case" else "")))
+                if problem == "unknown":
+                    found.append((16, f"Actor type '{actor_type}' is not defined in the operation model"))
+        problem = _check_name(index[kind], event_name)
+        if problem:
+            rule = 14 if kind == "input" else 15
+            found.append((rule, f"{kind.capitalize()} event '{event_name}' does not match the operation model"
+                          + (f" ('{index[kind][event_name.lower()]}')" if problem == "case" else "")))
+            if problem == "unknown":
+                found.append((17, f"Event '{event_name}' is not defined in the operation model"))
+        return found
+
+    def _count(self, key: MessageKey, delta: int) -> None:
+        source, target = key[0], key[1]
+        if _is_system(source) == _is_system(target):
+            return
+        actor, kind = (target, "input") if _is_system(source) else (source, "output")
+        counts = self._actor_counts.setdefault(_actor(actor)[0], Counter())
+        counts[kind] += delta
+        if not +counts:
+            del self._actor_counts[_actor(actor)[0]]
+
+    def check(self, scenario: Any) -> Dict[str, Any]:
+        """
+        Check a scenario (dict or JSON text), reusing the results of unchanged messages.
+
+        Returns:
+            Auditor-shaped report {"data": {"verdict", "non-compliant-rules",
+            "fix_suggestions", "coverage"}, "errors": None}
+        """
+        violations: List[Dict[str, Any]] = []
+
+        def violation(rule: int, where: str, msg: str) -> None:
+            violations.append({"rule": RULE_IDS[rule], "line": where, "msg": msg})
+
+        if isinstance(scenario, str):
+            scenario, problems = load_operation_model(scenario)
+            for problem in problems:
+                violation(0, "", problem)
+        data = scenario.get("data", scenario) if isinstance(scenario, dict) else None
+        body = (data or {}).get("scenario", data) if isinstance(data, dict) else None
+        messages = body.get("messages") if isinstance(body, dict) else None
+        if not isinstance(messages, list):
+            if scenario is not None:
+                violation(0, "", "No scenario 'messages' array")
+            messages = []
+
+        # Diff against the previous version: only new message contents are checked
+        keys = [_message_key(message) for message in messages]
+        current = Counter(keys)
+        for key, count in (self._messages - current).items():
+            self._count(key, -count)
+        for key, count in (current - self._messages).items():
+            self._count(key, count)
+        self._messages = current
+        checked = 0
+        for key in current:
+            if key not in self._message_results:
+                self._message_results[key] = self._check_message(key)
+                checked += 1
+        for stale in [key for key in self._message_results if key not in current]:
+            del self._message_results[stale]
+        self.last_stats = {"messages": len(keys), "checked": checked, "reused": len(current) - checked}
+
+        for i, key in enumerate(keys):
+            for rule, msg in self._message_results[key]:
+                violation(rule, f"messages[{i}]", msg)
+
+        if len(self._actor_counts) > MAX_ACTORS:
+            violation(2, "", f"Scenario has {len(self._actor_counts)} actors, at most {MAX_ACTORS} are allowed")
+        for actor, counts in sorted(self._actor_counts.items()):
+            if counts["input"] <= 0:
+                violation(3, "", f"Actor '{actor}' has no input event")
+            if counts["output"] <= 0:
+                violation(4, "", f"Actor '{actor}' has no output event")
+
+        missing = [RULE_IDS[n] for n in SEMANTIC_RULES]
+        if self.model_index is None:
+            missing += [RULE_IDS[n] for n in OPERATION_MODEL_RULES]
+        evaluated = [rule_id for rule_id in RULE_IDS.values() if rule_id not in missing]
+
+        fix_suggestions = []
+        for v in violations:
+            number = int(v["rule"].split("-", 1)[0][3:])
+            change_type, proposed = FIX_HINTS[number]
+            fix_suggestions.append({"rule": v["rule"], "line": v["line"], "change_type": change_type,
+                                    "proposed_change": proposed})
+
+        return {
+            "data": {
+                "verdict": "non-compliant" if violations else "compliant",
+                "non-compliant-rules": violations,
+                "fix_suggestions": fix_suggestions,
+                "coverage": {
+                    "evaluated": evaluated,
+                    "not_applicable": [],
+                    "missing_evaluation": missing,
+                    "total_rules_in_dsl": str(len(RULE_IDS)),
+                },
+            },
+            "errors": None,
+        }
+
+
+def check_scenario(scenario: Any, operation_model: Any = None) -> Dict[str, Any]:
+    """One-shot check of a scenario; use ScenarioChecker across audit/correct iterations."""
+    return ScenarioChecker(operation_model).check(scenario)
+
+
+def audit_shortcut(checker: ScenarioChecker, scenario: Any) -> Optional[Dict[str, Any]]:
+    """
+    Return the local report when a rule is violated, otherwise None.
+
+    The temporal rules (LSC5/LSC6) always need the LLM auditor, so a clean
+    local pass means the LLM audit should run.
+    """
+    report = checker.check(scenario)
+    return report if report["data"]["non-compliant-rules"] else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check a LUCIM scenario against the scenario rules")
+    parser.add_argument("scenario", help="Path to the scenario JSON output")
+    parser.add_argument("--operation-model", default=None, help="Operation model JSON for the consistency rules")
+    args = parser.parse_args(argv)
+
+    operation_model = None
+    if args.operation_model:
+        with open(args.operation_model, "r", encoding="utf-8") as f:
+            operation_model = f.read()
+    with open(args.scenario, "r", encoding="utf-8") as f:
+        report = check_scenario(f.read(), operation_model)
+    print(json.dumps(report, indent=2))
+    return 1 if report["data"]["non-compliant-rules"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash dedup of interface images with reuse of Agent 2a widget detections.
+
+Sweep combinations analyze the same *-interface-1/2.png screenshots over and
+over. This module keeps a store of schema-validated widget lists keyed by the
+perceptual hashes (dHash) of the analyzed image set. Before a vision call,
+the image analyzer asks lookup_widgets() for a stored list whose images are
+identical or within a Hamming distance threshold; after a successful call it
+stores the validated result with store_widgets().
+
+Entries record the model, reasoning and persona set that produced them (the
+runner exports them per combination) and are only reused for the same
+combination settings; reuse across models is opt-in.
+
+The runner can change the threshold, allow reuse across models or opt out per
+run (--widget-reuse-threshold / --widget-reuse-across-models /
+--no-widget-reuse in main.py), exported to the pipelines as environment
+variables. Without Pillow only byte-identical images are matched.
+
+Usage:
+    python image_dedup.py scan input/input-netlogo
+    python image_dedup.py lookup frogger-netlogo-interface-1.png frogger-netlogo-interface-2.png --model gpt-5-nano-2025-08-07
+"""
+import argparse
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from result_cache import file_digest
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORE_DIR = os.path.join(BASE_DIR, "output", ".cache", "widgets")
+# 32x32 gradients (1024 bits): small 8x8 hashes collide across the mostly black NetLogo world views
+HASH_SIZE = 32
+HASH_BITS = HASH_SIZE * HASH_SIZE
+DEFAULT_THRESHOLD = 16  # differing bits out of HASH_BITS
+WIDGET_REUSE_ENV = "EXPERIMENT_WIDGET_REUSE"
+WIDGET_REUSE_THRESHOLD_ENV = "EXPERIMENT_WIDGET_REUSE_THRESHOLD"
+WIDGET_REUSE_ACROSS_MODELS_ENV = "EXPERIMENT_WIDGET_REUSE_ACROSS_MODELS"
+WIDGET_SCOPE_ENV = "EXPERIMENT_WIDGET_SCOPE"
+SCOPE_KEYS = ("model", "reasoning", "persona")
+VALIDATOR_PATH = os.path.join(BASE_DIR, "templates", "validate_agent_2a_widgets.py")
+
+_hash_memo: Dict[str, Dict[str, Any]] = {}
+_hash_lock = threading.Lock()
+_validator = None
+
+
+def reuse_settings() -> Dict[str, Any]:
+    """{"enabled", "threshold", "across_models"} exported by the runner; reuse is on by default, across models off."""
+    return {
+        "enabled": os.environ.get(WIDGET_REUSE_ENV, "1") != "0",
+        "threshold": int(os.environ.get(WIDGET_REUSE_THRESHOLD_ENV) or DEFAULT_THRESHOLD),
+        "across_models": os.environ.get(WIDGET_REUSE_ACROSS_MODELS_ENV, "0") == "1",
+    }
+
+
+def widget_scope(model: Optional[str] = None, reasoning: Optional[str] = None,
+                 persona: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """Combination settings a widget list belongs to."""
+    return {"model": model, "reasoning": reasoning, "persona": persona}
+
+
+def prepare_widget_scope(env: Dict[str, str], model: Optional[str], reasoning: Optional[str],
+                         persona: Optional[str]) -> None:
+    """Export the combination's widget scope to a child pipeline environment."""
+    env[WIDGET_SCOPE_ENV] = json.dumps(widget_scope(model, reasoning, persona))
+
+
+def _env_scope() -> Dict[str, Optional[str]]:
+    """Widget scope exported by the runner (all None when unknown)."""
+    try:
+        exported = json.loads(os.environ.get(WIDGET_SCOPE_ENV) or "{}")
+    except ValueError:
+        exported = {}
+    if not isinstance(exported, dict):
+        exported = {}
+    return widget_scope(*(exported.get(key) for key in SCOPE_KEYS))
+
+
+def _dhash(path: str, size: int = HASH_SIZE) -> Optional[str]:
+    """Difference hash (hex): row-wise brightness gradients of a (size+1)x(size) grayscale thumbnail."""
+    if Image is None:
+        return None
+    with Image.open(path) as image:
+        pixels = image.convert("L").resize((size + 1, size), Image.LANCZOS).tobytes()
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return format(value, f"0{size * size // 4}x")
+
+
+def image_hash(path: str) -> Dict[str, Any]:
+    """{"sha256", "dhash"} of an image (dhash is None without Pillow), memoized on the file digest."""
+    digest = file_digest(path)
+    with _hash_lock:
+        cached = _hash_memo.get(digest)
+    if cached:
+        return cached
+    result = {"sha256": digest, "dhash": _dhash(path)}
+    with _hash_lock:
+        _hash_memo[digest] = result
+    return result
+
+
+def hamming(a: str, b: str) -> int:
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _images_match(stored: List[Dict[str, Any]], current: List[Dict[str, Any]], threshold: int) -> Optional[int]:
+    """Largest per-image distance when every image matches (0 for identical), else None."""
+    if len(stored) != len(current):
+        return None
+    worst = 0
+    for old, new in zip(stored, current):
+        if old["sha256"] == new["sha256"]:
+            continue
+        if not old.get("dhash") or not new.get("dhash") or len(old["dhash"]) != len(new["dhash"]):
+            return None
+        distance = hamming(old["dhash"], new["dhash"])
+        if distance > threshold:
+            return None
+        worst = max(worst, distance)
+    return worst
+
+
+def _entry_id(hashes: List[Dict[str, Any]], scope: Dict[str, Optional[str]]) -> str:
+    key = ":".join(h["sha256"] for h in hashes) + "|" + json.dumps([scope.get(k) for k in SCOPE_KEYS])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _same_scope(source: Dict[str, Any], scope: Dict[str, Optional[str]]) -> bool:
+    return all(source.get(key) == scope.get(key) for key in SCOPE_KEYS)
+
+
+def _validate_widgets(widgets: Any):
+    """Validate with templates/validate_agent_2a_widgets.py; returns (is_valid, errors)."""
+    global _validator
+    if _validator is None:
+        spec = importlib.util.spec_from_file_location("validate_agent_2a_widgets", VALIDATOR_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _validator = module.validate_widget_json
+    return _validator(widgets)
+
+
+class WidgetStore:
+    """
+    Store of validated Agent 2a widget lists, one JSON file per analyzed image set.
+
+    Args:
+        store_dir: Directory of <entry_id>.json files
+        threshold: Maximum dHash Hamming distance (of HASH_BITS) per image for reuse
+        across_models: Reuse entries produced with another model, reasoning or persona set
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR, threshold: int = DEFAULT_THRESHOLD,
+                 across_models: bool = False):
+        self.store_dir = store_dir
+        self.threshold = threshold
+        self.across_models = across_models
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        for path in sorted(glob.glob(os.path.join(self.store_dir, "*.json"))):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def lookup(self, image_paths: List[str], scope: Optional[Dict[str, Optional[str]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find stored widgets for identical or near-identical images.
+
+        Args:
+            image_paths: Images to analyze, in the order they are sent
+            scope: Model, reasoning and persona set of the run (see widget_scope());
+                only entries with the same scope match unless across_models is set
+
+        Returns:
+            {"widgets", "distance", "entry_id", "source"} or None
+        """
+        scope = scope or widget_scope()
+        hashes = [image_hash(path) for path in image_paths]
+        exact_path = os.path.join(self.store_dir, f"{_entry_id(hashes, scope)}.json")
+        candidates: List[Dict[str, Any]] = []
+        if os.path.exists(exact_path):
+            try:
+                with open(exact_path, "r", encoding="utf-8") as f:
+                    candidates = [json.load(f)]
+            except (OSError, ValueError):
+                candidates = []
+        if not candidates:
+            candidates = self._entries()
+
+        best = None
+        for entry in candidates:
+            if not self.across_models and not _same_scope(entry.get("source", {}), scope):
+                continue
+            distance = _images_match(entry["images"], hashes, self.threshold)
+            if distance is not None and (best is None or distance < best[0]):
+                best = (distance, entry)
+        if best is None:
+            return None
+        distance, entry = best
+        return {"widgets": entry["widgets"], "distance": distance, "entry_id": entry["entry_id"],
+                "source": entry.get("source", {})}
+
+    def store(self, image_paths: List[str], widgets: Any, source: Optional[Dict[str, Any]] = None,
+              scope: Optional[Dict[str, Optional[str]]] = None) -> bool:
+        """
+        Store a widget list after schema validation; invalid lists are not stored.
+
+        Args:
+            image_paths: Analyzed images, in the order they were sent
+            widgets: Agent 2a widget list (or {"data": [...]})
+            source: Provenance (case, run_id, ...)
+            scope: Model, reasoning and persona set that produced the widgets, recorded in source
+        """
+        scope = scope or widget_scope()
+        if isinstance(widgets, dict) and isinstance(widgets.get("data"), list):
+            widgets = widgets["data"]
+        try:
+            is_valid, errors = _validate_widgets(widgets)
+        except ImportError as e:
+            print(f"[WIDGETS] Not storing widgets: validator unavailable ({e})")
+            return False
+        if not is_valid:
+            print(f"[WIDGETS] Not storing invalid widgets ({len(errors)} error(s))")
+            return False
+        hashes = [image_hash(path) for path in image_paths]
+        entry = {
+            "entry_id": _entry_id(hashes, scope),
+            "images": [dict(h, name=os.path.basename(path)) for h, path in zip(hashes, image_paths)],
+            "widgets": widgets,
+            "source": dict(source or {}, **scope),
+            "created": time.time(),
+        }
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = os.path.join(self.store_dir, f"{entry['entry_id']}.json")
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(temp_path, path)
+        return True
+
+
+def lookup_widgets(image_paths: List[str], store_dir: str = DEFAULT_STORE_DIR) -> Optional[List[Dict[str, Any]]]:
+    """Widgets to reuse for image_paths under the runner's settings and scope, or None to run the vision call."""
+    settings = reuse_settings()
+    if not settings["enabled"]:
+        return None
+    match = WidgetStore(store_dir, settings["threshold"], settings["across_models"]).lookup(image_paths, _env_scope())
+    if match is None:
+        return None
+    print(f"[WIDGETS] Reusing widgets of entry {match['entry_id'][:12]} (distance {match['distance']})")
+    return match["widgets"]
+
+
+def store_widgets(image_paths: List[str], widgets: Any, source: Optional[Dict[str, Any]] = None,
+                  store_dir: str = DEFAULT_STORE_DIR) -> bool:
+    """Store validated widgets for later reuse, unless reuse is disabled for this run."""
+    settings = reuse_settings()
+    if not settings["enabled"]:
+        return False
+    return WidgetStore(store_dir, settings["threshold"]).store(image_paths, widgets, source, _env_scope())
+
+
+def scan(paths: List[str], threshold: int) -> List[List[str]]:
+    """Group images whose dHash distance is within threshold (byte-identical without Pillow)."""
+    groups: List[List[str]] = []
+    representatives: List[Dict[str, Any]] = []
+    for path in paths:
+        current = image_hash(path)
+        for group, rep in zip(groups, representatives):
+            if _images_match([rep], [current], threshold) is not None:
+                group.append(path)
+                break
+        else:
+            groups.append([path])
+            representatives.append(current)
+    return groups
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Perceptual-hash dedup of interface images")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD,
+                        help=f"Maximum Hamming distance (of {HASH_BITS} bits) for near-identical images")
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    scan_parser = sub.add_parser("scan", help="Group near-identical PNG images of a directory")
+    scan_parser.add_argument("directory")
+    lookup_parser = sub.add_parser("lookup", help="Look up stored widgets for an image set")
+    lookup_parser.add_argument("images", nargs="+")
+    lookup_parser.add_argument("--model")
+    lookup_parser.add_argument("--reasoning")
+    lookup_parser.add_argument("--persona")
+    lookup_parser.add_argument("--across-models", action="store_true",
+                               help="Match entries of any model, reasoning and persona set")
+    args = parser.parse_args(argv)
+
+    if Image is None:
+        print("Warning: Pillow is not installed, only byte-identical images are matched (pip install Pillow)")
+    if args.command == "scan":
+        paths = sorted(glob.glob(os.path.join(args.directory, "**", "*.png"), recursive=True))
+        groups = scan(paths, args.threshold)
+        duplicates = [g for g in groups if len(g) > 1]
+        for group in duplicates:
+            print("Near-identical: " + ", ".join(os.path.basename(p) for p in group))
+        print(f"{len(paths)} image(s), {len(groups)} distinct, {len(duplicates)} group(s) with duplicates")
+        return 0
+
+    match = WidgetStore(args.store_dir, args.threshold, args.across_models).lookup(
+        args.images, widget_scope(args.model, args.reasoning, args.persona))
+    if match is None:
+        print("No stored widgets match these images")
+        return 1
+    print(json.dumps(match, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Interface image preprocessing cache for the Agent 2a image analyzer.
+
+Downscales the NetLogo interface screenshots to a maximum side length,
+quantizes them to a small palette and re-encodes them as optimized PNG. The
+base64 payloads are cached on disk keyed by the image's SHA-256 and the
+preprocessing parameters, so each screenshot is processed once per setting
+instead of being re-encoded and uploaded at full resolution on every call.
+
+The runner exports the settings to the child pipelines (--image-max-side /
+--image-colors in main.py); the image analyzer then builds its payload with
+image_data_url(path, **settings_from_env()).
+
+Pillow is optional: without it images are passed through unchanged (still
+cached as base64).
+
+Usage:
+    python image_preprocess.py frogger --max-side 1024 --colors 64 --benchmark --mock-llm auto
+"""
+import argparse
+import base64
+import glob
+import hashlib
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+from result_cache import file_digest
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NETLOGO_DIR = os.path.join(BASE_DIR, "input", "input-netlogo")
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "output", ".cache", "images")
+DEFAULT_MAX_SIDE = 1280
+DEFAULT_COLORS = 128
+# Bump when the processing changes so stale cache entries are ignored
+PREPROCESS_VERSION = 1
+
+IMAGE_MAX_SIDE_ENV = "EXPERIMENT_IMAGE_MAX_SIDE"
+IMAGE_COLORS_ENV = "EXPERIMENT_IMAGE_COLORS"
+
+_memo: Dict[str, Dict[str, Any]] = {}
+_memo_lock = threading.Lock()
+
+
+def settings_from_env() -> Dict[str, int]:
+    """Preprocessing settings exported by the runner; max_side 0 means images are sent unchanged."""
+    return {
+        "max_side": int(os.environ.get(IMAGE_MAX_SIDE_ENV) or 0),
+        "colors": int(os.environ.get(IMAGE_COLORS_ENV) or DEFAULT_COLORS),
+    }
+
+
+def preprocess_key(path: str, max_side: int, colors: int) -> str:
+    params = f"{file_digest(path)}:{max_side}:{colors}:v{PREPROCESS_VERSION}:{'pil' if Image else 'raw'}"
+    return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+
+def _process(data: bytes, max_side: int, colors: int) -> Dict[str, Any]:
+    """Downscale and quantize PNG bytes; returns the smaller of the processed and original image."""
+    if Image is None or max_side <= 0:
+        return {"data": data, "method": "original", "width": None, "height": None}
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGB")
+        if max(image.size) > max_side:
+            image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if colors > 0:
+            image = image.quantize(colors=colors, method=Image.MEDIANCUT)
+        out = io.BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        width, height = image.size
+    processed = out.getvalue()
+    if len(processed) >= len(data):
+        return {"data": data, "method": "original", "width": width, "height": height}
+    return {"data": processed, "method": "downscaled", "width": width, "height": height}
+
+
+def preprocess_image(path: str, max_side: int = DEFAULT_MAX_SIDE, colors: int = DEFAULT_COLORS,
+                     cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Return the preprocessed image of path, from the cache when possible.
+
+    Args:
+        path: PNG screenshot
+        max_side: Maximum width/height in pixels (0 keeps the original image)
+        colors: Palette size for quantization (0 keeps full color)
+        cache_dir: Cache directory; None disables the disk cache
+
+    Returns:
+        {"key", "base64", "mime", "bytes", "original_bytes", "width", "height", "method", "cached"}
+    """
+    key = preprocess_key(path, max_side, colors)
+    with _memo_lock:
+        entry = _memo.get(key)
+    if entry:
+        return dict(entry, cached=True)
+
+    cache_path = os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            entry = None
+        if entry:
+            with _memo_lock:
+                _memo[key] = entry
+            return dict(entry, cached=True)
+
+    with open(path, "rb") as f:
+        original = f.read()
+    result = _process(original, max_side, colors)
+    entry = {
+        "key": key,
+        "base64": base64.b64encode(result["data"]).decode("ascii"),
+        "mime": "image/png",
+        "bytes": len(result["data"]),
+        "original_bytes": len(original),
+        "width": result["width"],
+        "height": result["height"],
+        "method": result["method"],
+    }
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, cache_path)
+    with _memo_lock:
+        _memo[key] = entry
+    return dict(entry, cached=False)
+
+
+def image_data_url(path: str, max_side: int = DEFAULT_MAX_SIDE, colors: int = DEFAULT_COLORS,
+                   cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> str:
+    """data: URL of the preprocessed image, ready for an input_image / image_url payload"""
+    entry = preprocess_image(path, max_side, colors, cache_dir)
+    return f"data:{entry['mime']};base64,{entry['base64']}"
+
+
+def case_image_paths(case: str, netlogo_dir: str = NETLOGO_DIR) -> List[str]:
+    return sorted(glob.glob(os.path.join(netlogo_dir, f"{glob.escape(case)}-netlogo-interface-*.png")))
+
+
+def _post_image(base_url: str, data_url: str) -> float:
+    """Time one image-analyzer style Responses API call against base_url."""
+    payload = json.dumps({
+        "model": "gpt-5-nano-2025-08-07",
+        "input": [{"role": "user", "content": [
+            {"type": "input_text", "text": "List the widgets of this NetLogo interface image"},
+            {"type": "input_image", "image_url": data_url},
+        ]}],
+    }).encode("utf-8")
+    request = urllib.request.Request(f"{base_url.rstrip('/')}/responses", data=payload,
+                                     headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def benchmark(paths: List[str], max_side: int, colors: int, base_url: Optional[str] = None,
+              repetitions: int = 5, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> List[Dict[str, Any]]:
+    """
+    Compare original and preprocessed images: payload bytes, preprocessing
+    time (cold and cached) and, with base_url, median request latency.
+    """
+    rows = []
+    for path in paths:
+        with open(path, "rb") as f:
+            original_url = "data:image/png;base64," + base64.b64encode(f.read()).decode("ascii")
+        with _memo_lock:
+            _memo.pop(preprocess_key(path, max_side, colors), None)
+        start = time.perf_counter()
+        entry = preprocess_image(path, max_side, colors, None)
+        cold = time.perf_counter() - start
+        if cache_dir:
+            preprocess_image(path, max_side, colors, cache_dir)
+        start = time.perf_counter()
+        processed_url = image_data_url(path, max_side, colors, cache_dir)
+        warm = time.perf_counter() - start
+        row = {
+            "image": os.path.basename(path),
+            "method": entry["method"],
+            "original_bytes": entry["original_bytes"],
+            "bytes": entry["bytes"],
+            "payload_original": len(original_url),
+            "payload": len(processed_url),
+            "preprocess_cold": cold,
+            "preprocess_cached": warm,
+        }
+        if base_url:
+            row["latency_original"] = statistics.median(_post_image(base_url, original_url)
+                                                        for _ in range(repetitions))
+            row["latency"] = statistics.median(_post_image(base_url, processed_url) for _ in range(repetitions))
+        rows.append(row)
+    return rows
+
+
+def print_benchmark(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'image':<42} {'orig KB':>9} {'new KB':>9} {'saved':>7} {'cold ms':>8} {'cached ms':>9}"
+          f"{'  orig lat ms   new lat ms' if rows and 'latency' in rows[0] else ''}")
+    for row in rows:
+        saved = 1 - row["payload"] / row["payload_original"] if row["payload_original"] else 0.0
+        line = (f"{row['image']:<42} {row['payload_original'] / 1024:>9.1f} {row['payload'] / 1024:>9.1f} "
+                f"{saved * 100:>6.1f}% {row['preprocess_cold'] * 1000:>8.1f} {row['preprocess_cached'] * 1000:>9.2f}")
+        if "latency" in row:
+            line += f"  {row['latency_original'] * 1000:>11.1f} {row['latency'] * 1000:>12.1f}"
+        print(line)
+    total_original = sum(r["payload_original"] for r in rows)
+    total = sum(r["payload"] for r in rows)
+    if total_original:
+        print(f"Total payload: {total_original / 1024:.1f} KB -> {total / 1024:.1f} KB "
+              f"({(1 - total / total_original) * 100:.1f}% smaller)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Preprocess and cache NetLogo interface images")
+    parser.add_argument("sources", nargs="+", help="Case names (e.g. frogger) or PNG paths")
+    parser.add_argument("--max-side", type=int, default=DEFAULT_MAX_SIDE, help="Maximum width/height in pixels")
+    parser.add_argument("--colors", type=int, default=DEFAULT_COLORS, help="Palette size (0 keeps full color)")
+    parser.add_argument("--benchmark", action="store_true", help="Compare bytes and latency with the originals")
+    parser.add_argument("--mock-llm", default=None, metavar="URL|auto",
+                        help="Also time image-analyzer requests against this mock server")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if Image is None:
+        print("Warning: Pillow is not installed, images are cached unchanged (pip install Pillow)")
+    paths: List[str] = []
+    for source in args.sources:
+        paths.extend([source] if source.endswith(".png") else case_image_paths(source))
+    if not paths:
+        print("No interface images found")
+        return 1
+
+    if not args.benchmark:
+        for path in paths:
+            entry = preprocess_image(path, args.max_side, args.colors)
+            print(f"{os.path.basename(path)}: {entry['original_bytes']} -> {entry['bytes']} bytes "
+                  f"({entry['method']}{', cached' if entry['cached'] else ''})")
+        return 0
+
+    mock_server = None
+    base_url = args.mock_llm
+    if base_url == "auto":
+        from mock_llm_server import start_mock_server
+        mock_server, base_url = start_mock_server()
+    try:
+        print_benchmark(benchmark(paths, args.max_side, args.colors, base_url, args.repetitions))
+    finally:
+        if mock_server is not None:
+            mock_server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
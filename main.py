@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 import os
+import json
 import sys
 import glob
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
@@ -184,9 +188,278 @@ def _import_module(module_path: str, module_name: str):
     return module
 
 
+_sibling_modules: Dict[str, Any] = {}
+
+
+def _load_sibling(module_name: str):
+    """Import a sibling module of this script once and reuse it"""
+    if module_name not in _sibling_modules:
+        module_path = os.path.join(os.path.dirname(__file__), f"{module_name}.py")
+        _sibling_modules[module_name] = _import_module(module_path, module_name)
+    return _sibling_modules[module_name]
+
+
+def _expand_combinations(models: List[str], reasoning_levels: List[Dict[str, str]],
+                         verbosity_levels: List[str], paired: bool) -> List[Dict[str, Any]]:
+    """Expand models x reasoning x verbosity (or paired reasoning/verbosity) into a flat list"""
+    combinations = []
+    for model in models:
+        if paired and len(reasoning_levels) == len(verbosity_levels):
+            for idx, reasoning_config in enumerate(reasoning_levels):
+                combinations.append({"model": model, "reasoning": reasoning_config,
+                                     "verbosity": verbosity_levels[idx]})
+        else:
+            for reasoning_config in reasoning_levels:
+                for verbosity in verbosity_levels:
+                    combinations.append({"model": model, "reasoning": reasoning_config,
+                                         "verbosity": verbosity})
+    return combinations
+
+
+def _image_settings() -> Optional[Dict[str, str]]:
+    """Interface image preprocessing exported to the pipelines, or None when images are sent unchanged"""
+    settings = {name: os.environ[env] for name, env in (("max_side", "EXPERIMENT_IMAGE_MAX_SIDE"),
+                                                          ("colors", "EXPERIMENT_IMAGE_COLORS"))
+                if os.environ.get(env)}
+    return settings or None
+
+
+def _case_weight(case: str) -> int:
+    """Estimated cost of a case, taken as the size of its NetLogo code (bytes)"""
+    code_file = os.path.join(os.environ["INPUT_NETLOGO_DIR"], f"{case}-netlogo-code.md")
+    try:
+        return os.path.getsize(code_file)
+    except OSError:
+        return 0
+
+
+def _build_sweep_jobs(cases: List[str], combinations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Expand cases x combinations into jobs, in matrix order (case-major)"""
+    run_cases = cases or ["overall"]
+    multi_case = len(run_cases) > 1
+    sweep_jobs = []
+    for case in run_cases:
+        weight = _case_weight(case)
+        for combination in combinations:
+            combination_key = f"{combination['model']}_{combination['reasoning']['effort']}_{combination['verbosity']}"
+            # Keep the historical key for single-case runs; prefix with the case otherwise
+            if multi_case:
+                combination_key = f"{case}_{combination_key}"
+            sweep_jobs.append({"key": combination_key, "case": case, "combination": combination,
+                               "weight": weight})
+    return sweep_jobs
+
+
+def _print_combination_header(current: int, total: int, case: str, combination: Dict[str, Any]) -> None:
+    model = combination["model"]
+    reasoning_config = combination["reasoning"]
+    verbosity = combination["verbosity"]
+    if OrchestratorUI:
+        ui = OrchestratorUI()
+        ui.print_combination_header(current, total)
+        ui.print_parameter_bundle(
+            model=model,
+            base_name=case,
+            reasoning_effort=reasoning_config["effort"],
+            reasoning_summary=reasoning_config["summary"],
+            text_verbosity=verbosity
+        )
+    else:
+        print(f"\n{'='*60}")
+        print(f"COMBINATION {current}/{total}")
+        print(f"Model: {model}, Reasoning: {reasoning_config['effort']}, Verbosity: {verbosity}")
+        print(f"{'='*60}")
+
+
+def _run_combination(mode: str, persona: str, case: str, combination: Dict[str, Any], output_dir: str,
+                     single_agent_module, orchestrated_module, echo: bool = True,
+                     cache=None, concurrent: bool = False) -> Dict[str, Any]:
+    """Run the selected pipeline(s) for one combination and return its results entry
+
+    In "both" mode the single-agent and orchestrated pipelines run side by side;
+    the entry is only returned once both have finished. When a result cache is
+    given, pipelines whose inputs were already computed are restored from it.
+    concurrent marks a parallel sweep, where a run that does not report its run
+    directory fails instead of falling back to the newest one.
+    """
+    model = combination["model"]
+    reasoning_config = combination["reasoning"]
+    verbosity = combination["verbosity"]
+
+    run_infos = {"single_agent": {}, "orchestrated": {}}
+
+    def _run_single_agent() -> int:
+        if echo:
+            print(f"\nRunning without orchestration at {datetime.now().strftime('%H:%M:%S')}")
+        return single_agent_module.run_without_orchestration_imports(
+            REPO_ROOT, persona, case, model,
+            reasoning_config["effort"], verbosity, output_dir, echo=echo,
+            run_info=run_infos["single_agent"], concurrent=concurrent
+        )
+
+    def _run_orchestrated() -> int:
+        if echo:
+            print(f"\nRunning with orchestration at {datetime.now().strftime('%H:%M:%S')}")
+        return orchestrated_module.run_with_orchestration_imports(
+            REPO_ROOT, persona, case, model,
+            reasoning_config["effort"], verbosity, output_dir, echo=echo,
+            run_info=run_infos["orchestrated"], concurrent=concurrent
+        )
+
+    def _with_cache(pipeline: str, run) -> Tuple[int, bool]:
+        """Return (exit_code, restored_from_cache) for one pipeline"""
+        if cache is None:
+            return run(), False
+        cache_module = _load_sibling("result_cache")
+        utils_module = _load_sibling("utils")
+        key = cache_module.compute_cache_key(
+            os.environ["INPUT_PERSONA_DIR"], os.environ["INPUT_NETLOGO_DIR"],
+            os.environ["INPUT_VALID_EXAMPLES_DIR"], persona, case, model,
+            reasoning_config["effort"], verbosity, os.environ.get("MAX_AUDIT", "3"), pipeline,
+            extra=_image_settings()
+        )
+        target_dir = utils_module.combination_output_dir(output_dir, pipeline, case, model,
+                                                         reasoning_config["effort"], verbosity)
+        if cache.restore(key, target_dir):
+            print(f"[CACHE] Hit for {pipeline} {case}/{model}/{reasoning_config['effort']}/{verbosity} ({key[:12]})")
+            return 0, True
+        exit_code = run()
+        if exit_code == 0:
+            cache.store(key, target_dir, {"pipeline": pipeline, "persona": persona, "case": case,
+                                          "model": model, "reasoning": reasoning_config["effort"],
+                                          "verbosity": verbosity})
+        return exit_code, False
+
+    runners = {}
+    if mode in ["without", "both"]:
+        runners["single_agent"] = _run_single_agent
+    if mode in ["with", "both"]:
+        runners["orchestrated"] = _run_orchestrated
+
+    if len(runners) > 1:
+        with ThreadPoolExecutor(max_workers=len(runners)) as pool:
+            futures = {pipeline: pool.submit(_with_cache, pipeline, run) for pipeline, run in runners.items()}
+            outcomes = {pipeline: future.result() for pipeline, future in futures.items()}
+    else:
+        outcomes = {pipeline: _with_cache(pipeline, run) for pipeline, run in runners.items()}
+
+    combination_results = {}
+    for pipeline, (exit_code, cached) in outcomes.items():
+        run_info = run_infos[pipeline]
+        metrics = run_info.get("metrics")
+        if cached:
+            # The restored combination folder carries the original run's sidecar
+            metrics_module = _load_sibling("stage_metrics")
+            combination_dir = _load_sibling("utils").combination_output_dir(
+                output_dir, pipeline, case, model, reasoning_config["effort"], verbosity)
+            metrics = metrics_module.summarize_stage_metrics(metrics_module.load_stage_metrics(
+                os.path.join(combination_dir, metrics_module.METRICS_FILE)))
+            policy_module = _load_sibling("request_policy")
+            run_info["requests"] = policy_module.summarize_request_log(policy_module.load_request_log(
+                os.path.join(combination_dir, policy_module.REQUEST_LOG_FILE)))
+        combination_results[pipeline] = {
+            "exit_code": exit_code,
+            "case": case,
+            "model": model,
+            "reasoning": reasoning_config,
+            "verbosity": verbosity,
+            "cached": cached,
+            "run_id": run_info.get("run_id"),
+            "run_dir_source": run_info.get("run_dir_source"),
+            "error": run_info.get("error"),
+            "timings": run_info.get("timings", {}),
+            "metrics": metrics,
+            "requests": run_info.get("requests"),
+            "timeout": run_info.get("timeout"),
+            "salvaged_files": len(run_info["manifest"]) if run_info.get("timeout") and run_info.get("manifest") else None
+        }
+    return combination_results
+
+
+def _failed_combination(job: Dict[str, Any], mode: str, error: str) -> Dict[str, Any]:
+    """Results entry of a combination whose runner raised: a failed entry per selected pipeline"""
+    combination = job["combination"]
+    pipelines = {"without": ["single_agent"], "with": ["orchestrated"]}.get(mode, ["single_agent", "orchestrated"])
+    return {pipeline: {"exit_code": 1, "case": job["case"], "model": combination["model"],
+                       "reasoning": combination["reasoning"], "verbosity": combination["verbosity"],
+                       "cached": False, "crashed": True, "error": error}
+            for pipeline in pipelines}
+
+
+def _run_governed(job: Dict[str, Any], governor, mode: str, persona: str, output_dir: str,
+                  single_agent_module, orchestrated_module, echo: bool = True, cache=None,
+                  journal=None, report_writer=None, concurrent: bool = False) -> Optional[Dict[str, Any]]:
+    """Run one sweep job as admitted by the budget governor; None when the budget skipped it
+
+    A runner that raises yields a failed entry per pipeline (see _failed_combination)
+    so that sequential and parallel sweeps both continue and report it.
+    """
+    admitted = governor.admit(job)
+    if admitted is None:
+        return None
+    if journal is not None:
+        journal.running(job)
+    start = time.perf_counter()
+    try:
+        combination_results = _run_combination(mode, persona, admitted["case"], admitted["combination"], output_dir,
+                                               single_agent_module, orchestrated_module, echo=echo, cache=cache,
+                                               concurrent=concurrent)
+        governor.record(admitted, combination_results, time.perf_counter() - start)
+        if report_writer is not None:
+            report_writer.add_combination(admitted["key"], combination_results)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"Combination {admitted['key']} failed: {error}")
+        if journal is not None:
+            journal.failed(job, error)
+        combination_results = _failed_combination(admitted, mode, error)
+        if report_writer is not None:
+            report_writer.add_combination(admitted["key"], combination_results)
+        return combination_results
+    except BaseException as e:
+        # Also on Ctrl-C: --resume re-runs the combination instead of finding it "running"
+        if journal is not None:
+            journal.failed(job, f"{type(e).__name__}: {e}")
+        raise
+    if journal is not None:
+        journal.finished(job, admitted["key"], combination_results)
+    limits = _load_sibling("rate_limiter").describe_limits()
+    if limits:
+        print(f"[RATE] After {admitted['key']}: {limits}")
+    return combination_results
+
+
 def run_pipeline(mode: str, persona: str, cases: List[str], execution_id: str, 
-                 advanced_params: Dict[str, Any] = None) -> dict:
-    """Run selected pipeline(s) with advanced parameters and return results"""
+                 advanced_params: Dict[str, Any] = None, jobs: int = 1,
+                 use_cache: bool = True, refresh_cache: bool = False,
+                 cache_max_bytes: Optional[int] = None, max_cost: Optional[float] = None,
+                 max_wall_time: Optional[float] = None, journal=None, report_writer=None,
+                 token_estimates: Optional[Dict[str, Dict[str, int]]] = None) -> dict:
+    """Run selected pipeline(s) with advanced parameters and return results
+
+    Every selected case is run against every parameter combination. With
+    jobs > 1 the combinations run concurrently on a worker pool, longest cases
+    first; each one writes to its own combination folder and log, and the
+    returned results dict has the same structure as a sequential run.
+
+    Successful pipeline outputs are stored in a content-addressed result cache
+    and restored on later runs with identical inputs; use_cache=False disables
+    the cache entirely and refresh_cache=True recomputes (and re-stores) every
+    combination.
+
+    With max_cost (USD) or max_wall_time (seconds), a budget governor projects
+    the remaining sweep from the finished combinations and downgrades or stops
+    scheduling combinations that would breach a ceiling; its summary is
+    returned under results["budget"]. Pipeline runs that report no tokens are
+    charged token_estimates[case] (budget_governor.estimates_from_budget).
+
+    With a journal (sweep_journal.SweepJournal), every state change of a
+    combination is checkpointed; combinations the journal already records as
+    done are not run again and their journaled results are returned instead.
+
+    With a report_writer (results_writer.IncrementalReportWriter), the report
+    is updated as each combination finishes.
+    """
     # Import orchestrated runner
     orchestrated_path = os.path.join(os.path.dirname(__file__), "runner_orchestrated.py")
     orchestrated_module = _import_module(orchestrated_path, "orchestrated")
@@ -209,12 +482,24 @@ def run_pipeline(mode: str, persona: str, cases: List[str], execution_id: str,
     verbosity_levels = advanced_params.get("verbosity_levels", ["medium"]) if advanced_params else ["medium"]
     paired = bool(advanced_params.get("paired_reasoning_verbosity")) if advanced_params else False
     
-    # Calculate total combinations
-    if paired and len(reasoning_levels) == len(verbosity_levels):
-        total_combinations = len(models) * len(reasoning_levels)
-    else:
-        total_combinations = len(models) * len(reasoning_levels) * len(verbosity_levels)
-    current_combination = 0
+    cache = None
+    if use_cache:
+        cache_module = _load_sibling("result_cache")
+        cache = cache_module.ResultCache(
+            max_bytes=cache_max_bytes or cache_module.DEFAULT_MAX_BYTES,
+            read=not refresh_cache
+        )
+    
+    combinations = _expand_combinations(models, reasoning_levels, verbosity_levels, paired)
+    all_jobs = _build_sweep_jobs(cases, combinations)
+    journaled = journal.completed() if journal is not None else {}
+    sweep_jobs = [job for job in all_jobs if job["key"] not in journaled]
+    for job in sweep_jobs:
+        if journal is not None:
+            journal.pending(job)
+    total_combinations = len(sweep_jobs)
+    governor = _load_sibling("budget_governor").BudgetGovernor(
+        sweep_jobs, max_cost=max_cost, max_wall_time=max_wall_time, workers=jobs, estimates=token_estimates)
     
     print(f"\n{'='*80}")
     print(f"EXPERIMENTATION CONFIGURATION")
@@ -225,128 +510,50 @@ def run_pipeline(mode: str, persona: str, cases: List[str], execution_id: str,
     print(f"Models: {', '.join(models)}")
     print(f"Reasoning Levels: {len(reasoning_levels)}")
     print(f"Verbosity Levels: {', '.join(verbosity_levels)}")
-    print(f"Total Combinations: {total_combinations}")
+    print(f"Parameter Combinations per Case: {len(combinations)}")
+    print(f"Total Combinations: {len(all_jobs)}")
+    if journaled:
+        print(f"Resumed: {len(journaled)} done in the journal, {total_combinations} to run")
+    print(f"Parallel Jobs: {jobs}")
+    print(f"Result Cache: {'off' if cache is None else 'refresh' if refresh_cache else 'on'}")
+    if governor.enabled:
+        print(f"Budget: {'$%.2f' % max_cost if max_cost is not None else 'no cost limit'}, "
+              f"{'%.0fs' % max_wall_time if max_wall_time is not None else 'no wall-time limit'}")
     print(f"{'='*80}")
     
-    # Run all combinations
-    for model in models:
-        if paired and len(reasoning_levels) == len(verbosity_levels):
-            for idx, reasoning_config in enumerate(reasoning_levels):
-                verbosity = verbosity_levels[idx]
-                current_combination += 1
-                
-                # Print parameter bundle
-                if OrchestratorUI:
-                    ui = OrchestratorUI()
-                    ui.print_combination_header(current_combination, total_combinations)
-                    ui.print_parameter_bundle(
-                        model=model,
-                        base_name=cases[0] if cases else "overall",
-                        reasoning_effort=reasoning_config["effort"],
-                        reasoning_summary=reasoning_config["summary"],
-                        text_verbosity=verbosity
-                    )
-                else:
-                    print(f"\n{'='*60}")
-                    print(f"COMBINATION {current_combination}/{total_combinations}")
-                    print(f"Model: {model}, Reasoning: {reasoning_config['effort']}, Verbosity: {verbosity}")
-                    print(f"{'='*60}")
-                
-                # Run pipelines for this combination
-                combination_results = {}
-                
-                if mode in ["without", "both"]:
-                    print(f"\nRunning without orchestration at {datetime.now().strftime('%H:%M:%S')}")
-                    case = cases[0] if cases else "overall"
-                    exit_code = single_agent_module.run_without_orchestration_imports(
-                        REPO_ROOT, persona, case, model, 
-                        reasoning_config["effort"], verbosity, output_dir
-                    )
-                    combination_results["single_agent"] = {
-                        "exit_code": exit_code, 
-                        "case": case,
-                        "model": model,
-                        "reasoning": reasoning_config,
-                        "verbosity": verbosity
-                    }
-                
-                if mode in ["with", "both"]:
-                    print(f"\nRunning with orchestration at {datetime.now().strftime('%H:%M:%S')}")
-                    case = cases[0] if cases else "overall"
-                    exit_code = orchestrated_module.run_with_orchestration_imports(
-                        REPO_ROOT, persona, case, model, 
-                        reasoning_config["effort"], verbosity, output_dir
-                    )
-                    combination_results["orchestrated"] = {
-                        "exit_code": exit_code, 
-                        "case": case,
-                        "model": model,
-                        "reasoning": reasoning_config,
-                        "verbosity": verbosity
-                    }
-                
-                # Store results for this combination
-                combination_key = f"{model}_{reasoning_config['effort']}_{verbosity}"
-                results[combination_key] = combination_results
-        else:
-            for reasoning_config in reasoning_levels:
-                for verbosity in verbosity_levels:
-                    current_combination += 1
-                    
-                    # Print parameter bundle
-                    if OrchestratorUI:
-                        ui = OrchestratorUI()
-                        ui.print_combination_header(current_combination, total_combinations)
-                        ui.print_parameter_bundle(
-                            model=model,
-                            base_name=cases[0] if cases else "overall",
-                            reasoning_effort=reasoning_config["effort"],
-                            reasoning_summary=reasoning_config["summary"],
-                            text_verbosity=verbosity
-                        )
-                    else:
-                        print(f"\n{'='*60}")
-                        print(f"COMBINATION {current_combination}/{total_combinations}")
-                        print(f"Model: {model}, Reasoning: {reasoning_config['effort']}, Verbosity: {verbosity}")
-                        print(f"{'='*60}")
-                    
-                    # Run pipelines for this combination
-                    combination_results = {}
-                    
-                    if mode in ["without", "both"]:
-                        print(f"\nRunning without orchestration at {datetime.now().strftime('%H:%M:%S')}")
-                        case = cases[0] if cases else "overall"
-                        exit_code = single_agent_module.run_without_orchestration_imports(
-                            REPO_ROOT, persona, case, model, 
-                            reasoning_config["effort"], verbosity, output_dir
-                        )
-                        combination_results["single_agent"] = {
-                            "exit_code": exit_code, 
-                            "case": case,
-                            "model": model,
-                            "reasoning": reasoning_config,
-                            "verbosity": verbosity
-                        }
-                    
-                    if mode in ["with", "both"]:
-                        print(f"\nRunning with orchestration at {datetime.now().strftime('%H:%M:%S')}")
-                        case = cases[0] if cases else "overall"
-                        exit_code = orchestrated_module.run_with_orchestration_imports(
-                            REPO_ROOT, persona, case, model, 
-                            reasoning_config["effort"], verbosity, output_dir
-                        )
-                        combination_results["orchestrated"] = {
-                            "exit_code": exit_code, 
-                            "case": case,
-                            "model": model,
-                            "reasoning": reasoning_config,
-                            "verbosity": verbosity
-                        }
-                    
-                    # Store results for this combination
-                    combination_key = f"{model}_{reasoning_config['effort']}_{verbosity}"
-                    results[combination_key] = combination_results
+    completed: Dict[str, Any] = {}
+    if jobs > 1 and len(sweep_jobs) > 1:
+        executor_module = _load_sibling("sweep_executor")
+        
+        def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+            return _run_governed(job, governor, mode, persona, output_dir, single_agent_module,
+                                 orchestrated_module, echo=False, cache=cache, journal=journal,
+                                 report_writer=report_writer, concurrent=True)
+        
+        # Longest cases first; results are still recorded in matrix order
+        scheduled = executor_module.order_longest_first(sweep_jobs)
+        def _on_error(job: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+            return _failed_combination(job, mode, f"{type(error).__name__}: {error}")
+        
+        completed = {job["key"]: combination_results
+                     for job, combination_results in executor_module.run_jobs_parallel(scheduled, _run_job, jobs,
+                                                                                       on_error=_on_error)}
+    else:
+        # Run all combinations one after another
+        for current_combination, job in enumerate(sweep_jobs, 1):
+            _print_combination_header(current_combination, total_combinations, job["case"], job["combination"])
+            completed[job["key"]] = _run_governed(job, governor, mode, persona, output_dir, single_agent_module,
+                                                  orchestrated_module, cache=cache, journal=journal,
+                                                  report_writer=report_writer)
     
+    for job in all_jobs:
+        if job["key"] in journaled:
+            results[journaled[job["key"]]["result_key"]] = journaled[job["key"]]["result"]
+        elif completed.get(job["key"]) is not None:
+            results[governor.admitted.get(job["key"], job["key"])] = completed[job["key"]]
+    
+    if governor.enabled:
+        results["budget"] = governor.summary()
     return results
 
 
@@ -365,17 +572,79 @@ def generate_report(execution_id: str, setup: dict, results: dict) -> str:
     return writer_module.write_results(base_dir, execution_id, setup, results)
 
 
-def main() -> int:
-    print_banner()
-    ensure_dirs()
-    
-    # Validate OpenAI API key if available
-    if OrchestratorUI:
-        ui = OrchestratorUI()
-        if not ui.validate_openai_key():
-            return 1
-    
-    # Collect setup parameters
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Experimentation runner for the NetLogo to LUCIM pipelines")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of parameter combinations to run concurrently (default: 1, sequential)")
+    parser.add_argument("--collect-mode", choices=["auto", "hardlink", "reflink", "copy"], default=None,
+                        help="How pipeline outputs are collected into output/ (default: auto = hardlink, "
+                             "then reflink/copy_file_range, then copy)")
+    parser.add_argument("--mock-llm", default=None, metavar="URL|auto",
+                        help="Run both pipelines against an OpenAI-compatible mock server "
+                             "(e.g. http://127.0.0.1:8765/v1, or 'auto' to start one in-process)")
+    parser.add_argument("--image-max-side", type=int, default=None,
+                        help="Downscale interface images to this many pixels before the image analyzer "
+                             "(default: send the original images)")
+    parser.add_argument("--image-colors", type=int, default=None,
+                        help="Palette size of preprocessed interface images (default: 128, 0 = full color)")
+    parser.add_argument("--no-widget-reuse", action="store_true",
+                        help="Always run the image analyzer instead of reusing widgets of identical or "
+                             "near-identical interface images")
+    parser.add_argument("--widget-reuse-across-models", action="store_true",
+                        help="Also reuse widgets detected by another model, reasoning level or persona set "
+                             "(default: only the same combination settings)")
+    parser.add_argument("--widget-reuse-threshold", type=int, default=None,
+                        help="Maximum perceptual-hash distance (of 1024 bits) for widget reuse (default: 16, "
+                             "0 = identical images only)")
+    parser.add_argument("--context-budget", type=int, default=None,
+                        help="Warn before the sweep when a stage's estimated prompt exceeds this many tokens "
+                             "(default: 128000)")
+    parser.add_argument("--max-latency", type=float, default=None,
+                        help="Warn before the sweep when a stage's estimated call time exceeds this many seconds "
+                             "(default: 180)")
+    parser.add_argument("--max-cost", type=float, default=None,
+                        help="Cost ceiling in USD: downgrade reasoning, then stop scheduling combinations "
+                             "once the projected sweep cost would exceed it")
+    parser.add_argument("--max-wall-time", type=float, default=None,
+                        help="Wall-time ceiling in seconds for the sweep, enforced the same way")
+    parser.add_argument("--rate-limit", type=float, default=None,
+                        help="Share a host-wide limit of this many LLM requests per second across all pipelines, "
+                             "with adaptive concurrency")
+    parser.add_argument("--max-llm-concurrency", type=int, default=None,
+                        help="Upper bound for the adaptive number of in-flight LLM calls (default: 32)")
+    parser.add_argument("--target-latency", type=float, default=None,
+                        help="Stop growing LLM concurrency while calls take longer than this many seconds "
+                             "(default: 60)")
+    parser.add_argument("--request-policy", choices=["none", "retry", "hedged"], default=None,
+                        help="LLM request policy of both pipelines: no retries, retries with jittered exponential "
+                             "backoff, or retries plus a duplicate request after the stage's p90 latency")
+    parser.add_argument("--retries", type=int, default=None,
+                        help="Retries per LLM request under the request policy (default: 3)")
+    parser.add_argument("--hedge-quantile", type=float, default=None,
+                        help="Stage latency quantile after which a hedged request is duplicated (default: 0.9)")
+    parser.add_argument("--run-timeout", type=float, default=None,
+                        help="Kill a pipeline run after this many seconds, salvage its partial outputs and move on")
+    parser.add_argument("--stage-timeout", type=float, default=None,
+                        help="Kill a pipeline run when one stage takes longer than this many seconds")
+    parser.add_argument("--idle-timeout", type=float, default=None,
+                        help="Kill a pipeline run that prints no output line for this many seconds")
+    parser.add_argument("--resume", default=None, metavar="EXECUTION_ID",
+                        help="Resume an interrupted sweep from its journal: re-run only the combinations "
+                             "not done yet, then write the report")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Do not read or write the result cache")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached results but store the fresh ones")
+    parser.add_argument("--cache-max-mb", type=int, default=None,
+                        help="Result cache size limit in MB before LRU eviction (default: 2048)")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be >= 1")
+    return args
+
+
+def _choose_setup() -> Tuple[str, str, List[str], str, Dict[str, Any]]:
+    """Ask for mode, persona, cases, label, advanced parameters and MAX_AUDIT interactively"""
     mode = choose_mode()
     persona = choose_persona()
     cases = choose_cases()
@@ -417,8 +686,96 @@ def main() -> int:
         print(f"[WARN] Invalid MAX_AUDIT input, using default 3 ({e})")
         os.environ["MAX_AUDIT"] = "3"
 
-    execution_id = compute_execution_id(persona, mode, label)
-    print(f"Execution ID: {execution_id}")
+    return mode, persona, cases, label, advanced_params
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.collect_mode:
+        os.environ["EXPERIMENT_COLLECT_MODE"] = args.collect_mode
+    if args.image_max_side is not None:
+        os.environ["EXPERIMENT_IMAGE_MAX_SIDE"] = str(args.image_max_side)
+    if args.image_colors is not None:
+        os.environ["EXPERIMENT_IMAGE_COLORS"] = str(args.image_colors)
+    if args.no_widget_reuse:
+        os.environ["EXPERIMENT_WIDGET_REUSE"] = "0"
+    if args.widget_reuse_across_models:
+        os.environ["EXPERIMENT_WIDGET_REUSE_ACROSS_MODELS"] = "1"
+    if args.widget_reuse_threshold is not None:
+        os.environ["EXPERIMENT_WIDGET_REUSE_THRESHOLD"] = str(args.widget_reuse_threshold)
+    if args.request_policy or args.retries is not None or args.hedge_quantile is not None:
+        policy_module = _load_sibling("request_policy")
+        policy = policy_module.build_policy(args.request_policy or "retry", retries=args.retries,
+                                            hedge_quantile=args.hedge_quantile)
+        os.environ[policy_module.REQUEST_POLICY_ENV] = json.dumps(policy)
+    for limit, variable in ((args.run_timeout, "EXPERIMENT_RUN_TIMEOUT"), (args.stage_timeout, "EXPERIMENT_STAGE_TIMEOUT"),
+                            (args.idle_timeout, "EXPERIMENT_IDLE_TIMEOUT")):
+        if limit is not None:
+            os.environ[variable] = str(limit)
+    print_banner()
+    ensure_dirs()
+    
+    if args.rate_limit:
+        rate_module = _load_sibling("rate_limiter")
+        state_file = os.environ.get(rate_module.RATE_LIMIT_FILE_ENV, rate_module.DEFAULT_STATE_FILE)
+        limiter = rate_module.RateLimiter(state_file)
+        limiter.configure(rate=args.rate_limit,
+                          max_concurrency=args.max_llm_concurrency or rate_module.DEFAULT_MAX_CONCURRENCY,
+                          target_latency=args.target_latency or rate_module.DEFAULT_TARGET_LATENCY)
+        os.environ[rate_module.RATE_LIMIT_FILE_ENV] = state_file
+        print(f"[RATE] Shared LLM rate limiter at {state_file}: {rate_module.describe_limits(state_file)}")
+    
+    if args.mock_llm:
+        base_url = args.mock_llm
+        if base_url == "auto":
+            mock_module = _load_sibling("mock_llm_server")
+            _, base_url = mock_module.start_mock_server()
+        _load_sibling("utils").configure_mock_llm(base_url)
+        print(f"Using mock LLM server: {base_url}")
+    
+    # Validate OpenAI API key if available (not needed against the mock server)
+    if OrchestratorUI and not args.mock_llm:
+        ui = OrchestratorUI()
+        if not ui.validate_openai_key():
+            return 1
+    
+    # Collect setup parameters (from the journal when resuming an interrupted sweep)
+    journal_module = _load_sibling("sweep_journal")
+    resumed_setup = None
+    if args.resume:
+        resumed_setup = journal_module.load_journal(
+            journal_module.journal_path(args.resume, os.path.join(os.path.dirname(__file__), "output")))["setup"]
+        if not resumed_setup:
+            print(f"No sweep journal found for execution ID {args.resume}")
+            return 1
+        mode, persona, cases, label = (resumed_setup[k] for k in ("mode", "persona", "cases", "label"))
+        advanced_params = resumed_setup["advanced_params"]
+        os.environ["MAX_AUDIT"] = str(resumed_setup.get("max_audit", "3"))
+        execution_id = args.resume
+        print(f"Resuming execution ID: {execution_id}")
+    else:
+        mode, persona, cases, label, advanced_params = _choose_setup()
+        execution_id = compute_execution_id(persona, mode, label)
+        print(f"Execution ID: {execution_id}")
+    
+    # Compile the persona set once into stable per-agent prompt prefixes for the pipelines
+    bundle_module = _load_sibling("persona_bundle")
+    bundle_path = bundle_module.write_bundle(persona, os.environ["INPUT_PERSONA_DIR"])
+    os.environ[bundle_module.PERSONA_BUNDLE_ENV] = bundle_path
+    bundle = bundle_module.load_bundle(bundle_path)
+    print(f"Persona bundle: {bundle['sha256'][:16]} "
+          f"({sum(a['tokens'] for a in bundle['agents'].values())} prefix tokens over {len(bundle['agents'])} agents)")
+    
+    # Flag persona/case/stage prompts over the context or latency budget before launching the sweep
+    budget_module = _load_sibling("token_budget")
+    budget = budget_module.budget_matrix(
+        [persona], cases, int(os.environ.get("EXPERIMENT_IMAGE_MAX_SIDE") or 0),
+        args.context_budget or budget_module.DEFAULT_CONTEXT_BUDGET,
+        args.max_latency or budget_module.DEFAULT_MAX_LATENCY,
+        persona_dir=os.environ["INPUT_PERSONA_DIR"], netlogo_dir=os.environ["INPUT_NETLOGO_DIR"]
+    )
+    for flag in budget["flagged"]:
+        print(f"[BUDGET] {flag['case']} / {flag['stage']}: {flag['reason']}")
     
     # Run pipeline(s)
     setup = {
@@ -428,13 +785,38 @@ def main() -> int:
         "label": label,
         "execution_id": execution_id,
         "timestamp": datetime.now().isoformat(),
-        "advanced_params": advanced_params
+        "advanced_params": advanced_params,
+        "jobs": args.jobs,
+        "persona_bundle": bundle["sha256"],
+        "max_audit": os.environ.get("MAX_AUDIT", "3")
     }
+    if resumed_setup:
+        setup["timestamp"] = resumed_setup.get("timestamp", setup["timestamp"])
+        setup["resumed_at"] = datetime.now().isoformat()
+    
+    # Checkpoint every combination so an interrupted sweep can be resumed with --resume
+    journal = journal_module.SweepJournal(journal_module.journal_path(
+        execution_id, os.path.join(os.path.dirname(__file__), "output")))
+    journal.record_setup(setup)
+    
+    # The report is kept up to date as combinations finish; the final write only adds what is left
+    report_writer = _load_sibling("results_writer").IncrementalReportWriter(
+        os.path.dirname(__file__), execution_id, setup)
+    
+    # Canned mock outputs must never be stored under (or restored from) the keys of real runs
+    use_cache = not args.no_cache and not args.mock_llm
+    if args.mock_llm and not args.no_cache:
+        print("[CACHE] Result cache disabled with --mock-llm")
     
-    results = run_pipeline(mode, persona, cases, execution_id, advanced_params)
+    results = run_pipeline(mode, persona, cases, execution_id, advanced_params, jobs=args.jobs,
+                           use_cache=use_cache, refresh_cache=args.refresh,
+                           cache_max_bytes=args.cache_max_mb * 1024 * 1024 if args.cache_max_mb else None,
+                           max_cost=args.max_cost, max_wall_time=args.max_wall_time, journal=journal,
+                           report_writer=report_writer,
+                           token_estimates=_load_sibling("budget_governor").estimates_from_budget(budget))
     
     # Generate report
-    report_path = generate_report(execution_id, setup, results)
+    report_path = report_writer.finalize(results)
     print(f"Report generated: {report_path}")
     
     return 0
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Offline OpenAI-compatible mock LLM server.
+
+Serves the subset of the OpenAI API used by the pipelines (Responses API,
+Chat Completions and the model list) with canned, stage-aware outputs built
+from input/input-valid-examples. Latency, jitter, slow-response tail, 429 and 5xx injection are
+configurable so that the runner stack can be smoke-tested and benchmarked
+without an API key or real model latency.
+
+Usage:
+    python mock_llm_server.py --port 8765 --latency 0.2 --jitter 0.1 --rate-429 0.05
+    python main.py --mock-llm http://127.0.0.1:8765/v1
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+VALID_EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input", "input-valid-examples")
+
+MOCK_API_KEY = "sk-mock-offline"
+
+
+def _read_text(path: str, default: str = "") -> str:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return default
+
+
+def _compliant_audit() -> str:
+    return json.dumps({
+        "data": {
+            "verdict": "compliant",
+            "non-compliant-rules": [],
+            "fix_suggestions": [],
+            "coverage": {"evaluated": [], "not_applicable": [], "missing_evaluation": [], "total_rules_in_dsl": "0"}
+        },
+        "errors": None
+    }, indent=2)
+
+
+def build_default_templates(examples_dir: str = VALID_EXAMPLES_DIR) -> List[Tuple[str, str]]:
+    """
+    Canned outputs as (keyword, text) pairs, checked in order against the
+    lower-cased prompt. The last entry ("") is the catch-all.
+    """
+    widgets_raw = _read_text(os.path.join(examples_dir, "agent_2a_widget_examples.json"), "{}")
+    try:
+        widgets = json.dumps(json.loads(widgets_raw).get("valid_examples", []), indent=2)
+    except ValueError:
+        widgets = "[]"
+    diagram = _read_text(os.path.join(examples_dir, "valid-example-diagram.puml"), "@startuml\n@enduml\n")
+    concepts = _read_text(os.path.join(examples_dir, "valid-example-environment-model-concepts.md"), "{}")
+    scenario = json.dumps({
+        "data": {
+            "scenario": {
+                "name": "mockScenario",
+                "messages": [
+                    {"source": "theCreator", "target": "System", "event_type": "output_event",
+                     "event_name": "oeCreateSystemAndEnvironment", "parameters": "4"},
+                    {"source": "System", "target": "theCreator", "event_type": "input_event",
+                     "event_name": "ieMessage", "parameters": "created"}
+                ]
+            }
+        },
+        "errors": None
+    }, indent=2)
+    return [
+        ("auditor", _compliant_audit()),
+        ("widget", widgets),
+        ("interface image", widgets),
+        ("plantuml", diagram),
+        ("scenario", scenario),
+        ("operation model", concepts),
+        ("", concepts),
+    ]
+
+
+def load_canned_dir(canned_dir: str) -> List[Tuple[str, str]]:
+    """Files <keyword>.txt in canned_dir override the built-in outputs for prompts containing <keyword>."""
+    templates = []
+    for name in sorted(os.listdir(canned_dir)):
+        if name.endswith(".txt"):
+            templates.append((name[:-len(".txt")].lower(), _read_text(os.path.join(canned_dir, name))))
+    return templates
+
+
+def _prompt_text(payload: Dict[str, Any]) -> str:
+    """Flatten instructions/input (Responses) or messages (Chat) into one string."""
+    parts: List[str] = []
+
+    def _collect(node: Any) -> None:
+        if isinstance(node, str):
+            parts.append(node)
+        elif isinstance(node, list):
+            for item in node:
+                _collect(item)
+        elif isinstance(node, dict):
+            for key in ("text", "content", "input_text"):
+                if key in node:
+                    _collect(node[key])
+
+    _collect(payload.get("instructions"))
+    _collect(payload.get("input"))
+    _collect(payload.get("messages"))
+    return "\n".join(parts)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockConfig:
+    """Server behaviour shared by all request handler threads."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, rate_429: float = 0.0,
+                 rate_5xx: float = 0.0, seed: Optional[int] = None,
+                 templates: Optional[List[Tuple[str, str]]] = None,
+                 slow_rate: float = 0.0, slow_latency: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        # Fraction of requests delayed by slow_latency extra seconds (heavy latency tail)
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.templates = templates or build_default_templates()
+        self.stats = {"requests": 0, "ok": 0, "429": 0, "5xx": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, float]:
+        """Return (delay_seconds, fault_roll) from the seeded generator."""
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+            if self.slow_rate > 0 and self._rng.random() < self.slow_rate:
+                delay += self.slow_latency
+            return delay, self._rng.random()
+
+    def count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def answer(self, prompt: str) -> str:
+        lowered = prompt.lower()
+        for keyword, text in self.templates:
+            if keyword in lowered:
+                return text
+        return ""
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    server_version = "MockLLM/1.0"
+    config: MockConfig
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Keep the console quiet; /stats exposes request counts
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_json(status, {"error": {"message": message, "type": error_type, "param": None, "code": None}}, headers)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [
+                {"id": "gpt-5-nano-2025-08-07", "object": "model", "created": 0, "owned_by": "mock"},
+                {"id": "gpt-5-mini-2025-08-07", "object": "model", "created": 0, "owned_by": "mock"},
+                {"id": "gpt-5-2025-08-07", "object": "model", "created": 0, "owned_by": "mock"},
+            ]})
+        elif self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, dict(self.config.stats))
+        else:
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+
+        path = self.path.rstrip("/")
+        if not (path.endswith("/responses") or path.endswith("/chat/completions")):
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+            return
+        if payload.get("stream"):
+            self._send_error(400, "Streaming is not supported by the mock server", "invalid_request_error")
+            return
+
+        delay, roll = self.config.draw()
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.config.rate_429:
+            self.config.count("429")
+            self._send_error(429, "Rate limit reached (mock)", "rate_limit_error", {"Retry-After": "1"})
+            return
+        if roll < self.config.rate_429 + self.config.rate_5xx:
+            self.config.count("5xx")
+            self._send_error(503, "Service unavailable (mock)", "server_error")
+            return
+
+        prompt = _prompt_text(payload)
+        text = self.config.answer(prompt)
+        model = payload.get("model", "gpt-5-nano-2025-08-07")
+        input_tokens = _estimate_tokens(prompt)
+        output_tokens = _estimate_tokens(text)
+        created = int(time.time())
+        self.config.count("ok")
+
+        if path.endswith("/responses"):
+            self._send_json(200, {
+                "id": f"resp_{uuid.uuid4().hex}",
+                "object": "response",
+                "created_at": created,
+                "status": "completed",
+                "model": model,
+                "output": [{
+                    "type": "message",
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "status": "completed",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}]
+                }],
+                "parallel_tool_calls": False,
+                "tool_choice": "auto",
+                "tools": [],
+                "usage": {
+                    "input_tokens": input_tokens,
+                    "input_tokens_details": {"cached_tokens": 0},
+                    "output_tokens": output_tokens,
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                    "total_tokens": input_tokens + output_tokens
+                }
+            })
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens
+                }
+            })
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, config: Optional[MockConfig] = None) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start the mock server on a daemon thread.
+
+    Returns:
+        (server, base_url) where base_url ends with /v1; call server.shutdown() to stop
+    """
+    handler = type("ConfiguredMockLLMHandler", (MockLLMHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/v1"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests answered slowly")
+    parser.add_argument("--slow-latency", type=float, default=0.0, help="Extra latency of slow requests in seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and fault injection")
+    parser.add_argument("--canned-dir", default=None,
+                        help="Directory of <keyword>.txt outputs overriding the built-in templates")
+    args = parser.parse_args()
+
+    templates = build_default_templates()
+    if args.canned_dir:
+        templates = load_canned_dir(args.canned_dir) + templates
+    config = MockConfig(args.latency, args.jitter, args.rate_429, args.rate_5xx, args.seed, templates,
+                        args.slow_rate, args.slow_latency)
+    server, base_url = start_mock_server(args.host, args.port, config)
+    print(f"Mock LLM server listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"Stopped. Stats: {json.dumps(config.stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+NetLogo source indexer and procedure-level chunker.
+
+Parses a case's NetLogo code into an index of breeds, globals, *-own
+variables and to/to-report procedures with their call graph. Indexes are
+cached on disk keyed by the file's SHA-256, so each file is parsed once.
+chunk_procedures() groups procedures along the call graph into chunks under
+a size budget, so generator stages can map-reduce over procedure groups
+instead of sending one giant prompt for large cases.
+
+Usage:
+    python netlogo_index.py continental-divide --max-chars 12000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from result_cache import file_digest
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NETLOGO_DIR = os.path.join(BASE_DIR, "input", "input-netlogo")
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "output", ".cache", "netlogo_index")
+# Bump when the index format changes so stale cache entries are ignored
+INDEX_VERSION = 1
+DEFAULT_MAX_CHARS = 12000
+ENTRY_PROCEDURES = ("setup", "go")
+
+BREED_KEYWORDS = ("breed", "directed-link-breed", "undirected-link-breed")
+
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]()]|[^\s\[\]()";]+')
+
+
+def _strip_comment(line: str) -> str:
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(line):
+        if escaped:
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == '"':
+            in_string = not in_string
+        elif ch == ";" and not in_string:
+            return line[:i]
+    return line
+
+
+def _tokenize(text: str) -> List[Tuple[str, int]]:
+    """Return (token, line_number) pairs, dropping ; comments outside strings."""
+    tokens = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        for match in _TOKEN_RE.finditer(_strip_comment(line)):
+            tokens.append((match.group(0), number))
+    return tokens
+
+
+def _read_bracket(tokens: List[Tuple[str, int]], i: int) -> Tuple[List[str], int]:
+    """Read a [ ... ] list starting at tokens[i] == '['; return (items, index after ']')."""
+    items = []
+    depth = 0
+    while i < len(tokens):
+        token = tokens[i][0]
+        i += 1
+        if token == "[":
+            depth += 1
+            if depth == 1:
+                continue
+        elif token == "]":
+            depth -= 1
+            if depth == 0:
+                break
+        items.append(token)
+    return items, i
+
+
+def parse_netlogo(text: str) -> Dict[str, Any]:
+    """
+    Parse NetLogo source into an index.
+
+    Returns:
+        {"globals": [...], "breeds": [{"plural", "singular", "kind"}],
+         "owns": {agentset: [variables]}, "extensions": [...],
+         "procedures": {name: {"reporter", "args", "start_line", "end_line",
+                               "chars", "calls", "called_by"}},
+         "lines": total line count}
+        Names are lower-cased, as NetLogo identifiers are case-insensitive.
+    """
+    lines = text.splitlines()
+    tokens = _tokenize(text)
+    index: Dict[str, Any] = {"globals": [], "breeds": [], "owns": {}, "extensions": [], "procedures": {},
+                             "lines": len(lines)}
+    bodies: Dict[str, List[str]] = {}
+
+    i = 0
+    while i < len(tokens):
+        token, line = tokens[i]
+        keyword = token.lower()
+        has_list = i + 1 < len(tokens) and tokens[i + 1][0] == "["
+        if keyword in ("to", "to-report") and i + 1 < len(tokens):
+            name = tokens[i + 1][0].lower()
+            i += 2
+            args: List[str] = []
+            if i < len(tokens) and tokens[i][0] == "[" and tokens[i][1] == line:
+                args, i = _read_bracket(tokens, i)
+            body = []
+            end_line = line
+            while i < len(tokens):
+                body_token, end_line = tokens[i]
+                i += 1
+                if body_token.lower() == "end":
+                    break
+                body.append(body_token.lower())
+            index["procedures"][name] = {
+                "reporter": keyword == "to-report",
+                "args": [a.lower() for a in args],
+                "start_line": line,
+                "end_line": end_line,
+                "chars": len("\n".join(lines[line - 1:end_line])),
+                "calls": [],
+                "called_by": [],
+            }
+            bodies[name] = body
+            continue
+        if has_list and (keyword in ("globals", "extensions") or keyword.endswith("-own")):
+            items, i = _read_bracket(tokens, i + 1)
+            items = [item.lower() for item in items]
+            if keyword == "globals":
+                index["globals"].extend(items)
+            elif keyword == "extensions":
+                index["extensions"].extend(items)
+            else:
+                index["owns"].setdefault(keyword[:-len("-own")], []).extend(items)
+            continue
+        if has_list and keyword in BREED_KEYWORDS:
+            items, i = _read_bracket(tokens, i + 1)
+            if items:
+                index["breeds"].append({"plural": items[0].lower(),
+                                        "singular": items[1].lower() if len(items) > 1 else None,
+                                        "kind": keyword})
+            continue
+        if has_list:
+            # Other top-level lists (__includes, ...)
+            _, i = _read_bracket(tokens, i + 1)
+            continue
+        i += 1
+
+    # Call graph: body tokens that name a defined procedure
+    for name, body in bodies.items():
+        calls = []
+        for body_token in body:
+            if body_token in index["procedures"] and body_token not in calls:
+                calls.append(body_token)
+        index["procedures"][name]["calls"] = calls
+        for callee in calls:
+            index["procedures"][callee]["called_by"].append(name)
+    return index
+
+
+def case_code_path(case: str, netlogo_dir: str = NETLOGO_DIR) -> str:
+    return os.path.join(netlogo_dir, f"{case}-netlogo-code.md")
+
+
+def index_file(path: str, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Index a NetLogo file, reusing the on-disk index cached under its SHA-256.
+
+    Args:
+        path: NetLogo source file
+        cache_dir: Cache directory; None disables the disk cache
+
+    Returns:
+        The parse_netlogo() index plus "sha256" and "path"
+    """
+    digest = file_digest(path)
+    cache_path = os.path.join(cache_dir, f"{digest}-v{INDEX_VERSION}.json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            index["path"] = path
+            return index
+        except (OSError, ValueError):
+            pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        index = parse_netlogo(f.read())
+    index["sha256"] = digest
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(temp_path, cache_path)
+    index["path"] = path
+    return index
+
+
+def procedure_order(index: Dict[str, Any]) -> List[str]:
+    """
+    Procedures in call-graph order: depth-first from setup/go, then from the
+    remaining roots (procedures nobody calls), then whatever is left (cycles).
+    """
+    procedures = index["procedures"]
+    roots = [name for name in ENTRY_PROCEDURES if name in procedures]
+    roots += [name for name in procedures if not procedures[name]["called_by"] and name not in roots]
+    roots += list(procedures)
+    order: List[str] = []
+    seen = set()
+    for root in roots:
+        stack = [root]
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            order.append(name)
+            stack.extend(reversed([callee for callee in procedures[name]["calls"] if callee not in seen]))
+    return order
+
+
+def header_text(index: Dict[str, Any]) -> str:
+    """Declarations shared by every chunk: extensions, breeds, globals and *-own variables."""
+    parts = []
+    if index["extensions"]:
+        parts.append(f"extensions [ {' '.join(index['extensions'])} ]")
+    for breed in index["breeds"]:
+        names = " ".join(name for name in (breed["plural"], breed["singular"]) if name)
+        parts.append(f"{breed['kind']} [ {names} ]")
+    if index["globals"]:
+        parts.append(f"globals [ {' '.join(index['globals'])} ]")
+    for agentset, variables in index["owns"].items():
+        parts.append(f"{agentset}-own [ {' '.join(variables)} ]")
+    return "\n".join(parts)
+
+
+def _split_lines(lines: List[str], budget: int) -> List[List[str]]:
+    """Pack lines into parts of at most budget chars; a longer line is cut at whitespace."""
+    pieces: List[str] = []
+    for line in lines:
+        while len(line) > budget:
+            cut = line.rfind(" ", 0, budget + 1)
+            cut = cut if cut > 0 else budget
+            pieces.append(line[:cut])
+            line = line[cut:].lstrip(" ")
+        pieces.append(line)
+    parts: List[List[str]] = [[]]
+    size = 0
+    for piece in pieces:
+        if parts[-1] and size + len(piece) + 1 > budget:
+            parts.append([])
+            size = 0
+        parts[-1].append(piece)
+        size += len(piece) + 1
+    return parts
+
+
+def chunk_procedures(index: Dict[str, Any], text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[Dict[str, Any]]:
+    """
+    Group procedures into chunks of at most max_chars of source, following the call graph.
+
+    Procedures are packed in procedure_order(), so callers and callees tend to
+    share a chunk. A procedure larger than max_chars (e.g. a literal data
+    reporter) is split on line boundaries into consecutive chunks of its own,
+    each starting with a "; <name> part i/n" comment, and does not break the
+    group being packed.
+
+    Returns:
+        [{"procedures": [...], "chars", "text", "calls_out": [procedures called
+          but defined in other chunks]}], plus "part" and "parts" on the chunks
+        of a split procedure; prepend header_text(index) to each chunk's text
+        when building prompts
+    """
+    lines = text.splitlines()
+    procedures = index["procedures"]
+    groups: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for name in procedure_order(index):
+        chars = procedures[name]["chars"]
+        if chars > max_chars:
+            # Oversized procedures go alone without splitting the current group
+            groups.append([name])
+            continue
+        # Procedures of a chunk are joined by a blank line
+        if current and size + 2 + chars > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(name)
+        size += chars + (2 if size else 0)
+    if current:
+        groups.append(current)
+
+    chunks = []
+    for group in groups:
+        members = set(group)
+        calls_out = sorted({callee for name in group for callee in procedures[name]["calls"]} - members)
+        if len(group) == 1 and procedures[group[0]]["chars"] > max_chars:
+            name = group[0]
+            marker = f"; {name} part {{}}/{{}}"
+            body = lines[procedures[name]["start_line"] - 1:procedures[name]["end_line"]]
+            parts = _split_lines(body, max(1, max_chars - len(marker.format(99999, 99999)) - 1))
+            for i, part in enumerate(parts, start=1):
+                source = "\n".join([marker.format(i, len(parts))] + part)
+                chunks.append({"procedures": group, "chars": len(source), "text": source, "calls_out": calls_out,
+                               "part": i, "parts": len(parts)})
+            continue
+        source = "\n\n".join("\n".join(lines[procedures[name]["start_line"] - 1:procedures[name]["end_line"]])
+                             for name in group)
+        chunks.append({"procedures": group, "chars": len(source), "text": source, "calls_out": calls_out})
+    return chunks
+
+
+def chunk_case(case: str, max_chars: int = DEFAULT_MAX_CHARS, netlogo_dir: str = NETLOGO_DIR,
+               cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Index (cached) and chunk a case's NetLogo code; returns (index, chunks)."""
+    path = case_code_path(case, netlogo_dir)
+    index = index_file(path, cache_dir)
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return index, chunk_procedures(index, text, max_chars)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Index and chunk NetLogo source code")
+    parser.add_argument("source", help="Case name (e.g. boiling) or path to a NetLogo code file")
+    parser.add_argument("--max-chars", type=int, default=DEFAULT_MAX_CHARS, help="Chunk size budget in characters")
+    parser.add_argument("--json", action="store_true", help="Print the index and chunk list as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk index cache")
+    args = parser.parse_args(argv)
+
+    path = args.source if os.path.isfile(args.source) else case_code_path(args.source)
+    if not os.path.isfile(path):
+        print(f"NetLogo file not found: {path}")
+        return 1
+    index = index_file(path, None if args.no_cache else DEFAULT_CACHE_DIR)
+    with open(path, "r", encoding="utf-8") as f:
+        chunks = chunk_procedures(index, f.read(), args.max_chars)
+
+    if args.json:
+        print(json.dumps({"index": index, "chunks": [{k: v for k, v in chunk.items() if k != "text"}
+                                                     for chunk in chunks]}, indent=2))
+        return 0
+    print(f"{path} ({index['lines']} lines, sha256 {index['sha256'][:12]})")
+    print(f"  breeds: {', '.join(b['plural'] for b in index['breeds']) or '-'}")
+    print(f"  globals: {len(index['globals'])}, own variables: "
+          f"{sum(len(v) for v in index['owns'].values())}, procedures: {len(index['procedures'])}")
+    for i, chunk in enumerate(chunks, start=1):
+        part = f" (part {chunk['part']}/{chunk['parts']})" if "part" in chunk else ""
+        print(f"  chunk {i}: {chunk['chars']} chars, {len(chunk['procedures'])} procedure(s): "
+              f"{', '.join(chunk['procedures'])}{part}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
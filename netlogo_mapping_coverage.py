@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Local NetLogo -> LUCIM Operation Model mapping stage.
+
+Uses the NetLogo index (netlogo_index.py) and, when available, the interface
+widgets detected by Agent 2a to precompute the mapping that
+RULES_MAPPING_NETLOGO_TO_OPERATION_MODEL.md asks the LLM to derive on every
+run: candidate actors (1:1 with breeds, patches and links, plus ActEndUser),
+candidate oe*/ie* events and observables. It then checks an emitted operation
+model for unmapped agents and procedures and for orphan events, and turns the
+gaps into targeted correction instructions instead of a full regeneration.
+
+Usage:
+    python netlogo_mapping_coverage.py boiling --operation-model om.json [--widgets 02a.json]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+from check_lucim_operation_model import iter_actors, load_operation_model
+from netlogo_index import ENTRY_PROCEDURES, case_code_path, index_file
+
+END_USER_ACTOR = "ActEndUser"
+# Conventional events of the mapping rules (section 2.1) and the procedures they trace to
+CONVENTIONAL_EVENTS = {
+    "oecreatesystemandenvironment": "setup",
+    "oeadvancetick": "go",
+}
+BUTTON_WIDGETS = ("Button",)
+OBSERVABLE_WIDGETS = ("Monitor", "Plot")
+PARAMETER_WIDGETS = ("Slider", "Switch", "Chooser", "Input")
+
+
+def camel_case(name: str, capitalize: bool = True) -> str:
+    """'install-hpc' -> 'InstallHpc' (or 'installHpc')"""
+    parts = [p for p in re.split(r'[^A-Za-z0-9]+', name) if p]
+    result = "".join(p[:1].upper() + p[1:] for p in parts)
+    return result if capitalize else result[:1].lower() + result[1:]
+
+
+def _normalize(name: str) -> str:
+    """Comparable form of NetLogo and LUCIM names: 'oeInstallHpc' / 'install-hpc' -> 'installhpc'"""
+    lowered = re.sub(r'[^a-z0-9]', '', name.lower())
+    if re.match(r'^(oe|ie)[A-Z]', name):
+        lowered = lowered[2:]
+    elif re.match(r'^Act[A-Z]', name):
+        lowered = lowered[3:]
+    return lowered
+
+
+def load_widgets(path: str) -> List[Dict[str, Any]]:
+    """Agent 2a widget list from a JSON file (bare list or {"data": [...]})."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("data") or data.get("valid_examples") or []
+    return [w for w in data if isinstance(w, dict)] if isinstance(data, list) else []
+
+
+def candidate_mapping(index: Dict[str, Any], widgets: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Precompute the candidate operation model elements of a NetLogo index.
+
+    Returns:
+        {"actors": {ActType: netlogo_origin},
+         "output_events": {oeName: procedure},
+         "input_events": {ieName: origin},
+         "observables": [global or widget names],
+         "parameters": [interface globals set by the end user]}
+    """
+    widgets = widgets or []
+    procedures = index["procedures"]
+
+    actors: Dict[str, str] = {}
+    for breed in index["breeds"]:
+        actors[f"Act{camel_case(breed['singular'] or breed['plural'])}"] = breed["plural"]
+    link_breeds = any(b["kind"] != "breed" for b in index["breeds"])
+    if "patches" in index["owns"]:
+        actors["ActPatches"] = "patches"
+    if "turtles" in index["owns"] and not any(b["kind"] == "breed" for b in index["breeds"]):
+        actors["ActTurtles"] = "turtles"
+    if "links" in index["owns"] and not link_breeds:
+        actors["ActLinks"] = "links"
+    if "go" in procedures:
+        actors["ActClock"] = "go"
+    if "setup" in procedures:
+        actors["ActMsrCreator"] = "setup"
+    actors[END_USER_ACTOR] = "end user"
+
+    button_procedures = [w["name"].lower() for w in widgets
+                         if w.get("type") in BUTTON_WIDGETS and str(w.get("name", "")).lower() in procedures]
+    output_events: Dict[str, str] = {}
+    for name in list(ENTRY_PROCEDURES) + button_procedures + expected_procedures(index, widgets):
+        if name not in procedures or name in output_events.values():
+            continue
+        if name == "setup":
+            output_events["oeCreateSystemAndEnvironment"] = name
+        elif name == "go":
+            output_events["oeAdvanceTick"] = name
+        else:
+            output_events[f"oe{camel_case(name)}"] = name
+
+    input_events: Dict[str, str] = {}
+    observables = []
+    for widget in widgets:
+        if widget.get("type") in OBSERVABLE_WIDGETS and widget.get("name"):
+            observables.append(widget["name"])
+            input_events[f"ie{camel_case(widget['name'])}"] = f"{widget['type'].lower()} {widget['name']}"
+    for name, procedure in procedures.items():
+        if procedure["reporter"] and not procedure["called_by"]:
+            input_events.setdefault(f"ie{camel_case(name)}", f"reporter {name}")
+    observables.extend(g for g in index["globals"] if g not in observables)
+    input_events["ieNotifyUser"] = "end user notifications"
+
+    parameters = [w["name"] for w in widgets if w.get("type") in PARAMETER_WIDGETS and w.get("name")]
+    return {"actors": actors, "output_events": output_events, "input_events": input_events,
+            "observables": observables, "parameters": parameters}
+
+
+def expected_procedures(index: Dict[str, Any], widgets: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+    """
+    Procedures the operation model should trace: setup/go, procedures bound to
+    buttons, and command procedures nobody calls (externally triggered).
+    """
+    procedures = index["procedures"]
+    expected = [name for name in ENTRY_PROCEDURES if name in procedures]
+    for widget in widgets or []:
+        name = str(widget.get("name", "")).lower()
+        if widget.get("type") in BUTTON_WIDGETS and name in procedures and name not in expected:
+            expected.append(name)
+    for name, procedure in procedures.items():
+        if not procedure["reporter"] and not procedure["called_by"] and name not in expected \
+                and name != "startup":
+            expected.append(name)
+    return expected
+
+
+def _trace_target(source: str) -> str:
+    """'globals.river-level' / 'install-hpc (completion)' -> NetLogo name"""
+    words = source.split()
+    return words[0].rsplit(".", 1)[-1] if words else ""
+
+
+def _operation_model_elements(operation_model: Any) -> Dict[str, Any]:
+    if isinstance(operation_model, str):
+        operation_model, _ = load_operation_model(operation_model)
+    model = operation_model or {}
+    if not isinstance(model, dict):
+        model = {}
+    if isinstance(model.get("data"), dict):
+        model = model["data"]
+    actors: List[str] = []
+    events: Dict[str, str] = {}
+    for actor_type, actor, actor_events in iter_actors(model):
+        if actor is not None:
+            actors.append(actor_type)
+        for _, name, _ in actor_events:
+            events[name] = actor_type
+    traceability = model.get("traceability") if isinstance(model.get("traceability"), dict) else {}
+    return {"actors": actors, "events": events, "traceability": traceability}
+
+
+def check_mapping_coverage(index: Dict[str, Any], operation_model: Any,
+                           widgets: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Compare an operation model with the NetLogo index.
+
+    Traceability entries of the operation model ("traceability": {"actors",
+    "events"}) are used when present; otherwise events and actors are matched
+    to procedures and agents by normalized name.
+
+    Returns:
+        {"missing_actors": [{"actor", "origin"}], "unmapped_procedures": [...],
+         "orphan_events": [...], "procedure_coverage": 0..1,
+         "candidates": candidate_mapping(), "corrections": [instructions]}
+    """
+    widgets = widgets or []
+    om = _operation_model_elements(operation_model)
+    candidates = candidate_mapping(index, widgets)
+    procedures = index["procedures"]
+    known_names = set(procedures) | set(index["globals"]) | {str(w.get("name", "")).lower() for w in widgets}
+    known_normalized = {_normalize(name): name for name in known_names}
+
+    # Event -> NetLogo elements it traces to
+    traced_events: Dict[str, List[str]] = {}
+    trace = om["traceability"].get("events") if isinstance(om["traceability"].get("events"), dict) else {}
+    for event in om["events"]:
+        sources = [str(s).lower() for s in (trace.get(event) or [])]
+        if not sources:
+            conventional = CONVENTIONAL_EVENTS.get(event.lower())
+            if conventional in procedures:
+                sources = [conventional]
+            elif _normalize(event) in known_normalized:
+                sources = [known_normalized[_normalize(event)]]
+        traced_events[event] = [target for target in map(_trace_target, sources) if target in known_names]
+
+    # Procedures reached by traced events, directly or through the call graph
+    covered = set()
+    stack = [name for sources in traced_events.values() for name in sources if name in procedures]
+    while stack:
+        name = stack.pop()
+        if name in covered:
+            continue
+        covered.add(name)
+        stack.extend(procedures[name]["calls"])
+
+    expected = expected_procedures(index, widgets)
+    unmapped = [name for name in expected if name not in covered]
+    orphans = [event for event, sources in traced_events.items() if not sources]
+
+    om_actors = {_normalize(a) for a in om["actors"]}
+    actor_trace = om["traceability"].get("actors") if isinstance(om["traceability"].get("actors"), dict) else {}
+    traced_agents = {str(s).lower() for sources in actor_trace.values() for s in (sources or [])}
+    missing_actors = []
+    for actor, origin in candidates["actors"].items():
+        if origin in ("go", "setup"):
+            continue  # Conventional roles (ActClock, ActMsrCreator) are optional
+        if _normalize(actor) in om_actors or origin in traced_agents:
+            continue
+        if any(_normalize(origin).startswith(a) or a.startswith(_normalize(origin)) for a in om_actors if a):
+            continue
+        missing_actors.append({"actor": actor, "origin": origin})
+
+    corrections = []
+    for missing in missing_actors:
+        if missing["actor"] == END_USER_ACTOR:
+            corrections.append(f"Add the end-user actor {END_USER_ACTOR} (mapping rule ACT-2)")
+        else:
+            corrections.append(f"Add actor {missing['actor']} for NetLogo agents '{missing['origin']}' (ACT-1)")
+    for name in unmapped:
+        event = next((e for e, p in candidates["output_events"].items() if p == name), f"oe{camel_case(name)}")
+        corrections.append(f"Map procedure '{name}' to an event (e.g. {event}) or record it in traceability")
+    for event in orphans:
+        corrections.append(f"Trace event '{event}' to a NetLogo procedure, global or widget, or remove it")
+
+    return {
+        "missing_actors": missing_actors,
+        "unmapped_procedures": unmapped,
+        "orphan_events": orphans,
+        "procedure_coverage": (len(expected) - len(unmapped)) / len(expected) if expected else 1.0,
+        "candidates": candidates,
+        "corrections": corrections,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="NetLogo to Operation Model mapping coverage")
+    parser.add_argument("source", help="Case name (e.g. boiling) or path to a NetLogo code file")
+    parser.add_argument("--operation-model", default=None, help="Operation model JSON to check")
+    parser.add_argument("--widgets", default=None, help="Agent 2a widget JSON for the case")
+    args = parser.parse_args(argv)
+
+    path = args.source if os.path.isfile(args.source) else case_code_path(args.source)
+    if not os.path.isfile(path):
+        print(f"NetLogo file not found: {path}")
+        return 1
+    index = index_file(path)
+    widgets = load_widgets(args.widgets) if args.widgets else []
+    if not args.operation_model:
+        print(json.dumps(candidate_mapping(index, widgets), indent=2))
+        return 0
+    with open(args.operation_model, "r", encoding="utf-8") as f:
+        report = check_mapping_coverage(index, f.read(), widgets)
+    print(json.dumps(report, indent=2))
+    return 1 if report["corrections"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
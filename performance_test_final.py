@@ -1,199 +1,260 @@
 #!/usr/bin/env python3
 """
-Final performance comparison between subprocess and import-based approaches.
-This script measures execution time only.
+Benchmark suite for the experimentation runners.
+
+Runs each pipeline runner with warmup and N timed repetitions (perf_counter),
+reports median/p95/p99/stddev per phase (process spawn, pipeline, output
+discovery, copy, report), writes machine-readable JSON and compares the
+medians against a stored baseline with a regression threshold. Failed
+repetitions are left out of the timings and make the benchmark exit nonzero
+without saving a baseline.
+
+By default the pipelines are pointed at an in-process mock LLM server so that
+the numbers measure the runner stack rather than model latency and cost.
+
+Usage:
+    python performance_test_final.py --repetitions 10 --json bench.json
+    python performance_test_final.py --save-baseline bench_baseline.json
+    python performance_test_final.py --baseline bench_baseline.json --threshold 0.15
 """
 
+import argparse
+import json
+import math
 import os
+import platform
+import statistics
 import sys
-import time
 import tempfile
-import shutil
-from typing import Dict
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
 
-# No longer needed - files are now in the same directory
+import importlib.util
 
-# Import the runner modules using absolute paths
-orchestrated_path = os.path.join(os.path.dirname(__file__), "runner_orchestrated.py")
-single_agent_path = os.path.join(os.path.dirname(__file__), "runner_single_agent.py")
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
+
+PHASES = ["spawn", "pipeline", "discovery", "copy", "report", "total"]
+PIPELINES = {
+    "single_agent": ("runner_single_agent.py", "run_without_orchestration_imports"),
+    "orchestrated": ("runner_orchestrated.py", "run_with_orchestration_imports"),
+}
+
+
+def _load(module_file: str, module_name: str):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(BASE_DIR, module_file))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in [0, 100]) of a non-empty list."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (pct / 100.0) * (len(ordered) - 1)
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Distribution summary of one phase, in seconds."""
+    return {
+        "n": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_once(run_fn: Callable[..., int], writer_module, args: argparse.Namespace) -> Dict[str, Any]:
+    """One timed repetition in a fresh output directory."""
+    with tempfile.TemporaryDirectory(prefix="bench-") as temp_dir:
+        output_dir = os.path.join(temp_dir, "output", "bench")
+        run_info: Dict[str, Any] = {}
+        start = time.perf_counter()
+        exit_code = run_fn(args.repo_root, args.persona, args.case, args.model, args.reasoning,
+                           args.verbosity, output_dir, echo=False, run_info=run_info)
+        phases = dict(run_info.get("timings", {}))
+
+        report_start = time.perf_counter()
+        setup = {"mode": "bench", "persona": args.persona, "cases": [args.case], "label": "bench",
+                 "timestamp": datetime.now().isoformat(), "advanced_params": {}}
+        writer_module.write_results(temp_dir, "bench", setup, {})
+        phases["report"] = time.perf_counter() - report_start
+        phases["total"] = time.perf_counter() - start
+    return {"exit_code": exit_code, "phases": phases}
 
-import importlib.util
 
-# Load orchestrated module
-orchestrated_spec = importlib.util.spec_from_file_location("orchestrated", orchestrated_path)
-orchestrated_module = importlib.util.module_from_spec(orchestrated_spec)
-orchestrated_spec.loader.exec_module(orchestrated_module)
+def bench_pipeline(name: str, args: argparse.Namespace, writer_module) -> Dict[str, Any]:
+    module_file, function_name = PIPELINES[name]
+    run_fn = getattr(_load(module_file, f"bench_{name}"), function_name)
 
-# Load single_agent module
-single_agent_spec = importlib.util.spec_from_file_location("single_agent", single_agent_path)
-single_agent_module = importlib.util.module_from_spec(single_agent_spec)
-single_agent_spec.loader.exec_module(single_agent_module)
+    print(f"\n[{name}] warmup x{args.warmup}, repetitions x{args.repetitions}")
+    for _ in range(args.warmup):
+        run_once(run_fn, writer_module, args)
 
+    samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    failures = 0
+    for i in range(args.repetitions):
+        result = run_once(run_fn, writer_module, args)
+        if result["exit_code"] != 0:
+            # Failed repetitions stop early; their timings would skew the distribution
+            failures += 1
+        else:
+            for phase, value in result["phases"].items():
+                samples.setdefault(phase, []).append(value)
+        print(f"  rep {i + 1}/{args.repetitions}: total {result['phases']['total']:.3f}s "
+              f"(exit code {result['exit_code']})")
+
+    return {
+        "failures": failures,
+        "phases": {phase: summarize(values) for phase, values in samples.items() if values},
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+                        min_delta: float) -> List[Dict[str, Any]]:
+    """
+    Compare median phase times with a baseline report.
+
+    A phase regresses when its median grows by more than threshold (relative)
+    and by more than min_delta seconds (absolute, to ignore timer noise).
+    """
+    regressions = []
+    for pipeline, result in current["results"].items():
+        base_phases = baseline.get("results", {}).get(pipeline, {}).get("phases", {})
+        for phase, stats in result["phases"].items():
+            base = base_phases.get(phase)
+            if not base or base.get("median", 0) <= 0:
+                continue
+            delta = stats["median"] - base["median"]
+            ratio = stats["median"] / base["median"]
+            if ratio > 1 + threshold and delta > min_delta:
+                regressions.append({"pipeline": pipeline, "phase": phase, "baseline_median": base["median"],
+                                    "current_median": stats["median"], "change_pct": (ratio - 1) * 100})
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n" + "=" * 78)
+    print("BENCHMARK REPORT (seconds)")
+    print("=" * 78)
+    for pipeline, result in report["results"].items():
+        print(f"\n{pipeline} (failures: {result['failures']})")
+        print(f"  {'phase':<10} {'median':>9} {'p95':>9} {'p99':>9} {'stddev':>9} {'min':>9} {'max':>9}")
+        for phase in PHASES:
+            stats = result["phases"].get(phase)
+            if stats:
+                print(f"  {phase:<10} {stats['median']:>9.4f} {stats['p95']:>9.4f} {stats['p99']:>9.4f} "
+                      f"{stats['stddev']:>9.4f} {stats['min']:>9.4f} {stats['max']:>9.4f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the experimentation runners")
+    parser.add_argument("--repo-root", default=REPO_ROOT)
+    parser.add_argument("--pipelines", default="single_agent,orchestrated",
+                        help="Comma-separated subset of: " + ", ".join(PIPELINES))
+    parser.add_argument("--persona", default="persona-v3-limited-agents")
+    parser.add_argument("--case", default="boiling")
+    parser.add_argument("--model", default="gpt-5-nano-2025-08-07")
+    parser.add_argument("--reasoning", default="medium")
+    parser.add_argument("--verbosity", default="low")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--mock-llm", default="auto", metavar="URL|auto|none",
+                        help="Mock LLM server for the pipelines (default: auto, in-process); 'none' uses the real API")
+    parser.add_argument("--json", default=None, help="Write the JSON report to this path")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON report to compare against")
+    parser.add_argument("--save-baseline", default=None, help="Also write the report as a new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative median increase counted as a regression (default: 0.10)")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Absolute median increase in seconds below which changes are ignored")
+    args = parser.parse_args(argv)
+    if args.repetitions < 1 or args.warmup < 0:
+        parser.error("--repetitions must be >= 1 and --warmup >= 0")
+    return args
 
-def run_performance_test(test_name: str, test_func, *args, **kwargs) -> Dict:
-    """Run a performance test and return metrics."""
-    print(f"\n🧪 Running performance test: {test_name}")
-    
-    start_time = time.time()
-    
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    pipelines = [name.strip() for name in args.pipelines.split(",") if name.strip()]
+    unknown = [name for name in pipelines if name not in PIPELINES]
+    if unknown:
+        print(f"Unknown pipeline(s): {', '.join(unknown)}")
+        return 2
+
+    mock_server = None
+    if args.mock_llm != "none":
+        base_url = args.mock_llm
+        if base_url == "auto":
+            mock_server, base_url = _load("mock_llm_server.py", "mock_llm_server").start_mock_server()
+        _load("utils.py", "bench_utils").configure_mock_llm(base_url)
+        print(f"Using mock LLM server: {base_url}")
+
+    writer_module = _load("results_writer.py", "bench_writer")
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "warmup": args.warmup,
+            "repetitions": args.repetitions,
+            "case": args.case,
+            "persona": args.persona,
+            "model": args.model,
+            "mock_llm": args.mock_llm,
+        },
+        "results": {},
+    }
     try:
-        # Run the test function
-        result = test_func(*args, **kwargs)
-        
-        end_time = time.time()
-        execution_time = end_time - start_time
-        
-        metrics = {
-            "execution_time": execution_time,
-            "success": result == 0,
-            "exit_code": result
-        }
-        
-        print(f"✅ {test_name} completed in {execution_time:.3f}s")
-        return metrics
-        
-    except Exception as e:
-        end_time = time.time()
-        execution_time = end_time - start_time
-        
-        metrics = {
-            "execution_time": execution_time,
-            "success": False,
-            "error": str(e)
-        }
-        print(f"❌ {test_name} failed: {e}")
-        return metrics
-
-
-def compare_approaches():
-    """Compare subprocess vs import-based approaches."""
-    print("🚀 Starting Performance Comparison")
-    print("=" * 60)
-    
-    # Setup test environment
-    with tempfile.TemporaryDirectory() as temp_dir:
-        repo_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # Go up to project root
-        persona = "persona-v1"
-        case = "overall"
-        model = "gpt-5-nano-2025-08-07"
-        reasoning = "medium"
-        verbosity = "low"
-        output_dir = os.path.join(temp_dir, "output")
-        
-        # Ensure output directory exists
-        os.makedirs(output_dir, exist_ok=True)
-        
-        print(f"📁 Test environment: {temp_dir}")
-        print(f"📁 Repo root: {repo_root}")
-        print(f"📁 Output dir: {output_dir}")
-        
-        # Test results storage
-        results = {}
-        
-        # Test 1: Orchestrated Subprocess
-        results["orchestrated_subprocess"] = run_performance_test(
-            "Orchestrated (Subprocess)",
-            orchestrated_module.run_with_orchestration,
-            repo_root, persona, case, model, reasoning, verbosity, output_dir
-        )
-        
-        # Test 2: Orchestrated Import
-        results["orchestrated_import"] = run_performance_test(
-            "Orchestrated (Import)",
-            orchestrated_module.run_with_orchestration_imports,
-            repo_root, persona, case, model, reasoning, verbosity, output_dir
-        )
-        
-        # Test 3: Single Agent Subprocess
-        results["single_agent_subprocess"] = run_performance_test(
-            "Single Agent (Subprocess)",
-            single_agent_module.run_without_orchestration,
-            repo_root, persona, case, model, reasoning, verbosity, output_dir
-        )
-        
-        # Test 4: Single Agent Import
-        results["single_agent_import"] = run_performance_test(
-            "Single Agent (Import)",
-            single_agent_module.run_without_orchestration_imports,
-            repo_root, persona, case, model, reasoning, verbosity, output_dir
-        )
-        
-        # Generate comparison report
-        generate_comparison_report(results)
-
-
-def generate_comparison_report(results: Dict):
-    """Generate a detailed comparison report."""
-    print("\n" + "=" * 60)
-    print("📊 PERFORMANCE COMPARISON REPORT")
-    print("=" * 60)
-    
-    # Orchestrated comparison
-    print("\n🔄 ORCHESTRATED PIPELINE COMPARISON:")
-    print("-" * 40)
-    
-    subprocess_metrics = results["orchestrated_subprocess"]
-    import_metrics = results["orchestrated_import"]
-    
-    if subprocess_metrics["success"] and import_metrics["success"]:
-        time_diff = import_metrics["execution_time"] - subprocess_metrics["execution_time"]
-        time_improvement = (time_diff / subprocess_metrics["execution_time"]) * 100
-        
-        print(f"⏱️  Execution Time:")
-        print(f"   Subprocess: {subprocess_metrics['execution_time']:.3f}s")
-        print(f"   Import:     {import_metrics['execution_time']:.3f}s")
-        print(f"   Difference: {time_diff:+.3f}s ({time_improvement:+.1f}%)")
-    
-    # Single Agent comparison
-    print("\n🤖 SINGLE AGENT PIPELINE COMPARISON:")
-    print("-" * 40)
-    
-    subprocess_metrics = results["single_agent_subprocess"]
-    import_metrics = results["single_agent_import"]
-    
-    if subprocess_metrics["success"] and import_metrics["success"]:
-        time_diff = import_metrics["execution_time"] - subprocess_metrics["execution_time"]
-        time_improvement = (time_diff / subprocess_metrics["execution_time"]) * 100
-        
-        print(f"⏱️  Execution Time:")
-        print(f"   Subprocess: {subprocess_metrics['execution_time']:.3f}s")
-        print(f"   Import:     {import_metrics['execution_time']:.3f}s")
-        print(f"   Difference: {time_diff:+.3f}s ({time_improvement:+.1f}%)")
-    
-    # Summary
-    print("\n📋 SUMMARY:")
-    print("-" * 40)
-    
-    all_successful = all(result["success"] for result in results.values())
-    if all_successful:
-        print("✅ All tests completed successfully")
-        
-        # Calculate overall improvements
-        orchestrated_time_improvement = ((import_metrics["execution_time"] - subprocess_metrics["execution_time"]) / subprocess_metrics["execution_time"]) * 100
-        single_agent_time_improvement = ((import_metrics["execution_time"] - subprocess_metrics["execution_time"]) / subprocess_metrics["execution_time"]) * 100
-        
-        print(f"🚀 Import-based approach shows:")
-        print(f"   - Orchestrated: {orchestrated_time_improvement:+.1f}% time change")
-        print(f"   - Single Agent: {single_agent_time_improvement:+.1f}% time change")
-        
-        if orchestrated_time_improvement < 0 and single_agent_time_improvement < 0:
-            print("🎉 Import-based approach is FASTER!")
-        elif orchestrated_time_improvement > 0 and single_agent_time_improvement > 0:
-            print("⚠️  Import-based approach is SLOWER (expected for simulation)")
+        for name in pipelines:
+            report["results"][name] = bench_pipeline(name, args, writer_module)
+    finally:
+        if mock_server is not None:
+            mock_server.shutdown()
+
+    print_report(report)
+
+    exit_code = 0
+    failures = sum(result["failures"] for result in report["results"].values())
+    if failures:
+        print(f"\n{failures} repetition(s) failed; their timings are excluded")
+        exit_code = 1
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.threshold, args.min_delta)
+        report["regressions"] = regressions
+        if regressions:
+            print(f"\nREGRESSIONS vs {args.baseline} (threshold {args.threshold * 100:.0f}%):")
+            for r in regressions:
+                print(f"  {r['pipeline']}/{r['phase']}: {r['baseline_median']:.4f}s -> "
+                      f"{r['current_median']:.4f}s ({r['change_pct']:+.1f}%)")
+            exit_code = 1
         else:
-            print("📊 Mixed results - depends on implementation")
-    else:
-        print("❌ Some tests failed - check error messages above")
-    
-    print("\n" + "=" * 60)
+            print(f"\nNo regressions vs {args.baseline}")
+
+    save_baseline = args.save_baseline
+    if save_baseline and failures:
+        print(f"Not saving baseline {save_baseline}: the benchmark had failed repetitions")
+        save_baseline = None
+    for path in (args.json, save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Report written to: {path}")
+
+    return exit_code
 
 
 if __name__ == "__main__":
-    try:
-        compare_approaches()
-    except KeyboardInterrupt:
-        print("\n⏹️  Performance comparison interrupted by user")
-    except Exception as e:
-        print(f"\n❌ Performance comparison failed: {e}")
-        import traceback
-        traceback.print_exc()
+    sys.exit(main())
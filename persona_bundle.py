@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Persona bundle compiler.
+
+Loads a persona set (input/input-persona/<set>/) once and compiles, for every
+PSN_*.md persona, a stable prompt prefix: the shared files it references by
+tag (<RULES-LUCIM-SCENARIO>, <MAPPING-NL-LUCIM-OPERATION-MODEL-MAPPING>,
+<REVERSE-ENGINEERING-DRIVERS>, ...), resolved transitively and in name order,
+followed by the persona itself. Paragraphs repeated across the included files
+are kept once, and whitespace is normalized, so the prefix of an agent is
+byte-identical across combinations and cases and provider-side prompt caching
+hits consistently. Each prefix carries a SHA-256 content hash and a token
+estimate (token_estimator.py).
+
+The runner compiles the bundle of the selected persona set and exports its
+path as EXPERIMENT_PERSONA_BUNDLE; stages then build their prompts with
+agent_prefix(agent) + the case-specific inputs.
+
+Usage:
+    python persona_bundle.py persona-v3-limited-agents [--out bundle.json]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from token_estimator import estimate_tokens, estimator_name
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PERSONA_DIR = os.path.join(BASE_DIR, "input", "input-persona")
+DEFAULT_BUNDLE_DIR = os.path.join(BASE_DIR, "output", ".cache", "persona_bundles")
+PERSONA_BUNDLE_ENV = "EXPERIMENT_PERSONA_BUNDLE"
+# Bump when the compilation changes so prefixes (and their hashes) are recompiled
+BUNDLE_VERSION = 2
+# Paragraphs shorter than this (headings, separators) are never deduplicated
+MIN_DEDUP_CHARS = 80
+
+_TAG_RE = re.compile(r'<([A-Z][A-Z0-9]*(?:-[A-Z0-9]+)+)>')
+
+_bundles: Dict[str, Dict[str, Any]] = {}
+_bundles_lock = threading.Lock()
+
+
+def agent_name(filename: str) -> str:
+    """'PSN_LUCIM_Scenario_Generator.md' -> 'lucim_scenario_generator' (the stage name)"""
+    return os.path.splitext(filename)[0][len("PSN_"):].lower()
+
+
+def normalize_text(text: str) -> str:
+    """LF line endings, no trailing spaces, at most one blank line in a row, one final newline."""
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    return re.sub(r'\n{3,}', "\n\n", "\n".join(lines)).strip("\n") + "\n"
+
+
+def _defined_tag(text: str) -> Optional[str]:
+    """Tag a shared file defines: its first line that is only <TAG>."""
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped:
+            match = _TAG_RE.fullmatch(stripped)
+            if match:
+                return match.group(1)
+    return None
+
+
+def load_persona_set(persona_set_dir: str) -> Dict[str, Any]:
+    """
+    Read a persona set once.
+
+    Returns:
+        {"personas": {agent: filename}, "files": {filename: normalized text},
+         "tags": {TAG: filename of the shared file it designates}}
+    """
+    files: Dict[str, str] = {}
+    for filename in sorted(os.listdir(persona_set_dir)):
+        if filename.endswith(".md"):
+            with open(os.path.join(persona_set_dir, filename), "r", encoding="utf-8") as f:
+                files[filename] = normalize_text(f.read())
+    personas = {agent_name(name): name for name in files if name.startswith("PSN_")}
+    tags = {}
+    for name, text in files.items():
+        if name.startswith("PSN_"):
+            continue
+        # Personas may refer to a file by its defined tag or by its name
+        # (<RULES-LUCIM-PLANTUML-DIAGRAM> for RULES_LUCIM_PlantUML_Diagram.md defining <RULES-LUCIM-DIAGRAM>)
+        tags[os.path.splitext(name)[0].upper().replace("_", "-")] = name
+        tag = _defined_tag(text)
+        if tag:
+            tags[tag] = name
+    return {"personas": personas, "files": files, "tags": tags}
+
+
+def _included_files(persona_set: Dict[str, Any], filename: str) -> List[str]:
+    """Shared files referenced by filename, transitively, in name order."""
+    included = set()
+    stack = [filename]
+    while stack:
+        text = persona_set["files"][stack.pop()]
+        for tag in _TAG_RE.findall(text):
+            shared = persona_set["tags"].get(tag)
+            if shared and shared != filename and shared not in included:
+                included.add(shared)
+                stack.append(shared)
+    return sorted(included)
+
+
+def compile_prefix(persona_set: Dict[str, Any], agent: str) -> Dict[str, Any]:
+    """
+    Compile the prompt prefix of one agent.
+
+    Returns:
+        {"agent", "files", "prefix", "sha256", "chars", "tokens", "deduplicated_chars"}
+    """
+    persona_file = persona_set["personas"][agent]
+    order = _included_files(persona_set, persona_file) + [persona_file]
+    seen = set()
+    sections = []
+    dropped = 0
+    for filename in order:
+        kept = []
+        for paragraph in persona_set["files"][filename].split("\n\n"):
+            if len(paragraph) >= MIN_DEDUP_CHARS:
+                if paragraph in seen:
+                    dropped += len(paragraph) + 2
+                    continue
+                seen.add(paragraph)
+            kept.append(paragraph)
+        sections.append("\n\n".join(kept).strip("\n") + "\n")
+    prefix = "\n".join(sections)
+    return {
+        "agent": agent,
+        "files": order,
+        "prefix": prefix,
+        "sha256": hashlib.sha256(prefix.encode("utf-8")).hexdigest(),
+        "chars": len(prefix),
+        "tokens": estimate_tokens(prefix),
+        "deduplicated_chars": dropped,
+    }
+
+
+def compile_bundle(persona: str, persona_dir: str = PERSONA_DIR) -> Dict[str, Any]:
+    """
+    Compile every agent prefix of a persona set, memoized per process on the set's content.
+
+    Returns:
+        {"persona", "version", "sha256", "agents": {agent: compile_prefix()}}
+    """
+    persona_set = load_persona_set(os.path.join(persona_dir, persona))
+    content = hashlib.sha256()
+    for name, text in persona_set["files"].items():
+        content.update(f"{name}\0{text}\0".encode("utf-8"))
+    memo_key = f"{persona}:{content.hexdigest()}:v{BUNDLE_VERSION}"
+    with _bundles_lock:
+        bundle = _bundles.get(memo_key)
+    if bundle:
+        return bundle
+
+    agents = {agent: compile_prefix(persona_set, agent) for agent in sorted(persona_set["personas"])}
+    bundle_hash = hashlib.sha256(f"v{BUNDLE_VERSION}".encode("utf-8"))
+    for agent, compiled in agents.items():
+        bundle_hash.update(f"{agent}:{compiled['sha256']}\n".encode("utf-8"))
+    bundle = {"persona": persona, "version": BUNDLE_VERSION, "sha256": bundle_hash.hexdigest(), "agents": agents}
+    with _bundles_lock:
+        _bundles[memo_key] = bundle
+    return bundle
+
+
+def write_bundle(persona: str, persona_dir: str = PERSONA_DIR, bundle_dir: str = DEFAULT_BUNDLE_DIR) -> str:
+    """Compile a persona set and write it to <bundle_dir>/<persona>-<hash>.json (once per content); returns the path."""
+    bundle = compile_bundle(persona, persona_dir)
+    path = os.path.join(bundle_dir, f"{persona}-{bundle['sha256'][:16]}.json")
+    if not os.path.exists(path):
+        os.makedirs(bundle_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(bundle, f, indent=2)
+        os.replace(temp_path, path)
+    return path
+
+
+def load_bundle(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Bundle at path, or the one exported by the runner in EXPERIMENT_PERSONA_BUNDLE."""
+    path = path or os.environ.get(PERSONA_BUNDLE_ENV)
+    if not path:
+        return None
+    with _bundles_lock:
+        bundle = _bundles.get(path)
+    if bundle:
+        return bundle
+    with open(path, "r", encoding="utf-8") as f:
+        bundle = json.load(f)
+    with _bundles_lock:
+        _bundles[path] = bundle
+    return bundle
+
+
+def agent_prefix(agent: str, persona: Optional[str] = None, persona_dir: str = PERSONA_DIR) -> str:
+    """
+    Prompt prefix of agent (e.g. "lucim_scenario_generator").
+
+    Uses the runner's exported bundle when present, else compiles persona.
+    """
+    bundle = load_bundle() if persona is None else None
+    if bundle is None:
+        if persona is None:
+            raise ValueError(f"No persona set given and {PERSONA_BUNDLE_ENV} is not set")
+        bundle = compile_bundle(persona, persona_dir)
+    return bundle["agents"][agent]["prefix"]
+
+
+def print_bundle(bundle: Dict[str, Any]) -> None:
+    print(f"Persona set {bundle['persona']} (bundle {bundle['sha256'][:16]}, "
+          f"tokens: {estimator_name()})")
+    print(f"{'agent':<42} {'chars':>8} {'tokens':>8} {'dedup':>7}  sha256        files")
+    for agent, compiled in bundle["agents"].items():
+        shared = ", ".join(name for name in compiled["files"][:-1]) or "-"
+        print(f"{agent:<42} {compiled['chars']:>8} {compiled['tokens']:>8} {compiled['deduplicated_chars']:>7}  "
+              f"{compiled['sha256'][:12]}  {shared}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile a persona set into stable per-agent prompt prefixes")
+    parser.add_argument("persona", help="Persona set name under input/input-persona")
+    parser.add_argument("--persona-dir", default=PERSONA_DIR)
+    parser.add_argument("--out", default=None, help="Write the compiled bundle JSON to this file")
+    parser.add_argument("--agent", default=None, help="Print the prefix of one agent")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(os.path.join(args.persona_dir, args.persona)):
+        print(f"Persona set not found: {os.path.join(args.persona_dir, args.persona)}")
+        return 1
+    bundle = compile_bundle(args.persona, args.persona_dir)
+    if args.agent:
+        if args.agent not in bundle["agents"]:
+            print(f"Unknown agent {args.agent}; available: {', '.join(bundle['agents'])}")
+            return 1
+        sys.stdout.write(bundle["agents"][args.agent]["prefix"])
+        return 0
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(bundle, f, indent=2)
+        print(f"Bundle written to {args.out}")
+    print_bundle(bundle)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Host-wide LLM rate limiter shared by the child pipelines.
+
+A token bucket (requests per second with a burst) and a concurrency limit on
+in-flight LLM calls live in one JSON state file guarded by an fcntl file lock,
+so every pipeline process on the host draws from the same budget. The
+concurrency limit is adjusted with AIMD: it grows additively (about +1 per
+window of successful calls) while latency stays under the target and the
+calls succeed, and is cut multiplicatively on 429 responses (which also pause
+everyone for the Retry-After delay and halve the request rate) or when the
+average latency exceeds the target. Limit changes are printed with a [RATE]
+prefix, so they land in the pipeline logs.
+
+The runner enables the limiter with --rate-limit (main.py) and exports the
+state file as EXPERIMENT_RATE_LIMIT_FILE. A pipeline wraps each API call:
+
+    from rate_limiter import llm_slot
+    with llm_slot() as slot:
+        response = client.responses.create(...)
+    # or, for an error response: slot.report(429, retry_after=2.0)
+
+Without the environment variable (or without fcntl) llm_slot() does not limit.
+
+Usage:
+    python rate_limiter.py status
+    python rate_limiter.py simulate --mock-llm auto --workers 16 --calls 200 --rate 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RATE_LIMIT_FILE_ENV = "EXPERIMENT_RATE_LIMIT_FILE"
+DEFAULT_STATE_FILE = os.path.join(tempfile.gettempdir(), "experimentation-llm-rate-limit.json")
+
+DEFAULT_RATE = 10.0  # requests per second
+DEFAULT_BURST = 20
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_TARGET_LATENCY = 60.0  # seconds per call
+DECREASE_FACTOR = 0.5
+LATENCY_DECREASE_FACTOR = 0.9
+LATENCY_EWMA_ALPHA = 0.2
+DEFAULT_RETRY_AFTER = 1.0
+# Leases of crashed processes are reclaimed after this many seconds
+LEASE_TIMEOUT = 900.0
+POLL_INTERVAL = 0.05
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RateLimiter:
+    """
+    Token bucket plus AIMD concurrency limit in a lock-protected state file.
+
+    Args:
+        state_file: JSON state shared by all processes using the limiter
+    """
+
+    def __init__(self, state_file: str = DEFAULT_STATE_FILE):
+        self.state_file = state_file
+        self.lock_file = f"{state_file}.lock"
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, Any]]:
+        """Yield the state under an exclusive lock and write it back afterwards."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+        with open(self.lock_file, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.state_file, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {}
+                _apply_defaults(state)
+                yield state
+                temp_path = f"{self.state_file}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(temp_path, self.state_file)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def configure(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                  max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                  initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+                  target_latency: float = DEFAULT_TARGET_LATENCY) -> Dict[str, Any]:
+        """Set the limits; in-flight leases of other processes are kept."""
+        with self._locked_state() as state:
+            state.update({
+                "max_rate": rate, "rate": rate, "burst": burst, "tokens": float(burst),
+                "max_concurrency": max_concurrency, "target_latency": target_latency,
+                "concurrency": float(max(DEFAULT_MIN_CONCURRENCY, min(initial_concurrency, max_concurrency))),
+                "updated": time.time(),
+            })
+            return dict(state)
+
+    def acquire(self, timeout: Optional[float] = None) -> str:
+        """Block until a token and a concurrency slot are free; returns the lease ID."""
+        lease_id = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._locked_state() as state:
+                now = time.time()
+                _refill(state, now)
+                _reap_leases(state, now)
+                wait = max(0.0, state["paused_until"] - now)
+                if not wait and len(state["leases"]) < int(state["concurrency"]):
+                    if state["tokens"] >= 1.0:
+                        state["tokens"] -= 1.0
+                        state["leases"][lease_id] = {"pid": os.getpid(), "start": now}
+                        return lease_id
+                    wait = (1.0 - state["tokens"]) / max(state["rate"], 1e-6)
+            if deadline is not None and time.monotonic() + min(wait, POLL_INTERVAL) > deadline:
+                raise TimeoutError("Timed out waiting for an LLM rate-limit slot")
+            time.sleep(min(max(wait, POLL_INTERVAL / 5), POLL_INTERVAL) if wait else POLL_INTERVAL)
+
+    def release(self, lease_id: str, latency: float, status: int = 200,
+                retry_after: Optional[float] = None) -> Dict[str, Any]:
+        """Return a slot and feed the call's outcome into the AIMD controller."""
+        with self._locked_state() as state:
+            state["leases"].pop(lease_id, None)
+            before = (int(state["concurrency"]), state["rate"])
+            now = time.time()
+            state["calls"] += 1
+            if status == 429:
+                state["throttled"] += 1
+                state["concurrency"] = max(DEFAULT_MIN_CONCURRENCY, state["concurrency"] * DECREASE_FACTOR)
+                state["rate"] = max(state["max_rate"] * 0.05, state["rate"] * DECREASE_FACTOR)
+                state["paused_until"] = max(state["paused_until"], now + (retry_after or DEFAULT_RETRY_AFTER))
+            elif status >= 500:
+                state["errors"] += 1
+                state["concurrency"] = max(DEFAULT_MIN_CONCURRENCY, state["concurrency"] * LATENCY_DECREASE_FACTOR)
+            else:
+                ewma = state["latency_ewma"]
+                state["latency_ewma"] = latency if ewma is None else (
+                    LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * ewma)
+                if state["latency_ewma"] > state["target_latency"]:
+                    state["concurrency"] = max(DEFAULT_MIN_CONCURRENCY,
+                                               state["concurrency"] * LATENCY_DECREASE_FACTOR)
+                else:
+                    # Additive increase: about +1 slot per window of successful calls
+                    state["concurrency"] = min(state["max_concurrency"],
+                                               state["concurrency"] + 1.0 / max(state["concurrency"], 1.0))
+                    state["rate"] = min(state["max_rate"], state["rate"] + state["max_rate"] * 0.05)
+            after = (int(state["concurrency"]), state["rate"])
+            if after[0] != before[0] or (status == 429 and after[1] != before[1]):
+                print(f"[RATE] {_describe(state)} (after status {status})", flush=True)
+            return dict(state)
+
+    def status(self) -> Dict[str, Any]:
+        with self._locked_state() as state:
+            now = time.time()
+            _refill(state, now)
+            _reap_leases(state, now)
+            return dict(state, in_flight=len(state["leases"]))
+
+
+def _apply_defaults(state: Dict[str, Any]) -> None:
+    state.setdefault("max_rate", DEFAULT_RATE)
+    state.setdefault("rate", state["max_rate"])
+    state.setdefault("burst", DEFAULT_BURST)
+    state.setdefault("tokens", float(state["burst"]))
+    state.setdefault("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+    state.setdefault("concurrency", float(DEFAULT_INITIAL_CONCURRENCY))
+    state.setdefault("target_latency", DEFAULT_TARGET_LATENCY)
+    state.setdefault("latency_ewma", None)
+    state.setdefault("paused_until", 0.0)
+    state.setdefault("leases", {})
+    state.setdefault("updated", time.time())
+    for counter in ("calls", "throttled", "errors"):
+        state.setdefault(counter, 0)
+
+
+def _refill(state: Dict[str, Any], now: float) -> None:
+    elapsed = max(0.0, now - state["updated"])
+    state["tokens"] = min(float(state["burst"]), state["tokens"] + elapsed * state["rate"])
+    state["updated"] = now
+
+
+def _reap_leases(state: Dict[str, Any], now: float) -> None:
+    """Drop leases of processes that died or held them for longer than LEASE_TIMEOUT."""
+    for lease_id, lease in list(state["leases"].items()):
+        if now - lease["start"] > LEASE_TIMEOUT or not _pid_alive(lease["pid"]):
+            del state["leases"][lease_id]
+
+
+def _describe(state: Dict[str, Any]) -> str:
+    latency = state.get("latency_ewma")
+    return (f"concurrency {int(state['concurrency'])}/{state['max_concurrency']}, "
+            f"rate {state['rate']:.1f}/{state['max_rate']:.1f} req/s, "
+            f"in flight {len(state['leases'])}, latency {'-' if latency is None else f'{latency:.2f}s'}, "
+            f"{state['throttled']} throttled / {state['calls']} calls")
+
+
+def describe_limits(state_file: Optional[str] = None) -> Optional[str]:
+    """One-line summary of the current limits, or None when the limiter is not enabled."""
+    state_file = state_file or os.environ.get(RATE_LIMIT_FILE_ENV)
+    if not state_file or not os.path.exists(state_file):
+        return None
+    return _describe(RateLimiter(state_file).status())
+
+
+class _Slot:
+    def __init__(self):
+        self.status = 200
+        self.retry_after: Optional[float] = None
+
+    def report(self, status: int, retry_after: Optional[float] = None) -> None:
+        """Record the HTTP status of the call (e.g. 429 with its Retry-After) instead of success."""
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _status_of(error: BaseException) -> int:
+    """HTTP status of an SDK/HTTP error (openai.RateLimitError.status_code, HTTPError.code), else 500."""
+    for attribute in ("status_code", "code", "status"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    return 500
+
+
+@contextmanager
+def llm_slot(state_file: Optional[str] = None, timeout: Optional[float] = None) -> Iterator[_Slot]:
+    """
+    Hold one rate-limited LLM call slot for the duration of the block.
+
+    Latency and outcome are fed back to the limiter on exit; an exception
+    carrying an HTTP status (429, 5xx) is reported as that status and re-raised.
+    """
+    state_file = state_file or os.environ.get(RATE_LIMIT_FILE_ENV)
+    slot = _Slot()
+    if not state_file or fcntl is None:
+        yield slot
+        return
+    limiter = RateLimiter(state_file)
+    lease_id = limiter.acquire(timeout)
+    start = time.perf_counter()
+    try:
+        yield slot
+    except BaseException as e:
+        slot.status = _status_of(e)
+        raise
+    finally:
+        limiter.release(lease_id, time.perf_counter() - start, slot.status, slot.retry_after)
+
+
+def _simulate_worker(args: Dict[str, Any]) -> Dict[str, int]:
+    """One simulated pipeline process issuing calls against the mock server."""
+    import urllib.error
+    import urllib.request
+    counts = {"ok": 0, "throttled": 0}
+    payload = json.dumps({"model": "gpt-5-nano-2025-08-07", "input": "ping"}).encode("utf-8")
+    for _ in range(args["calls"]):
+        with llm_slot(args["state_file"]) as slot:
+            request = urllib.request.Request(f"{args['base_url'].rstrip('/')}/responses", data=payload,
+                                             headers={"Content-Type": "application/json"})
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                counts["ok"] += 1
+            except urllib.error.HTTPError as e:
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                slot.report(e.code, float(retry_after) if retry_after else None)
+                if e.code == 429:
+                    counts["throttled"] += 1
+    return counts
+
+
+def simulate(base_url: str, workers: int, calls: int, state_file: str) -> Dict[str, Any]:
+    """Run workers processes issuing calls each through the shared limiter; returns counts and timing."""
+    from concurrent.futures import ProcessPoolExecutor
+    per_worker = max(1, calls // workers)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(_simulate_worker, [{"base_url": base_url, "calls": per_worker,
+                                                     "state_file": state_file}] * workers))
+    return {"calls": per_worker * workers, "ok": sum(o["ok"] for o in outcomes),
+            "throttled": sum(o["throttled"] for o in outcomes), "elapsed": time.perf_counter() - start}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Host-wide LLM rate limiter shared by the pipelines")
+    parser.add_argument("--state-file", default=os.environ.get(RATE_LIMIT_FILE_ENV, DEFAULT_STATE_FILE))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Print the current limits")
+    sim = sub.add_parser("simulate", help="Drive the limiter with parallel worker processes")
+    sim.add_argument("--mock-llm", default="auto", metavar="URL|auto")
+    sim.add_argument("--workers", type=int, default=8)
+    sim.add_argument("--calls", type=int, default=100)
+    sim.add_argument("--rate", type=float, default=DEFAULT_RATE)
+    sim.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    sim.add_argument("--rate-429", type=float, default=0.1, help="429 rate of the auto-started mock server")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        if not os.path.exists(args.state_file):
+            print(f"No limiter state at {args.state_file}")
+            return 1
+        print(_describe(RateLimiter(args.state_file).status()))
+        return 0
+
+    limiter = RateLimiter(args.state_file)
+    limiter.configure(rate=args.rate, max_concurrency=args.max_concurrency)
+    mock_server = None
+    base_url = args.mock_llm
+    if base_url == "auto":
+        from mock_llm_server import MockConfig, start_mock_server
+        mock_server, base_url = start_mock_server(config=MockConfig(latency=0.05, jitter=0.05,
+                                                                    rate_429=args.rate_429))
+    try:
+        outcome = simulate(base_url, args.workers, args.calls, args.state_file)
+    finally:
+        if mock_server is not None:
+            mock_server.shutdown()
+    print(f"{outcome['calls']} calls in {outcome['elapsed']:.1f}s: {outcome['ok']} ok, "
+          f"{outcome['throttled']} throttled")
+    print(f"Final limits: {_describe(limiter.status())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
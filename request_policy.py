@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Request policy for LLM calls: retries and hedging.
+
+A pipeline sends each API request through call_with_policy():
+
+    from request_policy import call_with_policy
+    response = call_with_policy("lucim_scenario_generator",
+                                lambda: client.responses.create(...))
+
+Failed requests that are worth retrying (429, 408, 409, 5xx, timeouts and
+connection errors) are retried with full-jitter exponential backoff: a random
+delay between 0 and min(backoff_max, backoff_base * 2^attempt), at least the
+server's Retry-After. With hedging enabled, a request that has not answered
+after the stage's p90 latency gets a duplicate; the first answer wins and the
+other one is discarded. Hedging trades extra tokens for a shorter tail.
+Every attempt goes through rate_limiter.llm_slot(), so hedges and retries
+count against the shared rate limit.
+
+The runner selects the policy with --request-policy (main.py) and exports
+it as JSON in EXPERIMENT_REQUEST_POLICY. Before each run it adds the per-stage
+hedge delays ("hedge_after") learned from the runs so far. Each request is
+logged to the file in EXPERIMENT_REQUEST_LOG (request_latency.jsonl in the
+combination folder). The runner ingests that log into per-stage latency
+histograms for the report.
+
+Usage:
+    python request_policy.py bench --calls 200 --slow-rate 0.05 --slow-latency 2
+"""
+import argparse
+import json
+import math
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REQUEST_POLICY_ENV = "EXPERIMENT_REQUEST_POLICY"
+REQUEST_LOG_ENV = "EXPERIMENT_REQUEST_LOG"
+REQUEST_LOG_FILE = "request_latency.jsonl"
+
+POLICIES = {
+    "none": {"retries": 0, "hedge": False},
+    "retry": {"retries": 3, "hedge": False},
+    "hedged": {"retries": 3, "hedge": True},
+}
+DEFAULT_POLICY = {
+    "retries": 0,
+    "backoff_base": 1.0,
+    "backoff_max": 30.0,
+    "hedge": False,
+    "hedge_quantile": 0.9,
+    # Stage latencies needed before the quantile is trusted for hedging
+    "hedge_min_samples": 5,
+    # Learned per-stage hedge delays in seconds, filled in by the runner
+    "hedge_after": {},
+}
+RETRYABLE_STATUSES = {408, 409, 429}
+# Upper bounds of the latency histogram buckets in seconds (the last bucket is open)
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300)
+# Latency samples kept per stage for the quantiles
+MAX_SAMPLES = 500
+
+_samples: Dict[str, List[float]] = {}
+_samples_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def build_policy(name: str = "none", **overrides: Any) -> Dict[str, Any]:
+    """A named policy from POLICIES with the given settings overridden (None values are ignored)."""
+    if name not in POLICIES:
+        raise ValueError(f"Unknown request policy '{name}', expected one of {', '.join(POLICIES)}")
+    policy = dict(DEFAULT_POLICY, hedge_after={}, **POLICIES[name])
+    policy.update({key: value for key, value in overrides.items() if value is not None})
+    return policy
+
+
+def load_policy(env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """The policy exported in EXPERIMENT_REQUEST_POLICY, else DEFAULT_POLICY (no retries, no hedging)."""
+    env = os.environ if env is None else env
+    policy = dict(DEFAULT_POLICY, hedge_after={})
+    raw = env.get(REQUEST_POLICY_ENV)
+    if raw:
+        try:
+            loaded = json.loads(raw)
+        except ValueError:
+            loaded = None
+        if isinstance(loaded, dict):
+            policy.update(loaded)
+    return policy
+
+
+def quantile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank quantile of values, None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def _status_of(error: BaseException) -> Optional[int]:
+    for attribute in ("status_code", "code", "status"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429/408/409/5xx responses, timeouts and connection failures."""
+    status = _status_of(error)
+    if status is not None:
+        return status in RETRYABLE_STATUSES or status >= 500
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name
+
+
+def _retry_after(error: BaseException) -> float:
+    """Retry-After of an HTTP error response in seconds, 0 when absent."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    try:
+        return float(headers.get("Retry-After") or 0) if headers else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def backoff_delay(attempt: int, policy: Dict[str, Any], retry_after: float = 0.0) -> float:
+    """Full-jitter exponential backoff before retry number attempt + 1."""
+    ceiling = min(policy["backoff_max"], policy["backoff_base"] * (2 ** attempt))
+    return max(retry_after, random.uniform(0, ceiling))
+
+
+def hedge_delay(stage: str, policy: Dict[str, Any]) -> Optional[float]:
+    """Seconds after which a duplicate request is sent, None when the stage is not hedged (yet)."""
+    if not policy.get("hedge"):
+        return None
+    learned = (policy.get("hedge_after") or {}).get(stage)
+    with _samples_lock:
+        samples = list(_samples.get(stage, ()))
+    if len(samples) >= policy["hedge_min_samples"]:
+        return quantile(samples, policy["hedge_quantile"])
+    return learned
+
+
+def _observe(stage: str, latency: float) -> None:
+    with _samples_lock:
+        samples = _samples.setdefault(stage, [])
+        samples.append(latency)
+        del samples[:-MAX_SAMPLES]
+
+
+def _attempt(call: Callable[[], Any]) -> Any:
+    """One request holding a slot of the shared rate limiter (see rate_limiter.py)."""
+    from rate_limiter import llm_slot
+    with llm_slot():
+        return call()
+
+
+def _hedged_call(call: Callable[[], Any], delay: Optional[float]) -> Tuple[Any, bool, bool]:
+    """
+    Run call, sending a duplicate when it has not answered after delay seconds.
+
+    Returns:
+        (result, hedged, hedge_won); raises the error of the last request to fail
+    """
+    answers: "queue.Queue[Tuple[int, bool, Any]]" = queue.Queue()
+
+    def _run(index: int) -> None:
+        try:
+            answers.put((index, True, _attempt(call)))
+        except BaseException as e:
+            answers.put((index, False, e))
+
+    threading.Thread(target=_run, args=(0,), daemon=True).start()
+    running = 1
+    hedged = False
+    try:
+        index, ok, value = answers.get(timeout=delay) if delay is not None else answers.get()
+    except queue.Empty:
+        # Slow primary: the duplicate races it; the loser's answer is dropped
+        threading.Thread(target=_run, args=(1,), daemon=True).start()
+        running += 1
+        hedged = True
+        index, ok, value = answers.get()
+    running -= 1
+    while not ok and running:
+        index, ok, value = answers.get()
+        running -= 1
+    if not ok:
+        raise value
+    return value, hedged, hedged and index == 1
+
+
+def _log_request(record: Dict[str, Any]) -> None:
+    path = os.environ.get(REQUEST_LOG_ENV)
+    if not path:
+        return
+    line = json.dumps(record) + "\n"
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def call_with_policy(stage: str, call: Callable[[], Any], policy: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Send one LLM request under the request policy.
+
+    Args:
+        stage: Stage name (e.g. "lucim_scenario_generator"), used for the latency quantiles
+        call: Zero-argument function sending the request and returning the response
+        policy: Overrides the policy exported by the runner
+
+    Returns:
+        The first successful response; raises the last error once retries are exhausted
+    """
+    policy = policy or load_policy()
+    start = time.perf_counter()
+    record = {"stage": stage, "timestamp": time.time(), "retries": 0, "hedged": 0, "hedge_wins": 0, "ok": False}
+    try:
+        for attempt in range(policy["retries"] + 1):
+            attempt_start = time.perf_counter()
+            try:
+                result, hedged, hedge_won = _hedged_call(call, hedge_delay(stage, policy))
+            except Exception as e:
+                if attempt >= policy["retries"] or not is_retryable(e):
+                    raise
+                record["retries"] += 1
+                time.sleep(backoff_delay(attempt, policy, _retry_after(e)))
+                continue
+            record["hedged"] += int(hedged)
+            record["hedge_wins"] += int(hedge_won)
+            record["ok"] = True
+            record["attempt_latency"] = time.perf_counter() - attempt_start
+            _observe(stage, record["attempt_latency"])
+            return result
+    finally:
+        record["latency"] = time.perf_counter() - start
+        _log_request(record)
+
+
+def load_request_log(path: str) -> List[Dict[str, Any]]:
+    """Read a request log, skipping malformed lines (e.g. a partial last line of a killed run)."""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("stage") and "latency" in record:
+                    records.append(record)
+    except OSError:
+        pass
+    return records
+
+
+def histogram(latencies: List[float]) -> List[int]:
+    """Counts per HISTOGRAM_BUCKETS bucket, plus one for latencies above the last bound."""
+    counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    for latency in latencies:
+        counts[next((i for i, bound in enumerate(HISTOGRAM_BUCKETS) if latency <= bound), len(HISTOGRAM_BUCKETS))] += 1
+    return counts
+
+
+def summarize_request_log(records: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Per-stage request latency summary.
+
+    Returns:
+        {stage: {"requests", "failed", "retries", "hedged", "hedge_wins", "latencies",
+                 "attempt_latencies", "p50", "p90", "p99", "histogram"}} or None when there are
+        no records; latencies include retries, attempt_latencies are those of the answering attempts
+    """
+    if not records:
+        return None
+    stages: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        stage = stages.setdefault(record["stage"], {"requests": 0, "failed": 0, "retries": 0, "hedged": 0,
+                                                    "hedge_wins": 0, "latencies": [], "attempt_latencies": []})
+        stage["requests"] += 1
+        stage["failed"] += 0 if record.get("ok") else 1
+        for field in ("retries", "hedged", "hedge_wins"):
+            stage[field] += record.get(field) or 0
+        stage["latencies"].append(round(record["latency"], 3))
+        if record.get("attempt_latency") is not None:
+            stage["attempt_latencies"].append(round(record["attempt_latency"], 3))
+    for stage in stages.values():
+        add_percentiles(stage)
+    return stages
+
+
+def add_percentiles(stage: Dict[str, Any]) -> Dict[str, Any]:
+    """(Re)compute p50/p90/p99 and the histogram of a stage summary from its latencies."""
+    for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        stage[name] = quantile(stage["latencies"], q)
+    stage["histogram"] = histogram(stage["latencies"])
+    return stage
+
+
+def add_request_summary(merged: Dict[str, Dict[str, Any]], summary: Optional[Dict[str, Any]],
+                        percentiles: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Fold the per-stage summary of one run into merged, refreshing the percentiles of its stages."""
+    for stage, values in (summary or {}).items():
+        total = merged.setdefault(stage, {"requests": 0, "failed": 0, "retries": 0, "hedged": 0,
+                                          "hedge_wins": 0, "latencies": [], "attempt_latencies": []})
+        for field in ("requests", "failed", "retries", "hedged", "hedge_wins"):
+            total[field] += values.get(field) or 0
+        total["latencies"].extend(values.get("latencies") or [])
+        total["attempt_latencies"].extend(values.get("attempt_latencies") or [])
+        if percentiles:
+            add_percentiles(total)
+    return merged
+
+
+def merge_request_summaries(summaries: List[Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Combine the per-stage summaries of several runs."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for summary in summaries:
+        add_request_summary(merged, summary, percentiles=False)
+    for stage in merged.values():
+        add_percentiles(stage)
+    return merged
+
+
+def histogram_labels() -> List[str]:
+    return [f"<={bound}s" for bound in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}s"]
+
+
+class LatencyTracker:
+    """
+    Runner-side latency history across the runs of a sweep, used to learn per-stage hedge delays.
+    """
+
+    def __init__(self):
+        self._latencies: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, summary: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            for stage, values in (summary or {}).items():
+                # Retry backoff says nothing about when a request is slow
+                latencies = self._latencies.setdefault(stage, [])
+                latencies.extend(values.get("attempt_latencies") or [])
+                del latencies[:-MAX_SAMPLES]
+
+    def policy_env(self, policy: Dict[str, Any]) -> str:
+        """The policy as exported to a pipeline, with hedge_after learned from the runs so far."""
+        with self._lock:
+            learned = {stage: quantile(latencies, policy["hedge_quantile"])
+                       for stage, latencies in self._latencies.items()
+                       if len(latencies) >= policy["hedge_min_samples"]}
+        return json.dumps(dict(policy, hedge_after=dict(policy.get("hedge_after") or {}, **learned)))
+
+
+# Shared by the runners of one sweep process
+tracker = LatencyTracker()
+
+
+def prepare_request_policy(env: Dict[str, str], log_file: str) -> None:
+    """Export the policy (with learned hedge delays) and a fresh request log to a child pipeline."""
+    if os.path.exists(log_file):
+        os.remove(log_file)
+    env[REQUEST_LOG_ENV] = log_file
+    if env.get(REQUEST_POLICY_ENV):
+        env[REQUEST_POLICY_ENV] = tracker.policy_env(load_policy(env))
+
+
+def ingest_request_log(log_file: str) -> Optional[Dict[str, Any]]:
+    """Summarize a finished run's request log and feed it into the hedge delay history."""
+    summary = summarize_request_log(load_request_log(log_file))
+    tracker.add(summary)
+    return summary
+
+
+def _bench_call(base_url: str) -> Callable[[], Any]:
+    import urllib.request
+    payload = json.dumps({"model": "gpt-5-nano-2025-08-07", "input": "ping"}).encode("utf-8")
+
+    def _call() -> Any:
+        request = urllib.request.Request(f"{base_url.rstrip('/')}/responses", data=payload,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return response.read()
+    return _call
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="LLM request policy (retries, hedging)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Compare request policies against the mock LLM server")
+    bench.add_argument("--calls", type=int, default=200)
+    bench.add_argument("--concurrency", type=int, default=4)
+    bench.add_argument("--latency", type=float, default=0.1, help="Base latency of the mock server")
+    bench.add_argument("--jitter", type=float, default=0.1, help="Uniform extra latency of the mock server")
+    bench.add_argument("--slow-rate", type=float, default=0.05, help="Fraction of slow mock responses")
+    bench.add_argument("--slow-latency", type=float, default=2.0, help="Extra latency of slow mock responses")
+    bench.add_argument("--rate-429", type=float, default=0.05)
+    bench.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    from concurrent.futures import ThreadPoolExecutor
+    from mock_llm_server import MockConfig, start_mock_server
+    print(f"{'policy':<8} {'failed':>6} {'retries':>7} {'hedged':>6} {'won':>4} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}")
+    for name in POLICIES:
+        server, base_url = start_mock_server(config=MockConfig(latency=args.latency, jitter=args.jitter,
+                                                               rate_429=args.rate_429, seed=args.seed,
+                                                               slow_rate=args.slow_rate,
+                                                               slow_latency=args.slow_latency))
+        policy = build_policy(name, backoff_base=0.1)
+        call = _bench_call(base_url)
+        with _samples_lock:
+            _samples.pop("bench", None)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.environ[REQUEST_LOG_ENV] = os.path.join(temp_dir, REQUEST_LOG_FILE)
+
+            def _one(_: int) -> None:
+                try:
+                    call_with_policy("bench", call, policy)
+                except Exception:
+                    pass
+
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(_one, range(args.calls)))
+            stage = summarize_request_log(load_request_log(os.environ.pop(REQUEST_LOG_ENV)))["bench"]
+        server.shutdown()
+        print(f"{name:<8} {stage['failed']:>6} {stage['retries']:>7} {stage['hedged']:>6} {stage['hedge_wins']:>4} "
+              + " ".join(f"{stage[p]:>7.3f}" for p in ("p50", "p90", "p99")) + f" {max(stage['latencies']):>7.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
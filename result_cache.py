@@ -0,0 +1,196 @@
+"""
+Content-addressed cache of pipeline results.
+
+A cache key is the SHA-256 of everything that determines a pipeline run: the
+persona set files, the case NetLogo code and interface images, the valid
+examples, the model, reasoning, verbosity, MAX_AUDIT and pipeline mode. A hit
+restores the stored combination folder instead of calling the LLM pipeline.
+Entries are evicted least-recently-used first once the cache exceeds its size
+limit.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", ".cache", "results")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+ENTRY_FILE = "entry.json"
+FILES_DIR = "files"
+
+# (path, size, mtime_ns) -> sha256, so repeated combinations do not re-read the same inputs
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, memoized on its size and modification time"""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digest_lock:
+        cached = _digest_memo.get(memo_key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def _list_files(root: str) -> List[str]:
+    """All regular files under root, sorted by relative path (symlinks followed)"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root, followlinks=True):
+        dirnames.sort()
+        for name in sorted(filenames):
+            files.append(os.path.join(dirpath, name))
+    return files
+
+
+def compute_cache_key(persona_dir: str, netlogo_dir: str, valid_examples_dir: str, persona: str,
+                      case: str, model: str, reasoning: str, verbosity: str, max_audit: str,
+                      pipeline: str, extra: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Hash the inputs of one pipeline run.
+
+    Args:
+        persona_dir: Root of the persona sets (input-persona)
+        netlogo_dir: Directory holding <case>-netlogo-code.md and interface images
+        valid_examples_dir: Directory of valid examples
+        persona: Persona set name
+        case: NetLogo case name
+        model, reasoning, verbosity: Parameter combination
+        max_audit: MAX_AUDIT value in effect
+        pipeline: "single_agent" or "orchestrated"
+        extra: Other settings that change the pipeline inputs (e.g. image preprocessing)
+
+    Returns:
+        Hex digest identifying the run
+    """
+    h = hashlib.sha256()
+
+    def _add_files(label: str, root: str, paths: List[str]) -> None:
+        for path in paths:
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            h.update(f"{label}:{rel}:{file_digest(path)}\n".encode("utf-8"))
+
+    persona_set_dir = os.path.join(persona_dir, persona)
+    _add_files("persona", persona_set_dir, _list_files(persona_set_dir))
+    case_files = sorted(glob.glob(os.path.join(netlogo_dir, f"{glob.escape(case)}-netlogo-*")))
+    _add_files("case", netlogo_dir, case_files)
+    _add_files("examples", valid_examples_dir, _list_files(valid_examples_dir))
+
+    params = {
+        "persona": persona,
+        "case": case,
+        "model": model,
+        "reasoning": reasoning,
+        "verbosity": verbosity,
+        "max_audit": str(max_audit),
+        "pipeline": pipeline,
+    }
+    if extra:
+        params["extra"] = extra
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(p) for p in _list_files(path))
+
+
+class ResultCache:
+    """
+    On-disk result cache with size-based LRU eviction.
+
+    Args:
+        cache_dir: Cache root; one <key>/ folder per entry
+        max_bytes: Total size above which least-recently-used entries are evicted
+        read: Look up existing entries (False for --refresh / --no-cache)
+        write: Store new entries (False for --no-cache)
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 read: bool = True, write: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.read = read
+        self.write = write
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _load_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._entry_dir(key), ENTRY_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_entry(self, entry_dir: str, entry: Dict[str, Any]) -> None:
+        tmp = os.path.join(entry_dir, ENTRY_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, os.path.join(entry_dir, ENTRY_FILE))
+
+    def restore(self, key: str, target_dir: str) -> bool:
+        """Copy a cached entry into target_dir. Returns False on a miss."""
+        if not self.read:
+            return False
+        entry = self._load_entry(key)
+        files_dir = os.path.join(self._entry_dir(key), FILES_DIR)
+        if entry is None or not os.path.isdir(files_dir):
+            return False
+        shutil.copytree(files_dir, target_dir, dirs_exist_ok=True)
+        with self._lock:
+            entry["last_used"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._save_entry(self._entry_dir(key), entry)
+        return True
+
+    def store(self, key: str, source_dir: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Store the outputs in source_dir under key, then evict down to max_bytes"""
+        if not self.write or not os.path.isdir(source_dir):
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        shutil.copytree(source_dir, os.path.join(tmp_dir, FILES_DIR))
+        now = time.time()
+        entry = {
+            "key": key,
+            "created": now,
+            "last_used": now,
+            "hits": 0,
+            "size_bytes": _dir_size(tmp_dir),
+            "metadata": metadata or {},
+        }
+        self._save_entry(tmp_dir, entry)
+        with self._lock:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.rename(tmp_dir, entry_dir)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry = self._load_entry(name)
+            if entry is not None:
+                entries.append(entry)
+        total = sum(e.get("size_bytes", 0) for e in entries)
+        for entry in sorted(entries, key=lambda e: e.get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(entry["key"]), ignore_errors=True)
+            total -= entry.get("size_bytes", 0)
+            print(f"[CACHE] Evicted {entry['key'][:12]} ({entry.get('size_bytes', 0)} bytes)")
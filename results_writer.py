@@ -1,10 +1,15 @@
 import os
+import copy
 import json
 import glob
+import threading
 from datetime import datetime
 from typing import Dict, Any, List, Tuple
 from collections import defaultdict, Counter
 
+from request_policy import add_request_summary, histogram_labels
+from utils import combination_output_dir
+
 
 def write_results(base_dir: str, execution_id: str, setup: Dict[str, Any], results: Dict[str, Any]) -> str:
     """
@@ -36,9 +41,97 @@ def write_results(base_dir: str, execution_id: str, setup: Dict[str, Any], resul
     return report_file
 
 
-def _analyze_audit_data(output_dir: str) -> Dict[str, Any]:
-    """Analyze audit data from output directory to extract compliance metrics"""
-    audit_metrics = {
+class IncrementalReportWriter:
+    """
+    Keeps report.md of a running sweep up to date, one combination at a time.
+
+    add_combination() reads only the audit files of the finished combination's
+    folders and folds them and its results entries into running aggregates
+    (audit counts, rule counter, durations, tokens, request latencies), then
+    rewrites the report from those aggregates (atomically, so a reader never
+    sees a partial file). An update therefore costs the same whatever the
+    number of combinations already reported. finalize() adds any combination
+    not seen yet (e.g. journaled results of a resumed sweep) and the legacy
+    top-level audit files, then writes the final report without rescanning
+    the whole output directory.
+    
+    Args:
+        base_dir: Base directory of experimentation project
+        execution_id: Execution identifier
+        setup: Setup parameters
+    """
+    
+    def __init__(self, base_dir: str, execution_id: str, setup: Dict[str, Any]):
+        self.execution_id = execution_id
+        self.setup = setup
+        self.output_dir = os.path.join(base_dir, "output", execution_id)
+        self.results_subfolder = os.path.join(self.output_dir, "results")
+        self.report_file = os.path.join(self.results_subfolder, "report.md")
+        self.audit_metrics = _empty_audit_metrics()
+        self.aggregates = _empty_report_aggregates()
+        self._seen_keys = set()
+        self._seen_files = set()
+        self._lock = threading.Lock()
+    
+    def _combination_audit_files(self, combination_results: Dict[str, Any]) -> List[str]:
+        audit_files = []
+        for pipeline, entry in combination_results.items():
+            if not isinstance(entry, dict) or "exit_code" not in entry:
+                continue
+            reasoning = entry.get("reasoning") or {}
+            combination_dir = combination_output_dir(self.output_dir, pipeline, entry.get("case"), entry.get("model"),
+                                                     reasoning.get("effort") if isinstance(reasoning, dict) else reasoning,
+                                                     entry.get("verbosity"))
+            audit_files.extend(glob.glob(os.path.join(combination_dir, "*audit*.json")))
+        return audit_files
+    
+    def _add_audit_files(self, audit_files: List[str]) -> None:
+        for audit_file in sorted(audit_files):
+            if audit_file not in self._seen_files:
+                self._seen_files.add(audit_file)
+                _add_audit_file(self.audit_metrics, audit_file)
+        _compute_audit_rates(self.audit_metrics)
+    
+    def _add(self, key: str, combination_results: Dict[str, Any]) -> None:
+        self._seen_keys.add(key)
+        self._add_audit_files(self._combination_audit_files(combination_results))
+        _add_report_entries(self.aggregates, combination_results)
+    
+    def _write(self, results: Dict[str, Any], scrape_summaries: bool) -> str:
+        os.makedirs(self.results_subfolder, exist_ok=True)
+        temp_file = f"{self.report_file}.{os.getpid()}.tmp"
+        with open(temp_file, "w") as f:
+            _write_scientific_report(f, self.execution_id, self.setup, results, self.output_dir,
+                                     audit_metrics=self.audit_metrics, scrape_summaries=scrape_summaries,
+                                     aggregates=self.aggregates)
+        os.replace(temp_file, self.report_file)
+        return self.report_file
+    
+    def add_combination(self, key: str, combination_results: Any) -> str:
+        """Fold a finished combination into the aggregates and rewrite the report; returns its path"""
+        with self._lock:
+            if isinstance(combination_results, dict) and key not in self._seen_keys:
+                self._add(key, combination_results)
+            return self._write({}, scrape_summaries=False)
+    
+    def finalize(self, results: Dict[str, Any]) -> str:
+        """Write the final report for results; returns its path"""
+        with self._lock:
+            for key, combination_results in results.items():
+                if key not in self._seen_keys and isinstance(combination_results, dict) and \
+                        any(isinstance(entry, dict) and "exit_code" in entry for entry in combination_results.values()):
+                    self._add(key, combination_results)
+            # Audit files outside combination folders (older pipeline layouts)
+            self._add_audit_files([path for path in
+                                   glob.glob(os.path.join(self.output_dir, "orchestrated_output", "*audit*.json"))
+                                   + glob.glob(os.path.join(self.output_dir, "*audit*.json"))])
+            report_file = self._write(results, scrape_summaries=True)
+        print(f"Scientific report written to: {self.results_subfolder}")
+        return report_file
+
+
+def _empty_audit_metrics() -> Dict[str, Any]:
+    return {
         "total_combinations": 0,
         "success_combinations": 0,
         "failed_combinations": 0,
@@ -51,8 +144,75 @@ def _analyze_audit_data(output_dir: str) -> Dict[str, Any]:
         "parameter_combinations": [],
         "compliance_rates": {}
     }
+
+
+def _add_audit_file(audit_metrics: Dict[str, Any], audit_file: str) -> None:
+    """Count one audit file into audit_metrics"""
+    try:
+        with open(audit_file, 'r') as f:
+            audit_data = json.load(f)
+        
+        audit_metrics["total_combinations"] += 1
+        
+        # Support both old ({verdict,...}) and new ({data:{verdict,...}, errors:[]}) schemas
+        node = audit_data.get("data") if isinstance(audit_data, dict) and isinstance(audit_data.get("data"), dict) else audit_data
+        # Check if compliant
+        if node.get("verdict") == "compliant":
+            audit_metrics["success_combinations"] += 1
+            # Check if this is a first audit success or after correction
+            if "audit_initial.json" in audit_file:
+                audit_metrics["success_on_first_audit"] += 1
+            elif "audit_final.json" in audit_file:
+                audit_metrics["success_after_correction"] += 1
+            else:
+                # Default to first audit if we can't determine
+                audit_metrics["success_on_first_audit"] += 1
+        else:
+            audit_metrics["failed_combinations"] += 1
+            
+            # Check for two-step audit (initial non-compliant, then corrected)
+            if "audit_initial.json" in audit_file and node.get("verdict") != "compliant":
+                # Look for corresponding final audit
+                final_audit_file = audit_file.replace("audit_initial.json", "audit_final.json")
+                if os.path.exists(final_audit_file):
+                    audit_metrics["two_step_audits"] += 1
+                    try:
+                        with open(final_audit_file, 'r') as f:
+                            final_audit_data = json.load(f)
+                        if final_audit_data.get("verdict") == "compliant":
+                            audit_metrics["two_step_pass"] += 1
+                            audit_metrics["success_after_correction"] += 1
+                        else:
+                            audit_metrics["two_step_fail"] += 1
+                    except:
+                        pass
+        
+        # Count non-compliant rules (schema-compatible)
+        non_compliant_rules = node.get("non-compliant-rules", [])
+        for rule in non_compliant_rules:
+            audit_metrics["non_compliant_rules"][rule] += 1
+            
+    except Exception as e:
+        print(f"Warning: Could not analyze audit file {audit_file}: {e}")
+
+
+def _compute_audit_rates(audit_metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """(Re)compute the rates of audit_metrics from its counts"""
+    if audit_metrics["total_combinations"] > 0:
+        audit_metrics["success_rate"] = (audit_metrics["success_combinations"] / audit_metrics["total_combinations"]) * 100
+        audit_metrics["failure_rate"] = (audit_metrics["failed_combinations"] / audit_metrics["total_combinations"]) * 100
+        audit_metrics["success_on_first_audit_rate"] = (audit_metrics["success_on_first_audit"] / audit_metrics["total_combinations"]) * 100
+        audit_metrics["success_after_correction_rate"] = (audit_metrics["success_after_correction"] / audit_metrics["total_combinations"]) * 100
     
-    # Look for audit files in the output directory
+    if audit_metrics["two_step_audits"] > 0:
+        audit_metrics["two_step_pass_rate"] = (audit_metrics["two_step_pass"] / audit_metrics["two_step_audits"]) * 100
+        audit_metrics["two_step_fail_rate"] = (audit_metrics["two_step_fail"] / audit_metrics["two_step_audits"]) * 100
+    
+    return audit_metrics
+
+
+def _find_audit_files(output_dir: str) -> List[str]:
+    """Audit files of every combination folder, plus legacy top-level ones"""
     audit_files = []
     
     # Check for single agent outputs
@@ -64,83 +224,149 @@ def _analyze_audit_data(output_dir: str) -> Dict[str, Any]:
     orchestrated_dir = os.path.join(output_dir, "orchestrated_output")
     if os.path.exists(orchestrated_dir):
         audit_files.extend(glob.glob(os.path.join(orchestrated_dir, "*audit*.json")))
+        # Per-combination folders (orchestrated_output/<combination>/)
+        audit_files.extend(glob.glob(os.path.join(orchestrated_dir, "*", "*audit*.json")))
     
     # Also check the parent directory for audit files
     parent_audit_files = glob.glob(os.path.join(output_dir, "*audit*.json"))
     audit_files.extend(parent_audit_files)
-    
-    # Analyze each audit file
-    for audit_file in audit_files:
-        try:
-            with open(audit_file, 'r') as f:
-                audit_data = json.load(f)
-            
-            audit_metrics["total_combinations"] += 1
-            
-            # Support both old ({verdict,...}) and new ({data:{verdict,...}, errors:[]}) schemas
-            node = audit_data.get("data") if isinstance(audit_data, dict) and isinstance(audit_data.get("data"), dict) else audit_data
-            # Check if compliant
-            if node.get("verdict") == "compliant":
-                audit_metrics["success_combinations"] += 1
-                # Check if this is a first audit success or after correction
-                if "audit_initial.json" in audit_file:
-                    audit_metrics["success_on_first_audit"] += 1
-                elif "audit_final.json" in audit_file:
-                    audit_metrics["success_after_correction"] += 1
-                else:
-                    # Default to first audit if we can't determine
-                    audit_metrics["success_on_first_audit"] += 1
-            else:
-                audit_metrics["failed_combinations"] += 1
-                
-                # Check for two-step audit (initial non-compliant, then corrected)
-                if "audit_initial.json" in audit_file and node.get("verdict") != "compliant":
-                    # Look for corresponding final audit
-                    final_audit_file = audit_file.replace("audit_initial.json", "audit_final.json")
-                    if os.path.exists(final_audit_file):
-                        audit_metrics["two_step_audits"] += 1
-                        try:
-                            with open(final_audit_file, 'r') as f:
-                                final_audit_data = json.load(f)
-                            if final_audit_data.get("verdict") == "compliant":
-                                audit_metrics["two_step_pass"] += 1
-                                audit_metrics["success_after_correction"] += 1
-                            else:
-                                audit_metrics["two_step_fail"] += 1
-                        except:
-                            pass
-            
-            # Count non-compliant rules (schema-compatible)
-            non_compliant_rules = node.get("non-compliant-rules", [])
-            for rule in non_compliant_rules:
-                audit_metrics["non_compliant_rules"][rule] += 1
-                
-        except Exception as e:
-            print(f"Warning: Could not analyze audit file {audit_file}: {e}")
-    
-    # Calculate rates
-    if audit_metrics["total_combinations"] > 0:
-        audit_metrics["success_rate"] = (audit_metrics["success_combinations"] / audit_metrics["total_combinations"]) * 100
-        audit_metrics["failure_rate"] = (audit_metrics["failed_combinations"] / audit_metrics["total_combinations"]) * 100
-        audit_metrics["success_on_first_audit_rate"] = (audit_metrics["success_on_first_audit"] / audit_metrics["total_combinations"]) * 100
-        audit_metrics["success_after_correction_rate"] = (audit_metrics["success_after_correction"] / audit_metrics["total_combinations"]) * 100
-    
-    if audit_metrics["two_step_audits"] > 0:
-        audit_metrics["two_step_pass_rate"] = (audit_metrics["two_step_pass"] / audit_metrics["two_step_audits"]) * 100
-        audit_metrics["two_step_fail_rate"] = (audit_metrics["two_step_fail"] / audit_metrics["two_step_audits"]) * 100
-    
-    return audit_metrics
+    return audit_files
 
 
-def _analyze_parameter_combinations(output_dir: str, setup: Dict[str, Any]) -> Dict[str, Any]:
-    """Analyze parameter combinations and their impact on metrics"""
-    parameter_analysis = {
+def _analyze_audit_data(output_dir: str) -> Dict[str, Any]:
+    """Analyze audit data from output directory to extract compliance metrics"""
+    audit_metrics = _empty_audit_metrics()
+    for audit_file in _find_audit_files(output_dir):
+        _add_audit_file(audit_metrics, audit_file)
+    return _compute_audit_rates(audit_metrics)
+
+
+def _iter_pipeline_entries(results: Dict[str, Any]):
+    """Yield (pipeline, entry) for every per-combination pipeline entry in results"""
+    for combination in results.values():
+        if not isinstance(combination, dict):
+            continue
+        for pipeline in ("single_agent", "orchestrated"):
+            entry = combination.get(pipeline)
+            if isinstance(entry, dict) and "exit_code" in entry:
+                yield pipeline, entry
+
+
+def _entry_duration(entry: Dict[str, Any]) -> Any:
+    """Measured pipeline duration of an entry (runner timing, else summed stage wall time)"""
+    timings = entry.get("timings") or {}
+    if timings.get("pipeline") is not None:
+        return timings["pipeline"]
+    metrics = entry.get("metrics") or {}
+    if metrics.get("calls"):
+        return metrics.get("wall_time")
+    return None
+
+
+def _empty_parameter_analysis() -> Dict[str, Any]:
+    return {
         "reasoning_impact": {},
         "model_impact": {},
         "verbosity_impact": {},
         "case_study_impact": {},
-        "mode_impact": {}
+        "mode_impact": {},
+        "stage_impact": {},
+        "token_usage": {"input_tokens": 0, "output_tokens": 0, "reasoning_tokens": 0, "retries": 0, "calls": 0},
+        "data_source": "metrics"
     }
+
+
+def _add_measured_entry(parameter_analysis: Dict[str, Any], pipeline: str, entry: Dict[str, Any]) -> bool:
+    """Fold one instrumented results entry into parameter_analysis; False when it carries no duration"""
+    if entry.get("cached"):
+        # Restored results did not spend time or tokens in this execution
+        return False
+    token_usage = parameter_analysis["token_usage"]
+    metrics = entry.get("metrics") or {}
+    for field in ("input_tokens", "output_tokens", "reasoning_tokens", "retries", "calls"):
+        token_usage[field] += metrics.get(field, 0) or 0
+    for stage, stage_totals in (metrics.get("stages") or {}).items():
+        stage_analysis = parameter_analysis["stage_impact"].setdefault(
+            stage, {"wall_time": [], "input_tokens": 0, "output_tokens": 0, "reasoning_tokens": 0, "retries": 0})
+        stage_analysis["wall_time"].append(stage_totals.get("wall_time", 0))
+        for field in ("input_tokens", "output_tokens", "reasoning_tokens", "retries"):
+            stage_analysis[field] += stage_totals.get(field, 0) or 0
+
+    duration = _entry_duration(entry)
+    if duration is None:
+        return False
+    reasoning = entry.get("reasoning") or {}
+    effort = reasoning.get("effort", "unknown") if isinstance(reasoning, dict) else str(reasoning)
+    parameter_analysis["reasoning_impact"].setdefault(effort, []).append(duration)
+    parameter_analysis["model_impact"].setdefault(entry.get("model", "unknown"), []).append(duration)
+    parameter_analysis["verbosity_impact"].setdefault(entry.get("verbosity", "unknown"), []).append(duration)
+    parameter_analysis["case_study_impact"].setdefault(entry.get("case", "unknown"), []).append(duration)
+    parameter_analysis["mode_impact"].setdefault(pipeline, []).append(duration)
+    return True
+
+
+def _analyze_measured_combinations(results: Dict[str, Any], parameter_analysis: Dict[str, Any]) -> bool:
+    """Fill parameter_analysis from instrumented results entries; False when none carry measurements"""
+    found = False
+    for pipeline, entry in _iter_pipeline_entries(results):
+        found = _add_measured_entry(parameter_analysis, pipeline, entry) or found
+    return found
+
+
+def _empty_report_aggregates() -> Dict[str, Any]:
+    """Per-entry aggregates the report is rendered from (see _add_report_entries)"""
+    return {
+        "parameter_analysis": _empty_parameter_analysis(),
+        "measured": False,
+        "timed_out": [],
+        "unlocated": [],
+        "crashed": [],
+        "requests": {},
+    }
+
+
+def _add_report_entries(aggregates: Dict[str, Any], combination_results: Dict[str, Any]) -> None:
+    """Fold the pipeline entries of one combination into the report aggregates"""
+    for pipeline, entry in _iter_pipeline_entries({"combination": combination_results}):
+        if _add_measured_entry(aggregates["parameter_analysis"], pipeline, entry):
+            aggregates["measured"] = True
+        if isinstance(entry.get("timeout"), dict):
+            aggregates["timed_out"].append((pipeline, entry))
+        if entry.get("crashed"):
+            aggregates["crashed"].append((pipeline, entry))
+        elif entry.get("run_dir_source") == "mtime-scan" or entry.get("error"):
+            aggregates["unlocated"].append((pipeline, entry))
+        add_request_summary(aggregates["requests"], entry.get("requests"))
+
+
+def _aggregate_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    aggregates = _empty_report_aggregates()
+    for combination_results in (results.values() if isinstance(results, dict) else []):
+        if isinstance(combination_results, dict):
+            _add_report_entries(aggregates, combination_results)
+    return aggregates
+
+
+def _analyze_parameter_combinations(output_dir: str, setup: Dict[str, Any], results: Dict[str, Any] = None,
+                                    scrape_summaries: bool = True) -> Dict[str, Any]:
+    """Analyze parameter combinations and their impact on metrics
+
+    Durations and tokens come from the instrumented results entries (runner
+    timings and stage metrics sidecars). Results without any measurement fall
+    back to scraping "Duration:" lines from summary markdown files, unless
+    scrape_summaries is False (incremental reports).
+    """
+    parameter_analysis = _empty_parameter_analysis()
+    if results and _analyze_measured_combinations(results, parameter_analysis):
+        return parameter_analysis
+    if scrape_summaries:
+        _scrape_summary_durations(parameter_analysis, output_dir, setup)
+    return parameter_analysis
+
+
+def _scrape_summary_durations(parameter_analysis: Dict[str, Any], output_dir: str, setup: Dict[str, Any]) -> None:
+    """Add the "Duration:" lines of summary markdown files (uninstrumented pipelines) to parameter_analysis"""
+    parameter_analysis["data_source"] = "summary-scrape"
     
     # Extract parameter combinations from setup
     advanced_params = setup.get("advanced_params", {})
@@ -187,16 +413,27 @@ def _analyze_parameter_combinations(output_dir: str, setup: Dict[str, Any]) -> D
                                         parameter_analysis["verbosity_impact"][verbosity].append(duration)
                         except Exception as e:
                             print(f"Warning: Could not analyze summary file {summary_file}: {e}")
-    
-    return parameter_analysis
 
 
-def _write_scientific_report(f, execution_id: str, setup: Dict[str, Any], results: Dict[str, Any], output_dir: str) -> None:
-    """Write comprehensive scientific report with detailed metrics analysis"""
+def _write_scientific_report(f, execution_id: str, setup: Dict[str, Any], results: Dict[str, Any], output_dir: str,
+                             audit_metrics: Dict[str, Any] = None, scrape_summaries: bool = True,
+                             aggregates: Dict[str, Any] = None) -> None:
+    """Write comprehensive scientific report with detailed metrics analysis
+
+    audit_metrics and aggregates (_empty_report_aggregates), when given, are
+    used instead of scanning output_dir for audit files and analyzing results;
+    results then only provide the budget summary.
+    """
     
     # Analyze audit data and parameter combinations
-    audit_metrics = _analyze_audit_data(output_dir)
-    parameter_analysis = _analyze_parameter_combinations(output_dir, setup)
+    if audit_metrics is None:
+        audit_metrics = _analyze_audit_data(output_dir)
+    if aggregates is None:
+        aggregates = _aggregate_results(results)
+    parameter_analysis = aggregates["parameter_analysis"]
+    if not aggregates["measured"] and scrape_summaries:
+        parameter_analysis = copy.deepcopy(parameter_analysis)
+        _scrape_summary_durations(parameter_analysis, output_dir, setup)
     
     # Header
     f.write(f"# Scientific Experiment Report\n\n")
@@ -342,8 +579,97 @@ def _write_scientific_report(f, execution_id: str, setup: Dict[str, Any], result
         f.write(f"- **Fastest Configuration:** {min_duration:.2f}s\n")
         f.write(f"- **Slowest Configuration:** {max_duration:.2f}s\n")
         f.write(f"- **Time Variance:** {((max_duration - min_duration) / min_duration * 100):.1f}% difference\n")
+    f.write(f"- **Timing Source:** {'runner timings and stage metrics' if parameter_analysis['data_source'] == 'metrics' else 'summary files'}\n")
     f.write(f"\n")
     
+    # Token Usage (stage metrics sidecars)
+    token_usage = parameter_analysis["token_usage"]
+    f.write(f"#### Token Usage\n")
+    if token_usage["calls"]:
+        f.write(f"- **LLM Calls:** {token_usage['calls']} ({token_usage['retries']} retries)\n")
+        f.write(f"- **Input Tokens:** {token_usage['input_tokens']}\n")
+        f.write(f"- **Output Tokens:** {token_usage['output_tokens']}\n")
+        f.write(f"- **Reasoning Tokens:** {token_usage['reasoning_tokens']}\n")
+    else:
+        f.write(f"- **Token Usage:** N/A (no stage metrics recorded)\n")
+    f.write(f"\n")
+    
+    # Runs stopped by the watchdog (--run-timeout / --stage-timeout / --idle-timeout)
+    timed_out = aggregates["timed_out"]
+    if timed_out:
+        f.write(f"#### Timeouts\n")
+        for pipeline, entry in timed_out:
+            timeout = entry["timeout"]
+            salvaged = entry.get("salvaged_files")
+            f.write(f"- **{pipeline} {entry.get('case')}/{entry.get('model')}/"
+                    f"{(entry.get('reasoning') or {}).get('effort')}/{entry.get('verbosity')}:** killed after "
+                    f"{timeout.get('elapsed', 0):.0f}s ({timeout.get('reason')} limit {timeout.get('limit', 0):.0f}s), "
+                    f"{salvaged if salvaged is not None else 'no'} partial file(s) salvaged\n")
+        f.write(f"\n")
+    
+    # Combinations whose runner raised instead of returning an exit code
+    crashed = aggregates["crashed"]
+    if crashed:
+        f.write(f"#### Runner Errors\n")
+        for pipeline, entry in crashed:
+            f.write(f"- **{pipeline} {entry.get('case')}/{entry.get('model')}/"
+                    f"{(entry.get('reasoning') or {}).get('effort')}/{entry.get('verbosity')}:** {entry.get('error')}\n")
+        f.write(f"\n")
+    
+    # Runs whose run directory was not reported through the handoff
+    unlocated = aggregates["unlocated"]
+    if unlocated:
+        f.write(f"#### Run Directory Handoff\n")
+        for pipeline, entry in unlocated:
+            outcome = ("outputs taken from the newest run directory" if entry.get("run_dir_source") == "mtime-scan"
+                       else f"failed, {entry.get('error')}")
+            f.write(f"- **{pipeline} {entry.get('case')}/{entry.get('model')}/"
+                    f"{(entry.get('reasoning') or {}).get('effort')}/{entry.get('verbosity')}:** {outcome}\n")
+        f.write(f"\n")
+    
+    # Budget governor (--max-cost / --max-wall-time)
+    budget = results.get("budget") if isinstance(results, dict) else None
+    if isinstance(budget, dict):
+        f.write(f"#### Budget\n")
+        max_cost = budget.get("max_cost")
+        max_wall_time = budget.get("max_wall_time")
+        f.write(f"- **Estimated Cost:** ${budget.get('spent_cost', 0):.4f}"
+                f"{f' of ${max_cost:.2f}' if max_cost is not None else ''}\n")
+        f.write(f"- **Wall Time:** {budget.get('wall_time', 0):.1f}s"
+                f"{f' of {max_wall_time:.0f}s' if max_wall_time is not None else ''}\n")
+        for downgrade in budget.get("downgraded", []):
+            f.write(f"- **Downgraded:** {downgrade['from']} -> {downgrade['to']}\n")
+        if budget.get("skipped"):
+            f.write(f"- **Not Run (partial report):** {len(budget['skipped'])} combination(s): "
+                    f"{', '.join(budget['skipped'])}\n")
+            f.write(f"- **Stop Reason:** {budget.get('stopped_reason')}\n")
+        f.write(f"\n")
+    
+    # Stage Timing
+    if parameter_analysis["stage_impact"]:
+        f.write(f"#### Stage Timing\n")
+        for stage, stage_analysis in parameter_analysis["stage_impact"].items():
+            durations = stage_analysis["wall_time"]
+            avg_duration = sum(durations) / len(durations) if durations else 0
+            f.write(f"- **{stage}:** {avg_duration:.2f}s average over {len(durations)} run(s), "
+                    f"{stage_analysis['input_tokens']} in / {stage_analysis['output_tokens']} out / "
+                    f"{stage_analysis['reasoning_tokens']} reasoning tokens, {stage_analysis['retries']} retries\n")
+        f.write(f"\n")
+    
+    # Request Latency (request policy logs): tail latency, retries and hedges per stage
+    requests = aggregates["requests"]
+    if requests:
+        f.write(f"#### Request Latency\n")
+        labels = histogram_labels()
+        for stage, stage_requests in requests.items():
+            buckets = ", ".join(f"{label}: {count}" for label, count in zip(labels, stage_requests["histogram"]) if count)
+            f.write(f"- **{stage}:** {stage_requests['requests']} request(s), p50 {stage_requests['p50']:.2f}s, "
+                    f"p90 {stage_requests['p90']:.2f}s, p99 {stage_requests['p99']:.2f}s; "
+                    f"{stage_requests['retries']} retries, {stage_requests['hedged']} hedged "
+                    f"({stage_requests['hedge_wins']} won by the hedge), {stage_requests['failed']} failed "
+                    f"[{buckets}]\n")
+        f.write(f"\n")
+    
     # Compliance Analysis
     f.write(f"#### Compliance Analysis\n")
     f.write(f"- **Initial Compliance Rate:** {audit_metrics.get('success_rate', 0):.1f}% ({audit_metrics['success_combinations']}/{audit_metrics['total_combinations']} cases)\n")
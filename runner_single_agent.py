@@ -1,38 +1,18 @@
 import os
 import sys
-import subprocess
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 import time
 
-# Import utils functions directly since we're using dynamic imports
-def copy_output_files_to_experimentation(source_dir: str, target_dir: str, mode: str, case: str = None, model: str = None, reasoning: str = None, verbosity: str = None) -> None:
-    """Copy all generated output files from orchestration/single-agent to experimentation output folder."""
-    import shutil
-    
-    # Create target subdirectory for this mode with parameter-specific naming
-    # Order: case study model name, ai model name, reasoning, verbosity level
-    if case and model and reasoning and verbosity:
-        param_dir = f"{case}-{model}-reason-{reasoning}-verb-{verbosity}"
-        mode_dir = os.path.join(target_dir, f"{mode}_output", param_dir)
-    else:
-        mode_dir = os.path.join(target_dir, f"{mode}_output")
-    os.makedirs(mode_dir, exist_ok=True)
-    
-    # Copy all files from source to target
-    if os.path.exists(source_dir):
-        for root, dirs, files in os.walk(source_dir):
-            for file in files:
-                source_file = os.path.join(root, file)
-                # Calculate relative path to maintain structure
-                rel_path = os.path.relpath(source_file, source_dir)
-                target_file = os.path.join(mode_dir, rel_path)
-                
-                # Create target directory if needed
-                os.makedirs(os.path.dirname(target_file), exist_ok=True)
-                
-                # Copy file
-                shutil.copy2(source_file, target_file)
-                print(f"Copied: {rel_path} -> {target_file}")
+# Runners are loaded dynamically by file path, so make sibling modules importable
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+from utils import (combination_output_dir, copy_output_files_to_experimentation, run_logged_subprocess,
+                   list_run_dirs, new_run_id, pick_new_run_dir, prepare_run_handoff, read_run_handoff,
+                   salvage_partial_outputs, RUN_HANDOFF_FILE)
+from stage_metrics import METRICS_FILE, METRICS_FILE_ENV, load_stage_metrics, summarize_stage_metrics
+from request_policy import REQUEST_LOG_FILE, ingest_request_log, prepare_request_policy
+from image_dedup import prepare_widget_scope
 
 
 def _find_latest_run_dir_single_agent(repo_root: str) -> Optional[str]:
@@ -69,10 +49,21 @@ def _find_latest_run_dir_single_agent(repo_root: str) -> Optional[str]:
 
 
 
-def run_without_orchestration_imports(repo_root: str, persona: str, case: Optional[str], model: Optional[str], reasoning: Optional[str], verbosity: Optional[str], output_dir: str) -> int:
+def run_without_orchestration_imports(repo_root: str, persona: str, case: Optional[str], model: Optional[str], reasoning: Optional[str], verbosity: Optional[str], output_dir: str, echo: bool = True, run_info: Optional[Dict[str, Any]] = None, concurrent: bool = False) -> int:
     """
     Run single agent pipeline using direct imports instead of subprocess.
     Execute the real single agent pipeline via import if possible; otherwise delegate to subprocess.
+    With echo=False the pipeline output only goes to the combination log (used by parallel sweeps).
+    The child pipeline receives an explicit run ID and reports its run directory
+    back through a handoff file; run_info, when given, is filled with run_id,
+    run_dir, run_dir_source ("handoff", "new-dir", "mtime-scan" or None), the manifest of
+    collected files, per-phase timings in seconds (spawn, pipeline,
+    discovery, copy) and the per-stage metrics summary from the sidecar
+    (see stage_metrics.py).
+    Without a handoff, the directory that appeared under output/runs during the
+    run is used when it is unambiguous ("new-dir"). Otherwise, with
+    concurrent=True (parallel sweeps) the run fails instead of guessing the
+    newest directory.
     """
     try:
         # Validate input parameters
@@ -91,17 +82,59 @@ def run_without_orchestration_imports(repo_root: str, persona: str, case: Option
         print(f"Using reasoning: {reasoning or 'medium'}")
         print(f"Using verbosity: {verbosity or 'low'}")
         
+        run_info = run_info if run_info is not None else {}
+        run_id = new_run_id("single_agent")
+        run_info["run_id"] = run_id
+        timings = run_info.setdefault("timings", {})
+        watchdog: Dict[str, Any] = {}
+
+        # Snapshot of the run directories, to find this run's directory if the pipeline writes no handoff
+        runs_root = os.path.join(repo_root, "code-netlogo-to-lucim-single-agent", "output", "runs")
+        runs_before = list_run_dirs(runs_root, 3)
+
         # Force subprocess variant (stable path)
-        rc = run_without_orchestration(repo_root, persona, case, model, reasoning, verbosity, output_dir)
+        rc = run_without_orchestration(repo_root, persona, case, model, reasoning, verbosity, output_dir, echo=echo, run_id=run_id, timings=timings,
+                                       watchdog=watchdog)
+        # Ingest the per-stage metrics sidecar, also for failed runs
+        combination_dir = combination_output_dir(output_dir, "single_agent", case, model, reasoning, verbosity)
+        run_info["metrics"] = summarize_stage_metrics(load_stage_metrics(os.path.join(combination_dir, METRICS_FILE)))
+        run_info["requests"] = ingest_request_log(os.path.join(combination_dir, REQUEST_LOG_FILE))
+        if watchdog:
+            # Killed by the watchdog: keep what the run produced and let the sweep move on
+            run_info["timeout"] = watchdog
+            run_info["manifest"] = salvage_partial_outputs(os.path.join(combination_dir, RUN_HANDOFF_FILE), run_id,
+                                                           output_dir, "single_agent", case, model, reasoning, verbosity,
+                                                           quiet=not echo)
         if rc != 0:
             return rc
 
         # Only copy outputs if the pipeline actually succeeded
-        # Locate latest single-agent outputs and copy to experimentation folder
-        latest_dir = _find_latest_run_dir_single_agent(repo_root)
+        # Locate this run's single-agent outputs and copy to experimentation folder
+        phase_start = time.perf_counter()
+        handoff_file = os.path.join(combination_dir, RUN_HANDOFF_FILE)
+        latest_dir = read_run_handoff(handoff_file, run_id)
+        run_info["run_dir_source"] = "handoff"
+        if not latest_dir:
+            # No handoff: the directory that appeared during this run, if it is unambiguous
+            latest_dir = pick_new_run_dir(runs_before, list_run_dirs(runs_root, 3), [case, model])
+            run_info["run_dir_source"] = "new-dir" if latest_dir else None
+        if not latest_dir and concurrent:
+            # Other runs are writing to output/runs; the newest directory may be theirs
+            run_info["error"] = "run directory not reported by the pipeline (no handoff) and not identifiable"
+            raise RuntimeError("single-agent pipeline did not report its run directory; not guessing one during a parallel sweep")
+        if not latest_dir:
+            # Older pipelines do not write the handoff; the newest directory is only
+            # reliable when no other run is writing to output/runs concurrently.
+            print("Warning: single-agent pipeline did not report its run directory; falling back to the newest run directory")
+            latest_dir = _find_latest_run_dir_single_agent(repo_root)
+            run_info["run_dir_source"] = "mtime-scan"
         if not latest_dir:
             raise RuntimeError("Could not locate single-agent output directory")
-        copy_output_files_to_experimentation(latest_dir, output_dir, "single_agent", case, model, reasoning, verbosity)
+        run_info["run_dir"] = latest_dir
+        timings["discovery"] = time.perf_counter() - phase_start
+        phase_start = time.perf_counter()
+        run_info["manifest"] = copy_output_files_to_experimentation(latest_dir, output_dir, "single_agent", case, model, reasoning, verbosity, quiet=not echo)
+        timings["copy"] = time.perf_counter() - phase_start
 
 
         print("Single agent pipeline completed successfully")
@@ -121,7 +154,7 @@ def run_without_orchestration_imports(repo_root: str, persona: str, case: Option
         return 1
 
 
-def run_without_orchestration(repo_root: str, persona: str, case: Optional[str], model: Optional[str], reasoning: Optional[str], verbosity: Optional[str], output_dir: str) -> int:
+def run_without_orchestration(repo_root: str, persona: str, case: Optional[str], model: Optional[str], reasoning: Optional[str], verbosity: Optional[str], output_dir: str, echo: bool = True, run_id: Optional[str] = None, timings: Optional[Dict[str, float]] = None, watchdog: Optional[Dict[str, Any]] = None) -> int:
     """Run the single agent pipeline via subprocess"""
     scripts_path = os.path.join(repo_root, "code-netlogo-to-lucim-single-agent", "scripts")
     candidate = os.path.join(scripts_path, "run_default.py")
@@ -153,10 +186,18 @@ def run_without_orchestration(repo_root: str, persona: str, case: Optional[str],
     
     os.makedirs(output_dir, exist_ok=True)
     
-    # Create single_agent_output subdirectory and place log there
-    single_agent_output_dir = os.path.join(output_dir, "single_agent_output")
+    # Create the combination subdirectory under single_agent_output and place log there
+    single_agent_output_dir = combination_output_dir(output_dir, "single_agent", case, model, reasoning, verbosity)
     os.makedirs(single_agent_output_dir, exist_ok=True)
     log_file = os.path.join(single_agent_output_dir, "single_agent_output.log")
+    if run_id:
+        prepare_run_handoff(env, run_id, os.path.join(single_agent_output_dir, RUN_HANDOFF_FILE))
+    metrics_file = os.path.join(single_agent_output_dir, METRICS_FILE)
+    if os.path.exists(metrics_file):
+        os.remove(metrics_file)
+    env[METRICS_FILE_ENV] = metrics_file
+    prepare_request_policy(env, os.path.join(single_agent_output_dir, REQUEST_LOG_FILE))
+    prepare_widget_scope(env, model, reasoning, persona)
     print(f"Running single agent pipeline: {' '.join(cmd)}")
     print(f"Logging to: {log_file}")
     
@@ -164,13 +205,7 @@ def run_without_orchestration(repo_root: str, persona: str, case: Optional[str],
     # "input-task/single-agent-task" resolve correctly.
     single_agent_cwd = os.path.join(repo_root, "code-netlogo-to-lucim-single-agent")
 
-    with open(log_file, "w", encoding="utf-8") as logf:
-        proc = subprocess.Popen(cmd, cwd=single_agent_cwd, stdout=subprocess.PIPE,
-                               stderr=subprocess.STDOUT, env=env, text=True, bufsize=1)
-        for line in proc.stdout:
-            print(f"[SINGLE-AGENT] {line}", end="")
-            logf.write(line)
-            logf.flush()
-        proc.wait()
-        print(f"Single agent pipeline completed with exit code: {proc.returncode}")
-        return proc.returncode
+    returncode = run_logged_subprocess(cmd, single_agent_cwd, env, log_file, "[SINGLE-AGENT]", echo=echo, timings=timings,
+                                       watchdog=watchdog, stage_file=metrics_file)
+    print(f"Single agent pipeline completed with exit code: {returncode}")
+    return returncode
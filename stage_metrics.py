@@ -0,0 +1,127 @@
+"""
+Per-stage metrics sidecar shared by the runners and the child pipelines.
+
+The runner exports PIPELINE_METRICS_FILE to the child pipeline; each stage
+(generator, auditor, corrector iteration, ...) appends one JSON line there with
+its wall time, queue time, token usage and retry count. After the run the
+runner ingests the file into the combination's results entry, so the report
+uses measured numbers instead of parsing summary markdown.
+
+A pipeline records a stage with:
+
+    from stage_metrics import record_stage_metrics
+    record_stage_metrics("lucim_operation_model_auditor", wall_time=12.4,
+                         input_tokens=5120, output_tokens=830, reasoning_tokens=256,
+                         retries=0, iteration=1)
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+METRICS_FILE_ENV = "PIPELINE_METRICS_FILE"
+METRICS_FILE = "stage_metrics.jsonl"
+
+TOTAL_FIELDS = ("wall_time", "queue_time", "input_tokens", "output_tokens", "reasoning_tokens", "retries")
+
+_write_lock = threading.Lock()
+
+
+def record_stage_metrics(stage: str, wall_time: float, queue_time: float = 0.0, input_tokens: int = 0,
+                         output_tokens: int = 0, reasoning_tokens: int = 0, retries: int = 0,
+                         iteration: Optional[int] = None, path: Optional[str] = None, **extra: Any) -> bool:
+    """
+    Append one stage record to the metrics sidecar.
+
+    Args:
+        stage: Stage name (e.g. "lucim_scenario_generator")
+        wall_time: Stage wall time in seconds, including retries
+        queue_time: Time spent waiting before the request was sent (rate limiting, backoff)
+        input_tokens, output_tokens, reasoning_tokens: Token usage reported by the API
+        retries: Number of retried requests
+        iteration: Audit/correction iteration, when the stage is part of a loop
+        path: Sidecar path; defaults to $PIPELINE_METRICS_FILE
+        extra: Additional JSON-serializable fields
+
+    Returns:
+        False when no sidecar path is configured (metrics are then dropped)
+    """
+    path = path or os.environ.get(METRICS_FILE_ENV)
+    if not path:
+        return False
+    record = {
+        "stage": stage,
+        "timestamp": time.time(),
+        "wall_time": wall_time,
+        "queue_time": queue_time,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "reasoning_tokens": reasoning_tokens,
+        "retries": retries,
+    }
+    if iteration is not None:
+        record["iteration"] = iteration
+    record.update(extra)
+    line = json.dumps(record) + "\n"
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    return True
+
+
+def load_stage_metrics(path: str) -> List[Dict[str, Any]]:
+    """Read a sidecar, skipping malformed lines (e.g. a partial last line of a killed run)."""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("stage"):
+                    records.append(record)
+    except OSError:
+        pass
+    return records
+
+
+def _empty_totals() -> Dict[str, Any]:
+    totals: Dict[str, Any] = {field: 0 for field in TOTAL_FIELDS}
+    totals["calls"] = 0
+    return totals
+
+
+def _add(totals: Dict[str, Any], record: Dict[str, Any]) -> None:
+    for field in TOTAL_FIELDS:
+        value = record.get(field) or 0
+        if isinstance(value, (int, float)):
+            totals[field] += value
+    totals["calls"] += 1
+
+
+def summarize_stage_metrics(records: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Aggregate stage records into run totals plus per-stage totals.
+
+    Returns:
+        {"wall_time", "queue_time", "input_tokens", "output_tokens",
+         "reasoning_tokens", "retries", "calls", "stages": {stage: {...same..., "iterations"}}}
+        or None when there are no records
+    """
+    if not records:
+        return None
+    summary = _empty_totals()
+    stages: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        _add(summary, record)
+        stage = stages.setdefault(record["stage"], _empty_totals())
+        _add(stage, record)
+        if "iteration" in record:
+            stage["iterations"] = max(stage.get("iterations", 0), int(record["iteration"]))
+    summary["stages"] = stages
+    return summary
@@ -0,0 +1,119 @@
+"""
+Worker pool for running parameter combinations concurrently.
+
+Each combination is an independent job (its own output folder and log), so the
+sweep is bound by network latency rather than CPU and a thread pool is enough:
+every worker spends its time waiting on a pipeline subprocess.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _format_elapsed(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+class SweepProgress:
+    """Combined, thread-safe progress display for a parallel sweep."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.running = 0
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.start_time = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _line(self, event: str) -> str:
+        elapsed = _format_elapsed(time.perf_counter() - self.start_time)
+        return (f"[PROGRESS] {self.done}/{self.total} done | {self.running} running | "
+                f"{self.failed} failed | {self.skipped} skipped | elapsed {elapsed} | {event}")
+
+    def started(self, label: str) -> None:
+        with self._lock:
+            self.running += 1
+            print(self._line(f"started {label}"), flush=True)
+
+    def finished(self, label: str, ok: bool, duration: float) -> None:
+        with self._lock:
+            self.running -= 1
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            status = "ok" if ok else "FAILED"
+            print(self._line(f"finished {label} ({status}, {duration:.1f}s)"), flush=True)
+
+    def skipped_job(self, label: str) -> None:
+        """A job that did not run (None result, e.g. stopped by the budget governor)."""
+        with self._lock:
+            self.running -= 1
+            self.done += 1
+            self.skipped += 1
+            print(self._line(f"skipped {label}"), flush=True)
+
+
+def _combination_ok(combination_results: Any) -> bool:
+    """A combination is successful when every pipeline it ran exited with code 0."""
+    if not isinstance(combination_results, dict):
+        return False
+    return all(entry.get("exit_code") == 0 for entry in combination_results.values() if isinstance(entry, dict))
+
+
+def order_longest_first(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Longest-processing-time-first ordering on the job "weight" (estimated duration).
+
+    Starting the heaviest jobs first keeps a pool's total wall time close to the
+    longest single job instead of leaving it running alone at the end. The sort
+    is stable, so equally weighted jobs keep their matrix order.
+    """
+    return sorted(jobs, key=lambda job: job.get("weight", 0), reverse=True)
+
+
+def run_jobs_parallel(jobs: List[Dict[str, Any]], run_job: Callable[[Dict[str, Any]], Any],
+                      max_workers: int,
+                      on_error: Optional[Callable[[Dict[str, Any], Exception], Any]] = None
+                      ) -> List[Tuple[Dict[str, Any], Any]]:
+    """
+    Run jobs on a pool of max_workers threads.
+
+    Args:
+        jobs: Job descriptions; each must carry a "key" used in progress lines
+        run_job: Callable executing one job and returning its combination results,
+            or None when the job was skipped (counted as skipped, not failed)
+        max_workers: Number of concurrent jobs
+        on_error: Builds the result of a job that raised from (job, exception);
+            defaults to {"error": "<message>"}
+
+    Returns:
+        (job, result) pairs in the original job order. A job that raised gets
+        on_error's result so the sweep continues.
+    """
+    progress = SweepProgress(len(jobs))
+    results: Dict[int, Any] = {}
+
+    def _worker(index: int, job: Dict[str, Any]) -> Any:
+        progress.started(job["key"])
+        start = time.perf_counter()
+        try:
+            result = run_job(job)
+        except Exception as e:
+            progress.finished(job["key"], False, time.perf_counter() - start)
+            return on_error(job, e) if on_error is not None else {"error": str(e)}
+        if result is None:
+            progress.skipped_job(job["key"])
+        else:
+            progress.finished(job["key"], _combination_ok(result), time.perf_counter() - start)
+        return result
+
+    print(f"Running {len(jobs)} combination(s) with {max_workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(_worker, i, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    return [(job, results[i]) for i, job in enumerate(jobs)]
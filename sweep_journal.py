@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Append-only checkpoint journal of a sweep.
+
+Every execution keeps output/<execution_id>/sweep_journal.jsonl. The first
+line records the setup (mode, persona, cases, label, advanced parameters,
+MAX_AUDIT), so that the sweep can be rebuilt without the interactive prompts.
+Each combination then gets a line per state change:
+
+    {"event": "pending", "key": ..., "case": ..., "combination": {...}}
+    {"event": "running", "key": ...}
+    {"event": "done" | "failed", "key": ..., "result_key": ..., "result": {...}}
+    {"event": "failed", "key": ..., "error": ...}
+
+The second failed form is written when running a combination raised, or for
+a combination found "running" when the journal is reopened. result_key
+differs from key when the budget governor downgraded the combination. Lines
+are flushed and fsynced as they are written, so a crash or Ctrl-C loses at
+most the combinations that were running. The last line of a
+key gives its state; a partial last line (killed process) is ignored.
+
+main.py --resume <execution_id> reads the journal, keeps the "done"
+combinations and re-runs the failed, interrupted and never-started ones.
+The report is then written from the journaled results plus the new ones.
+
+Usage:
+    python sweep_journal.py status 2025-01-01/1200-persona-v3-limited-agents-with
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+JOURNAL_FILE = "sweep_journal.jsonl"
+STATES = ("pending", "running", "done", "failed")
+
+
+def journal_path(execution_id: str, output_dir: str = OUTPUT_DIR) -> str:
+    return os.path.join(output_dir, execution_id, JOURNAL_FILE)
+
+
+def combination_succeeded(combination_results: Any) -> bool:
+    """True when every pipeline of a combination exited with 0."""
+    if not isinstance(combination_results, dict) or not combination_results:
+        return False
+    return all(isinstance(entry, dict) and entry.get("exit_code") == 0 for entry in combination_results.values())
+
+
+def load_journal(path: str) -> Dict[str, Any]:
+    """
+    Replay a journal.
+
+    Returns:
+        {"setup": dict or None, "jobs": {key: last record of key}, "order": [keys in first-seen order]}
+    """
+    journal: Dict[str, Any] = {"setup": None, "jobs": {}, "order": []}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                if record.get("event") == "setup":
+                    journal["setup"] = record.get("setup")
+                elif record.get("event") in STATES and record.get("key"):
+                    if record["key"] not in journal["jobs"]:
+                        journal["order"].append(record["key"])
+                    # "running" carries no job details; keep those of the pending record
+                    previous = journal["jobs"].get(record["key"], {})
+                    journal["jobs"][record["key"]] = dict(previous, **record)
+    except OSError:
+        pass
+    return journal
+
+
+def _ends_with_partial_line(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except OSError:
+        return False
+
+
+class SweepJournal:
+    """
+    Writer of a sweep journal, safe to use from the worker threads of a parallel sweep.
+
+    Args:
+        path: Journal file (see journal_path); appended to when it exists
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.replayed = load_journal(path)
+        self._partial_line = _ends_with_partial_line(path)
+        # Nothing is running yet: "running" entries were interrupted with the previous process
+        for record in list(self.replayed["jobs"].values()):
+            if record.get("event") == "running":
+                self.failed(record, "interrupted while running")
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        record["time"] = time.time()
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            if self._partial_line:
+                # Terminate the line a killed process left unfinished, or it would swallow this record
+                line = "\n" + line
+                self._partial_line = False
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def record_setup(self, setup: Dict[str, Any]) -> None:
+        if self.replayed["setup"] is None:
+            self._append({"event": "setup", "setup": setup})
+            self.replayed["setup"] = setup
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """Journal records of the combinations already done, by key."""
+        return {key: record for key, record in self.replayed["jobs"].items() if record.get("event") == "done"}
+
+    def pending(self, job: Dict[str, Any]) -> None:
+        self._append({"event": "pending", "key": job["key"], "case": job["case"], "combination": job["combination"]})
+
+    def running(self, job: Dict[str, Any]) -> None:
+        self._append({"event": "running", "key": job["key"]})
+
+    def finished(self, job: Dict[str, Any], result_key: str, combination_results: Dict[str, Any]) -> None:
+        """Record the outcome of job (as run under result_key)."""
+        self._record({"event": "done" if combination_succeeded(combination_results) else "failed",
+                      "key": job["key"], "result_key": result_key, "result": combination_results})
+
+    def failed(self, job: Dict[str, Any], error: Any) -> None:
+        """Record that job did not finish (an exception or an interrupted process)."""
+        self._record({"event": "failed", "key": job["key"], "error": str(error)})
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        self._append(record)
+        with self._lock:
+            previous = self.replayed["jobs"].get(record["key"], {})
+            self.replayed["jobs"][record["key"]] = dict(previous, **record)
+
+
+def print_status(journal: Dict[str, Any]) -> None:
+    counts = {state: 0 for state in STATES}
+    for key in journal["order"]:
+        record = journal["jobs"][key]
+        counts[record["event"]] += 1
+        label = record["event"]
+        if record.get("result_key") not in (None, key):
+            label += f" as {record['result_key']}"
+        print(f"{label:<12} {key}")
+    setup = journal["setup"] or {}
+    print(f"\n{setup.get('execution_id', '?')}: " + ", ".join(f"{count} {state}" for state, count in counts.items()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect the checkpoint journal of a sweep")
+    sub = parser.add_subparsers(dest="command", required=True)
+    status = sub.add_parser("status", help="Print the state of every combination")
+    status.add_argument("execution_id")
+    args = parser.parse_args(argv)
+
+    path = journal_path(args.execution_id)
+    if not os.path.exists(path):
+        print(f"No journal at {path}")
+        return 1
+    print_status(load_journal(path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
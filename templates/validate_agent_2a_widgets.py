@@ -5,7 +5,11 @@ Validates against the schema and provides detailed error reporting
 """
 
 import json
+import os
+import time
 import jsonschema
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, Optional
 
@@ -23,26 +27,41 @@ def load_schema() -> Dict[str, Any]:
     with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+@lru_cache(maxsize=1)
+def _default_validator():
+    """Validator for the bundled schema, compiled once per process."""
+    return _compile_validator(load_schema())
+
+def _compile_validator(schema: Dict[str, Any]):
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+def get_validator(schema: Optional[Dict[str, Any]] = None):
+    """Return a compiled validator; the bundled schema's validator is cached at module level."""
+    if schema is None:
+        return _default_validator()
+    return _compile_validator(schema)
+
 def validate_widget_json(data: Any, schema: Optional[Dict[str, Any]] = None) -> Tuple[bool, List[str]]:
     """
     Validate widget JSON data against schema.
     
     Args:
         data: JSON data to validate (can be string, dict, or list)
-        schema: Optional schema dict; if None, loads from file
+        schema: Optional schema dict; if None, uses the cached validator of the bundled schema
         
     Returns:
-        Tuple of (is_valid, error_messages)
+        Tuple of (is_valid, error_messages), listing every schema error rather than only the first
     """
     errors = []
     
-    # Load schema if not provided
-    if schema is None:
-        try:
-            schema = load_schema()
-        except Exception as e:
-            errors.append(f"Failed to load schema: {e}")
-            return False, errors
+    # Compile (or reuse) the validator
+    try:
+        validator = get_validator(schema)
+    except Exception as e:
+        errors.append(f"Failed to load schema: {e}")
+        return False, errors
     
     # Parse JSON if string
     if isinstance(data, str):
@@ -52,13 +71,12 @@ def validate_widget_json(data: Any, schema: Optional[Dict[str, Any]] = None) ->
             errors.append(f"Invalid JSON: {e}")
             return False, errors
     
-    # Validate against schema
+    # Validate against schema, collecting all errors
     try:
-        jsonschema.validate(data, schema)
-    except jsonschema.ValidationError as e:
-        errors.append(f"Schema validation error: {e.message}")
-        if e.path:
-            errors.append(f"  Path: {' -> '.join(str(p) for p in e.path)}")
+        for e in sorted(validator.iter_errors(data), key=lambda err: [str(p) for p in err.path]):
+            errors.append(f"Schema validation error: {e.message}")
+            if e.path:
+                errors.append(f"  Path: {' -> '.join(str(p) for p in e.path)}")
     except Exception as e:
         errors.append(f"Validation error: {e}")
         return False, errors
@@ -84,37 +102,115 @@ def validate_widget_json(data: Any, schema: Optional[Dict[str, Any]] = None) ->
     return len(errors) == 0, errors
 
 def validate_file(file_path: Path) -> Tuple[bool, List[str]]:
-    """Validate a JSON file containing widget data."""
+    """Validate a JSON file containing widget data.
+
+    Pipeline outputs wrapped as {"data": [...], "errors": ...} are unwrapped first.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        return validate_widget_json(data)
     except Exception as e:
         return False, [f"File read error: {e}"]
+    if isinstance(data, dict) and isinstance(data.get('data'), list):
+        data = data['data']
+    return validate_widget_json(data)
+
+def _validate_path(path: str) -> Tuple[str, bool, List[str]]:
+    is_valid, errors = validate_file(Path(path))
+    return path, is_valid, errors
+
+def collect_widget_files(targets: List[Path], all_json: bool = False) -> List[Path]:
+    """
+    Expand files and directories into the list of JSON files to validate.
+
+    Files are taken as given. Directories are searched recursively for JSON
+    files belonging to Agent 2a outputs (a "02a" path component or file name),
+    or for every JSON file when all_json is set.
+    """
+    files = []
+    for target in targets:
+        if target.is_dir():
+            for candidate in sorted(target.rglob('*.json')):
+                rel_parts = candidate.relative_to(target).parts
+                if all_json or any('02a' in part for part in rel_parts):
+                    files.append(candidate)
+        else:
+            files.append(target)
+    return files
+
+def validate_files(paths: List[Path], jobs: Optional[int] = None) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    Validate many widget JSON files, in parallel across a process pool.
+
+    Each worker compiles the schema validator once and reuses it for all the
+    files it receives. jobs=1 validates in-process.
+
+    Returns:
+        {path: (is_valid, error_messages)} in input order
+    """
+    str_paths = [str(p) for p in paths]
+    if jobs == 1 or len(str_paths) < 2:
+        results = map(_validate_path, str_paths)
+    else:
+        workers = jobs or os.cpu_count() or 1
+        chunksize = max(1, len(str_paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_validate_path, str_paths, chunksize=chunksize))
+    return {path: (is_valid, errors) for path, is_valid, errors in results}
 
 def main():
-    """CLI for validating widget JSON files."""
+    """CLI for validating widget JSON files (single file, many files or run output trees)."""
+    import argparse
     import sys
     
-    if len(sys.argv) != 2:
-        print("Usage: python validate_agent_2a_widgets.py <json-file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Validate Agent 2a widget JSON files")
+    parser.add_argument("paths", nargs="+", help="JSON files and/or directories of run outputs")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--all-json", action="store_true",
+                        help="In directories, validate every JSON file, not only Agent 2a outputs")
+    parser.add_argument("--quiet", action="store_true", help="Only print invalid files and the summary")
+    args = parser.parse_args()
     
-    file_path = Path(sys.argv[1])
-    if not file_path.exists():
-        print(f"Error: File {file_path} does not exist")
+    targets = [Path(p) for p in args.paths]
+    missing = [t for t in targets if not t.exists()]
+    if missing:
+        for target in missing:
+            print(f"Error: File {target} does not exist")
         sys.exit(1)
     
-    is_valid, errors = validate_file(file_path)
-    
-    if is_valid:
-        print("✓ JSON is valid")
-        sys.exit(0)
-    else:
+    # Single file: keep the detailed one-file output
+    if len(targets) == 1 and targets[0].is_file():
+        is_valid, errors = validate_file(targets[0])
+        if is_valid:
+            print("✓ JSON is valid")
+            sys.exit(0)
         print("✗ JSON validation failed:")
         for error in errors:
             print(f"  - {error}")
         sys.exit(1)
+    
+    files = collect_widget_files(targets, all_json=args.all_json)
+    if not files:
+        print("No Agent 2a JSON files found")
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    results = validate_files(files, jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+    
+    invalid = 0
+    for path, (is_valid, errors) in results.items():
+        if is_valid:
+            if not args.quiet:
+                print(f"✓ {path}")
+            continue
+        invalid += 1
+        print(f"✗ {path}")
+        for error in errors:
+            print(f"  - {error}")
+    
+    print(f"\nValidated {len(results)} file(s) in {elapsed:.2f}s: {len(results) - invalid} valid, {invalid} invalid")
+    sys.exit(1 if invalid else 0)
 
 if __name__ == "__main__":
     main()
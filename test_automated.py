@@ -49,6 +49,7 @@ def run_automated_test():
         print(f"Reasoning: {test_case['reasoning']}")
         print(f"Verbosity: {test_case['verbosity']}")
         
+        run_info = {}
         try:
             # Import the appropriate runner
             if test_case['mode'] == 'without':
@@ -60,7 +61,8 @@ def run_automated_test():
                     test_case['model'], 
                     test_case['reasoning'], 
                     test_case['verbosity'],
-                    os.path.join(EXPERIMENTATION_DIR, 'output', 'automated-test')
+                    os.path.join(EXPERIMENTATION_DIR, 'output', 'automated-test'),
+                    run_info=run_info
                 )
             else:  # with orchestration
                 from runner_orchestrated import run_with_orchestration_imports
@@ -71,7 +73,8 @@ def run_automated_test():
                     test_case['model'],
                     test_case['reasoning'],
                     test_case['verbosity'],
-                    os.path.join(EXPERIMENTATION_DIR, 'output', 'automated-test')
+                    os.path.join(EXPERIMENTATION_DIR, 'output', 'automated-test'),
+                    run_info=run_info
                 )
             
             result = {
@@ -88,9 +91,8 @@ def run_automated_test():
             # Post-run validation for orchestrated mode: validate Agent 2a widgets
             if test_case['mode'] == 'with' and exit_code == 0:
                 try:
-                    # Find latest orchestrated output dir
-                    from runner_orchestrated import _find_latest_run_dir_orchestrated
-                    latest_dir = _find_latest_run_dir_orchestrated(REPO_ROOT)
+                    # Use the run directory reported by the pipeline (run-ID handoff)
+                    latest_dir = run_info.get("run_dir")
                     if latest_dir:
                         # Locate 02a output folder (best effort)
                         latest_path = Path(latest_dir)
@@ -171,5 +173,19 @@ def run_automated_test():
     return success_count == total_count
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Automated experimentation test with default values")
+    parser.add_argument("--mock-llm", default=None, metavar="URL|auto",
+                        help="Run against an OpenAI-compatible mock server instead of the real API "
+                             "('auto' starts one in-process)")
+    args = parser.parse_args()
+    if args.mock_llm:
+        from utils import configure_mock_llm
+        base_url = args.mock_llm
+        if base_url == "auto":
+            from mock_llm_server import start_mock_server
+            _, base_url = start_mock_server()
+        configure_mock_llm(base_url)
+        print(f"Using mock LLM server: {base_url}")
     success = run_automated_test()
     sys.exit(0 if success else 1)
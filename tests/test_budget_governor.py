@@ -0,0 +1,53 @@
+"""Budget governor: cost accounting, downgrades and stops."""
+from budget_governor import BudgetGovernor, combination_usage, estimates_from_budget
+
+MODEL = "gpt-5-nano"
+
+
+def _job(case, effort):
+    return {"key": f"{case}_{MODEL}_{effort}_low", "case": case,
+            "combination": {"model": MODEL, "reasoning": {"effort": effort}, "verbosity": "low"}}
+
+
+def _results(input_tokens=0, output_tokens=0, cached=False):
+    metrics = {"input_tokens": input_tokens, "output_tokens": output_tokens} if input_tokens or output_tokens else None
+    return {"orchestrated": {"exit_code": 0, "cached": cached, "metrics": metrics}}
+
+
+def test_usage_prices_tokens_and_skips_cache_restores():
+    usage = combination_usage(_results(1_000_000, 1_000_000), MODEL)
+    assert usage["cost"] == 0.05 + 0.40
+    assert combination_usage(_results(1_000_000, 0, cached=True), MODEL)["cost"] == 0
+
+
+def test_runs_without_tokens_are_charged_the_estimate():
+    assert combination_usage(_results(), MODEL)["unmeasured"] == 1
+    usage = combination_usage(_results(), MODEL, estimate={"input_tokens": 1_000_000, "output_tokens": 0})
+    assert usage["estimated"] == 1 and usage["cost"] == 0.05
+    report = {"rows": [{"case": "boiling", "stages": {"gen": {"input_tokens": 10, "output_tokens": 2},
+                                                      "aud": {"input_tokens": 5, "output_tokens": 1}}}]}
+    assert estimates_from_budget(report) == {"boiling": {"input_tokens": 15, "output_tokens": 3}}
+
+
+def test_downgrade_then_stop_under_max_cost(capsys):
+    jobs = [_job("a", "high"), _job("b", "high"), _job("c", "high")]
+    governor = BudgetGovernor(jobs, max_cost=1.0)
+    # 2M output tokens at high reasoning: $0.80 for the first combination
+    first = governor.admit(jobs[0])
+    governor.record(first, _results(0, 2_000_000), 1.0)
+    second = governor.admit(jobs[1])
+    assert second["combination"]["reasoning"]["effort"] != "high"
+    assert governor.summary()["downgraded"][0]["from"] == jobs[1]["key"]
+    governor.record(second, _results(0, 1_000_000), 1.0)
+    assert governor.admit(jobs[2]) is None
+    summary = governor.summary()
+    assert summary["skipped"] == [jobs[2]["key"]] and summary["stopped_reason"]
+
+
+def test_max_cost_applies_to_runs_without_metrics(capsys):
+    jobs = [_job("a", "low"), _job("b", "low")]
+    governor = BudgetGovernor(jobs, max_cost=0.01, estimates={"a": {"input_tokens": 1_000_000, "output_tokens": 0},
+                                                              "b": {"input_tokens": 1_000_000, "output_tokens": 0}})
+    governor.record(governor.admit(jobs[0]), _results(), 1.0)
+    assert "no token usage" in capsys.readouterr().out
+    assert governor.admit(jobs[1]) is None
@@ -0,0 +1,59 @@
+"""Reproducers for the LOM rule families of check_lucim_operation_model."""
+import json
+
+from check_lucim_operation_model import check_operation_model, main
+
+
+def _rules(report):
+    return {v["rule"].split("-", 1)[0] for v in report["data"]["non-compliant-rules"]}
+
+
+def _nested(**actor):
+    event = {"source": "System", "target": "ActUser", "preF": [], "preP": [], "postF": [{"id": "c1", "text": "ok"}]}
+    out = {"source": "ActUser", "target": "System", "preF": [], "preP": [], "postF": [{"id": "c1", "text": "ok"}]}
+    body = {"type": "ActUser", "input_events": {"ieStart": event}, "output_events": {"oeDone": out}}
+    body.update(actor)
+    return json.dumps({"actors": {"ActUser": body}})
+
+
+def test_compliant_nested_model():
+    assert check_operation_model(_nested())["data"]["verdict"] == "compliant"
+
+
+def test_fences_and_names():
+    report = check_operation_model("```json\n" + _nested(type="user") + "\n```")
+    assert _rules(report) == {"LOM0", "LOM1"}
+
+
+def test_event_names_and_counts():
+    report = check_operation_model(_nested(input_events={}, output_events={"done": {
+        "source": "ActUser", "target": "System", "preF": [], "preP": [], "postF": [{"text": "x"}]}}))
+    assert _rules(report) == {"LOM3", "LOM8"}
+
+
+def test_conditions():
+    report = check_operation_model(_nested(output_events={"oeDone": {
+        "source": "ActUser", "target": "System", "preF": [{"id": "c"}], "postF": []}}))
+    assert _rules(report) == {"LOM6", "LOM7"}
+
+
+def test_flat_events_not_owned_by_an_actor_are_reported():
+    model = {
+        "actors": {"ActUser": {"name": "ActUser", "type": "ActUser"}},
+        "input_events": {"ieStart": {"source": "System", "target": "ActUser"},
+                         "badName": {"source": "ActUser", "target": "System"},
+                         "ieGhost": {"source": "System", "target": "ActGhost"}},
+        "output_events": {"oeGo": {"source": "ActUser", "target": "System"},
+                          "oeY": {"source": "System", "target": "ActUser"}},
+    }
+    report = check_operation_model(json.dumps(model))
+    assert _rules(report) == {"LOM2", "LOM4", "LOM5"}
+    lines = {v["line"] for v in report["data"]["non-compliant-rules"]}
+    assert lines == {"input_events.badName", "input_events.ieGhost", "output_events.oeY"}
+
+
+def test_generator_failure_is_not_compliant(tmp_path):
+    path = tmp_path / "om.json"
+    path.write_text(json.dumps({"data": None, "errors": ["generation failed"]}))
+    assert _rules(check_operation_model(path.read_text())) == {"LOM0"}
+    assert main([str(path)]) == 1
@@ -0,0 +1,49 @@
+"""Reproducers for the LDR rule families of check_lucim_plantuml."""
+import os
+
+import pytest
+
+from check_lucim_plantuml import audit_shortcut, check_plantuml
+
+VALID_DIAGRAM = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "input", "input-valid-examples", "valid-example-diagram.puml")
+
+
+@pytest.fixture(scope="module")
+def diagram():
+    with open(VALID_DIAGRAM, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _rules(report):
+    return {v["rule"].split("-", 1)[0] for v in report["data"]["non-compliant-rules"]}
+
+
+def test_valid_example_is_compliant(diagram):
+    coverage = check_plantuml(diagram)["data"]["coverage"]
+    assert check_plantuml(diagram)["data"]["verdict"] == "compliant"
+    assert coverage["not_applicable"] == ["LDR21-EVENT-PARAMETER-TYPE", "LDR22-EVENT-PARAMETER-FLEX-QUOTING"]
+    assert not set(coverage["evaluated"]) & set(coverage["not_applicable"])
+
+
+def test_block_format(diagram):
+    assert "LDR0" in _rules(check_plantuml("```plantuml\n" + diagram + "\n```"))
+
+
+def test_system_declaration(diagram):
+    doubled = diagram.replace("participant System as system #E8C28A",
+                              "participant System as system #E8C28A\nparticipant System as system #E8C28A")
+    assert "LDR1" in _rules(check_plantuml(doubled))
+    assert "LDR12" in _rules(check_plantuml(diagram.replace("system #E8C28A", "system #FFFFFF")))
+
+
+def test_event_direction(diagram):
+    looped = diagram.replace("theCreator -> system : oeCreateSystemAndEnvironment",
+                             "theCreator -> theClock : oeCreateSystemAndEnvironment")
+    assert "LDR6" in _rules(check_plantuml(looped))
+
+
+def test_activation_bars(diagram):
+    report = check_plantuml(diagram.replace("activate theCreator #274364\n", "", 1))
+    assert _rules(report) & {"LDR7", "LDR20"}
+    assert audit_shortcut(diagram.replace("activate theCreator #274364\n", "", 1)) is not None
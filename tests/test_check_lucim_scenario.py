@@ -0,0 +1,54 @@
+"""Reproducers for the LSC rule families and the incremental re-check path of check_lucim_scenario."""
+from check_lucim_scenario import ScenarioChecker, check_scenario, index_operation_model
+
+FLAT_MODEL = {
+    "actors": {"ActUser": {"name": "ActUser", "type": "ActUser"}},
+    "input_events": {"ieStart": {"source": "System", "target": "ActUser"},
+                     "ieLate": {"source": "ActUser", "target": "System"}},
+    "output_events": {"oeGo": {"source": "ActUser", "target": "System"},
+                      "oeBack": {"source": "System", "target": "ActUser"}},
+}
+
+
+def _message(source, target, kind, name):
+    return {"source": source, "target": target, "event_type": f"{kind}Event", "event_name": name, "parameters": ""}
+
+
+def _scenario(*messages):
+    return {"data": {"scenario": {"messages": list(messages)}}}
+
+
+def _rules(report):
+    return {v["rule"].split("-", 1)[0] for v in report["data"]["non-compliant-rules"]}
+
+
+def test_directions_and_counts():
+    report = check_scenario(_scenario(_message("System", "System", "input", "ieStart"),
+                                      _message("u:ActUser", "System", "input", "ieStart")))
+    assert {"LSC7", "LSC9", "LSC3"} <= _rules(report)
+
+
+def test_flat_model_index_keeps_events_of_undeclared_owners():
+    index = index_operation_model(FLAT_MODEL)
+    assert index["actors"] == {"actuser": "ActUser"}
+    assert set(index["input"]) == {"iestart", "ielate"}
+    assert set(index["output"]) == {"oego", "oeback"}
+
+
+def test_names_against_flat_model_with_incremental_recheck():
+    checker = ScenarioChecker(FLAT_MODEL)
+    messages = [_message("System", "u:ActUser", "input", "ieStart"),
+                _message("System", "u:ActUser", "input", "ieLate"),
+                _message("u:ActUser", "System", "output", "oeBack")]
+    assert checker.check(_scenario(*messages))["data"]["verdict"] == "compliant"
+    assert checker.last_stats == {"messages": 3, "checked": 3, "reused": 0}
+
+    messages[2] = _message("u:ActUser", "System", "output", "oego")
+    report = checker.check(_scenario(*messages))
+    assert _rules(report) == {"LSC15"}
+    assert checker.last_stats == {"messages": 3, "checked": 1, "reused": 2}
+
+    messages[1] = _message("u:ActGhost", "System", "output", "oeNothing")
+    report = checker.check(_scenario(*messages))
+    assert _rules(report) == {"LSC12", "LSC15", "LSC16", "LSC17"}
+    assert checker.last_stats["checked"] == 1
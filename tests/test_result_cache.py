@@ -0,0 +1,61 @@
+"""Result cache: key sensitivity, restore and LRU eviction."""
+import itertools
+import os
+
+import result_cache
+from result_cache import ResultCache, compute_cache_key
+
+
+def _inputs(root):
+    persona_dir, netlogo_dir, examples_dir = (root / "persona", root / "netlogo", root / "examples")
+    (persona_dir / "p1").mkdir(parents=True)
+    netlogo_dir.mkdir()
+    examples_dir.mkdir()
+    (persona_dir / "p1" / "agent.md").write_text("persona")
+    (netlogo_dir / "boiling-netlogo-code.md").write_text("to go end")
+    (netlogo_dir / "other-netlogo-code.md").write_text("to setup end")
+    (examples_dir / "example.puml").write_text("@startuml\n@enduml")
+    return str(persona_dir), str(netlogo_dir), str(examples_dir)
+
+
+def _key(dirs, **overrides):
+    params = dict(persona="p1", case="boiling", model="m", reasoning="low", verbosity="low",
+                  max_audit="3", pipeline="orchestrated")
+    params.update(overrides)
+    return compute_cache_key(*dirs, **params)
+
+
+def test_key_depends_on_inputs_and_parameters(tmp_path):
+    dirs = _inputs(tmp_path)
+    key = _key(dirs)
+    assert _key(dirs) == key
+    assert _key(dirs, reasoning="high") != key
+    assert _key(dirs, pipeline="single_agent") != key
+    assert _key(dirs, extra={"image_max_side": 512}) != key
+    (tmp_path / "netlogo" / "other-netlogo-code.md").write_text("to setup clear-all end")
+    assert _key(dirs) == key  # other cases do not matter
+    (tmp_path / "netlogo" / "boiling-netlogo-code.md").write_text("to go tick end")
+    assert _key(dirs) != key
+
+
+def _outputs(root, name, size):
+    path = root / name
+    path.mkdir()
+    (path / "out.txt").write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_restore_and_lru_eviction(tmp_path, monkeypatch):
+    clock = itertools.count(1000)
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(clock))
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=2500)
+    cache.store("a", _outputs(tmp_path, "a", 1000))
+    cache.store("b", _outputs(tmp_path, "b", 1000))
+    target = tmp_path / "restored"
+    assert cache.restore("a", str(target))  # a is now more recently used than b
+    assert (target / "out.txt").read_bytes() == b"x" * 1000
+
+    cache.store("c", _outputs(tmp_path, "c", 1000))
+    assert sorted(os.listdir(tmp_path / "cache")) == ["a", "c"]
+    assert not cache.restore("b", str(tmp_path / "missing"))
+    assert not ResultCache(str(tmp_path / "cache"), read=False).restore("a", str(target))
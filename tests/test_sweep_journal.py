@@ -0,0 +1,54 @@
+"""Checkpoint journal: resume after a crash in the middle of a combination."""
+import main
+from budget_governor import BudgetGovernor
+from sweep_journal import SweepJournal, load_journal
+
+
+def _job(key):
+    return {"key": key, "case": "boiling",
+            "combination": {"model": "gpt-5-nano", "reasoning": {"effort": "low"}, "verbosity": "low"}}
+
+
+def _ok(case="boiling"):
+    return {"orchestrated": {"exit_code": 0, "case": case}}
+
+
+def test_running_combination_of_a_crashed_process_is_failed_on_resume(tmp_path):
+    path = str(tmp_path / "sweep_journal.jsonl")
+    journal = SweepJournal(path)
+    journal.record_setup({"mode": "with"})
+    a, b, c = _job("a"), _job("b"), _job("c")
+    for job in (a, b, c):
+        journal.pending(job)
+    journal.running(a)
+    journal.finished(a, "a", _ok())
+    journal.running(b)
+    with open(path, "a") as f:
+        f.write('{"event": "done", "key": "b", "res')  # killed while writing
+
+    resumed = SweepJournal(path)
+    assert set(resumed.completed()) == {"a"}
+    record = load_journal(path)["jobs"]["b"]
+    assert record["event"] == "failed" and record["error"] == "interrupted while running"
+    assert record["case"] == "boiling"
+    assert load_journal(path)["jobs"]["c"]["event"] == "pending"
+    assert resumed.replayed["setup"] == {"mode": "with"}
+
+
+def test_exception_during_a_combination_is_journaled(tmp_path, monkeypatch):
+    journal = SweepJournal(str(tmp_path / "sweep_journal.jsonl"))
+    job = _job("a")
+    journal.pending(job)
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(main, "_run_combination", crash)
+    result = main._run_governed(job, BudgetGovernor([job]), "with", "persona", str(tmp_path), None, None,
+                                echo=False, journal=journal)
+    assert result == {"orchestrated": {"exit_code": 1, "case": "boiling", "model": "gpt-5-nano",
+                                       "reasoning": {"effort": "low"}, "verbosity": "low", "cached": False,
+                                       "crashed": True, "error": "RuntimeError: disk full"}}
+    record = load_journal(journal.path)["jobs"]["a"]
+    assert record["event"] == "failed" and record["error"] == "RuntimeError: disk full"
+    assert SweepJournal(journal.path).completed() == {}
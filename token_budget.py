@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Prompt-size budget report per stage, computed offline before a sweep.
+
+For every persona set and NetLogo case in input/ (and the interface image
+settings), estimates the input tokens of each pipeline stage: the compiled
+persona prefix (persona_bundle.py) plus the stage's case inputs (NetLogo
+code, interface images) and the artifacts it receives from earlier stages.
+Generated artifacts cannot be known in advance; they are sized from the
+valid examples in input/input-valid-examples/ where one exists, else from
+ARTIFACT_TOKENS. Generators are sized for a correction iteration (previous
+artifact + audit report), their largest prompt.
+
+Each cell is flagged when it exceeds the context budget or when its estimated
+latency (input tokens / prefill rate + expected output tokens / decode rate)
+exceeds the latency budget.
+
+Usage:
+    python token_budget.py --context-budget 100000 --max-latency 120 [--json report.json]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from persona_bundle import PERSONA_DIR, compile_bundle
+from token_estimator import estimate_tokens, estimator_name, image_tokens, png_size
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NETLOGO_DIR = os.path.join(BASE_DIR, "input", "input-netlogo")
+VALID_EXAMPLES_DIR = os.path.join(BASE_DIR, "input", "input-valid-examples")
+
+IMAGE_ANALYZER_STAGE = "netlogo_interface_image_analyzer"
+# Case and artifact inputs of each stage, in pipeline order
+STAGE_INPUTS = {
+    IMAGE_ANALYZER_STAGE: ["images", "widgets_example"],
+    "lucim_operation_model_generator": ["code", "widgets", "operation_model", "audit_report"],
+    "lucim_operation_model_auditor": ["code", "widgets", "operation_model"],
+    "lucim_scenario_generator": ["operation_model", "scenario", "audit_report"],
+    "lucim_scenario_auditor": ["operation_model", "scenario"],
+    "lucim_plantuml_diagram_generator": ["scenario", "diagram", "audit_report"],
+    "lucim_plantuml_diagram_auditor": ["scenario", "diagram"],
+}
+# Expected output artifact of each stage (auditors emit an audit report)
+STAGE_OUTPUTS = {
+    IMAGE_ANALYZER_STAGE: "widgets",
+    "lucim_operation_model_generator": "operation_model",
+    "lucim_scenario_generator": "scenario",
+    "lucim_plantuml_diagram_generator": "diagram",
+}
+# Fallback artifact sizes in tokens when no valid example exists
+ARTIFACT_TOKENS = {
+    "widgets": 600,
+    "operation_model": 4000,
+    "scenario": 2500,
+    "diagram": 1500,
+    "audit_report": 1200,
+}
+ARTIFACT_EXAMPLES = {
+    "widgets": "agent_2a_widget_examples.json",
+    "diagram": "valid-example-diagram.puml",
+}
+
+DEFAULT_CONTEXT_BUDGET = 128000
+DEFAULT_MAX_LATENCY = 180.0
+DEFAULT_PREFILL_TPS = 5000.0
+DEFAULT_DECODE_TPS = 60.0
+
+
+def list_cases(netlogo_dir: str = NETLOGO_DIR) -> List[str]:
+    return sorted(os.path.basename(path)[:-len("-netlogo-code.md")]
+                  for path in glob.glob(os.path.join(netlogo_dir, "*-netlogo-code.md")))
+
+
+def list_persona_sets(persona_dir: str = PERSONA_DIR) -> List[str]:
+    return sorted(name for name in os.listdir(persona_dir) if os.path.isdir(os.path.join(persona_dir, name)))
+
+
+def _file_tokens(path: str) -> int:
+    with open(path, "r", encoding="utf-8") as f:
+        return estimate_tokens(f.read())
+
+
+def artifact_tokens(valid_examples_dir: str = VALID_EXAMPLES_DIR) -> Dict[str, int]:
+    """Expected tokens of each generated artifact: valid example size when available, else ARTIFACT_TOKENS."""
+    sizes = dict(ARTIFACT_TOKENS)
+    for artifact, filename in ARTIFACT_EXAMPLES.items():
+        path = os.path.join(valid_examples_dir, filename)
+        if os.path.exists(path):
+            tokens = _file_tokens(path)
+            if artifact == "widgets":
+                # The examples file holds the example list once; a case lists its own widgets
+                sizes["widgets_example"] = tokens
+            else:
+                sizes[artifact] = tokens
+    sizes.setdefault("widgets_example", sizes["widgets"])
+    return sizes
+
+
+def case_inputs(case: str, netlogo_dir: str = NETLOGO_DIR, image_max_side: int = 0) -> Dict[str, Any]:
+    """Token sizes of a case's inputs: {"code", "images", "image_sizes"}."""
+    code_tokens = _file_tokens(os.path.join(netlogo_dir, f"{case}-netlogo-code.md"))
+    images = 0
+    sizes = []
+    for path in sorted(glob.glob(os.path.join(netlogo_dir, f"{glob.escape(case)}-netlogo-interface-*.png"))):
+        size = png_size(path)
+        if size:
+            sizes.append(size)
+            images += image_tokens(size[0], size[1], image_max_side)
+    return {"code": code_tokens, "images": images, "image_sizes": sizes}
+
+
+def budget_matrix(persona_sets: Optional[List[str]] = None, cases: Optional[List[str]] = None,
+                  image_max_side: int = 0, context_budget: int = DEFAULT_CONTEXT_BUDGET,
+                  max_latency: float = DEFAULT_MAX_LATENCY, prefill_tps: float = DEFAULT_PREFILL_TPS,
+                  decode_tps: float = DEFAULT_DECODE_TPS, persona_dir: str = PERSONA_DIR,
+                  netlogo_dir: str = NETLOGO_DIR) -> Dict[str, Any]:
+    """
+    Estimate stage prompt sizes for every persona set x case.
+
+    Returns:
+        {"stages": [...], "rows": [{"persona", "case", "stages": {stage: {"input_tokens",
+          "output_tokens", "latency", "over_context", "over_latency"}}}],
+         "flagged": [{"persona", "case", "stage", "reason"}], "settings": {...}}
+    """
+    persona_sets = persona_sets or list_persona_sets(persona_dir)
+    cases = cases or list_cases(netlogo_dir)
+    artifacts = artifact_tokens()
+    stages = list(STAGE_INPUTS)
+    rows = []
+    flagged = []
+    case_sizes = {case: case_inputs(case, netlogo_dir, image_max_side) for case in cases}
+    for persona in persona_sets:
+        agents = compile_bundle(persona, persona_dir)["agents"]
+        for case in cases:
+            sizes = dict(artifacts, **case_sizes[case])
+            row = {"persona": persona, "case": case, "stages": {}}
+            for stage in stages:
+                if stage != IMAGE_ANALYZER_STAGE and stage not in agents:
+                    continue
+                prefix = agents[stage]["tokens"] if stage in agents else 0
+                input_tokens = prefix + sum(sizes[name] for name in STAGE_INPUTS[stage])
+                output_tokens = sizes[STAGE_OUTPUTS.get(stage, "audit_report")]
+                latency = input_tokens / prefill_tps + output_tokens / decode_tps
+                cell = {"input_tokens": input_tokens, "output_tokens": output_tokens, "latency": latency,
+                        "over_context": input_tokens + output_tokens > context_budget,
+                        "over_latency": latency > max_latency}
+                row["stages"][stage] = cell
+                if cell["over_context"]:
+                    flagged.append({"persona": persona, "case": case, "stage": stage,
+                                    "reason": f"{input_tokens + output_tokens} tokens > {context_budget}"})
+                if cell["over_latency"]:
+                    flagged.append({"persona": persona, "case": case, "stage": stage,
+                                    "reason": f"~{latency:.0f}s > {max_latency:.0f}s"})
+            rows.append(row)
+    return {
+        "stages": stages,
+        "rows": rows,
+        "flagged": flagged,
+        "settings": {"estimator": estimator_name(), "image_max_side": image_max_side,
+                     "context_budget": context_budget, "max_latency": max_latency,
+                     "prefill_tps": prefill_tps, "decode_tps": decode_tps, "artifact_tokens": artifacts},
+    }
+
+
+def _short_stage(stage: str) -> str:
+    """'lucim_operation_model_generator' -> 'om-gen'"""
+    abbreviations = {"netlogo_interface_image_analyzer": "image", "lucim_operation_model": "om",
+                     "lucim_scenario": "scen", "lucim_plantuml_diagram": "puml"}
+    for prefix, short in abbreviations.items():
+        if stage.startswith(prefix):
+            role = stage[len(prefix):].strip("_")
+            return f"{short}-{role[:3]}" if role else short
+    return stage[:8]
+
+
+def print_matrix(report: Dict[str, Any]) -> None:
+    settings = report["settings"]
+    print(f"Estimated input tokens per stage ({settings['estimator']}; * = over context "
+          f"{settings['context_budget']}, ! = over {settings['max_latency']:.0f}s)")
+    stages = report["stages"]
+    print(f"{'persona':<28} {'case':<22}" + "".join(f" {_short_stage(s):>9}" for s in stages) + f" {'total':>9}")
+    for row in report["rows"]:
+        line = f"{row['persona'][:28]:<28} {row['case'][:22]:<22}"
+        for stage in stages:
+            cell = row["stages"].get(stage)
+            if cell is None:
+                line += f" {'-':>9}"
+                continue
+            mark = ("*" if cell["over_context"] else "") + ("!" if cell["over_latency"] else "")
+            line += f" {str(cell['input_tokens']) + mark:>9}"
+        line += f" {sum(c['input_tokens'] for c in row['stages'].values()):>9}"
+        print(line)
+    if report["flagged"]:
+        print(f"\n{len(report['flagged'])} stage(s) over budget:")
+        for flag in report["flagged"]:
+            print(f"  {flag['persona']} / {flag['case']} / {flag['stage']}: {flag['reason']}")
+    else:
+        print("\nAll combinations are within budget")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline prompt-size budget report per stage")
+    parser.add_argument("--persona", action="append", default=None, help="Persona set (repeatable, default: all)")
+    parser.add_argument("--case", action="append", default=None, help="NetLogo case (repeatable, default: all)")
+    parser.add_argument("--image-max-side", type=int, default=0,
+                        help="Size interface images as downscaled to this many pixels (see image_preprocess.py)")
+    parser.add_argument("--context-budget", type=int, default=DEFAULT_CONTEXT_BUDGET,
+                        help="Maximum input + output tokens per call")
+    parser.add_argument("--max-latency", type=float, default=DEFAULT_MAX_LATENCY,
+                        help="Maximum estimated seconds per call")
+    parser.add_argument("--prefill-tps", type=float, default=DEFAULT_PREFILL_TPS,
+                        help="Assumed input tokens processed per second")
+    parser.add_argument("--decode-tps", type=float, default=DEFAULT_DECODE_TPS,
+                        help="Assumed output tokens generated per second")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = budget_matrix(args.persona, args.case, args.image_max_side, args.context_budget,
+                           args.max_latency, args.prefill_tps, args.decode_tps)
+    print_matrix(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 1 if report["flagged"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Offline token estimates for prompts and interface images.
+
+estimate_tokens() uses tiktoken's o200k_base encoding when tiktoken is
+installed and its vocabulary is already cached locally (tiktoken downloads
+vocabularies on first use, which is not possible offline). Otherwise it
+applies a pre-tokenization heuristic modeled on BPE tokenizers: letter runs
+cost about one token per 6 letters, digit runs one per 3 digits, punctuation
+one per 2 characters and line breaks one each. The heuristic deliberately
+errs on the high side, e.g. for numeric tables in NetLogo code where a plain
+characters/4 estimate undercounts by half.
+
+image_tokens() follows the OpenAI tile accounting for high-detail images.
+"""
+import math
+import re
+import struct
+from typing import Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+ENCODING_NAME = "o200k_base"
+# High-detail image accounting: fit in 2048x2048, shortest side scaled to 768, 512px tiles
+IMAGE_BASE_TOKENS = 85
+IMAGE_TILE_TOKENS = 170
+IMAGE_TILE_SIZE = 512
+
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|\s+|[^\w\s]+|_+")
+
+_encoding = None
+_encoding_failed = False
+
+
+def _load_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding(ENCODING_NAME)
+        except Exception:
+            # Vocabulary not cached and no network: use the heuristic from now on
+            _encoding_failed = True
+    return _encoding
+
+
+def estimator_name() -> str:
+    return f"tiktoken {ENCODING_NAME}" if _load_encoding() is not None else "heuristic"
+
+
+def heuristic_tokens(text: str) -> int:
+    """Pre-tokenization estimate of the token count of text (no vocabulary needed)."""
+    count = 0
+    for match in _PIECE_RE.finditer(text):
+        piece = match.group(0)
+        first = piece[0]
+        if first.isspace():
+            count += piece.count("\n") if "\n" in piece else 0
+        elif first.isdigit():
+            count += (len(piece) + 2) // 3
+        elif first.isalpha():
+            count += (len(piece) + 5) // 6
+        else:
+            count += (len(piece) + 1) // 2
+    return count
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of text: exact with a locally available tiktoken vocabulary, else heuristic_tokens()."""
+    encoding = _load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return heuristic_tokens(text)
+
+
+def png_size(path: str) -> Optional[Tuple[int, int]]:
+    """(width, height) from a PNG header, or None when path is not a PNG."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+
+def image_tokens(width: int, height: int, max_side: int = 0) -> int:
+    """
+    Input tokens of a high-detail image.
+
+    Args:
+        width, height: Image size in pixels
+        max_side: Downscaling applied before sending (image_preprocess.py), 0 for none
+    """
+    if max_side and max(width, height) > max_side:
+        scale = max_side / max(width, height)
+        width, height = max(1, int(width * scale)), max(1, int(height * scale))
+    if max(width, height) > 2048:
+        scale = 2048 / max(width, height)
+        width, height = width * scale, height * scale
+    if min(width, height) > 768:
+        scale = 768 / min(width, height)
+        width, height = width * scale, height * scale
+    tiles = math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE)
+    return IMAGE_BASE_TOKENS + IMAGE_TILE_TOKENS * tiles
@@ -1,22 +1,219 @@
+import glob
+import hashlib
+import json
 import os
 import shutil
-from typing import Optional
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, TextIO
 
+# Serializes console output of pipelines running side by side
+_PRINT_LOCK = threading.Lock()
 
-def copy_output_files_to_experimentation(source_dir: str, target_dir: str, mode: str) -> None:
+
+def combination_dir_name(case: Optional[str], model: Optional[str], reasoning: Optional[str], verbosity: Optional[str]) -> Optional[str]:
+    """Folder name of one parameter combination, or None when a parameter is missing.
+
+    Order: case study model name, ai model name, reasoning, verbosity level.
     """
-    Copy all generated output files from orchestration/single-agent to experimentation output folder.
+    if case and model and reasoning and verbosity:
+        return f"{case}-{model}-reason-{reasoning}-verb-{verbosity}"
+    return None
+
+
+def combination_output_dir(target_dir: str, mode: str, case: Optional[str] = None, model: Optional[str] = None,
+                           reasoning: Optional[str] = None, verbosity: Optional[str] = None) -> str:
+    """Return <target_dir>/<mode>_output[/<combination>] so that each combination gets its own folder."""
+    param_dir = combination_dir_name(case, model, reasoning, verbosity)
+    if param_dir:
+        return os.path.join(target_dir, f"{mode}_output", param_dir)
+    return os.path.join(target_dir, f"{mode}_output")
+
+
+# Run-ID handoff between a runner and the child pipeline it spawns.
+# The runner exports a unique run ID and the path of a handoff file; the child
+# writes {"run_id": ..., "run_dir": ...} there once its run directory is known.
+RUN_ID_ENV = "EXPERIMENT_RUN_ID"
+RUN_HANDOFF_ENV = "EXPERIMENT_RUN_HANDOFF"
+RUN_HANDOFF_FILE = "run_handoff.json"
+
+
+def new_run_id(mode: str) -> str:
+    """Unique run identifier, e.g. single_agent-20250101-120000-1a2b3c4d"""
+    return f"{mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def prepare_run_handoff(env: Dict[str, str], run_id: str, handoff_file: str) -> None:
+    """Export the run ID and handoff path to the child environment, clearing any stale handoff."""
+    try:
+        os.remove(handoff_file)
+    except FileNotFoundError:
+        pass
+    env[RUN_ID_ENV] = run_id
+    env[RUN_HANDOFF_ENV] = handoff_file
+
+
+def read_run_handoff(handoff_file: str, run_id: str) -> Optional[str]:
+    """
+    Return the run directory reported by the child pipeline, or None.
+
+    The handoff may be JSON ({"run_id", "run_dir"}) or a plain path. A JSON
+    handoff whose run_id does not match is ignored.
+    """
+    try:
+        with open(handoff_file, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+    except OSError:
+        return None
+    try:
+        payload = json.loads(content)
+    except ValueError:
+        payload = {"run_dir": content}
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("run_id") not in (None, run_id):
+        return None
+    run_dir = payload.get("run_dir")
+    if run_dir and os.path.isdir(run_dir):
+        return run_dir
+    return None
+
+
+def list_run_dirs(runs_root: str, depth: int) -> Set[str]:
+    """Run directories depth levels below runs_root (e.g. 3 for runs/<date>/<persona>/<combo>)."""
+    return {path for path in glob.glob(os.path.join(runs_root, *(["*"] * depth))) if os.path.isdir(path)}
+
+
+def pick_new_run_dir(before: Set[str], after: Set[str], hints: List[Optional[str]]) -> Optional[str]:
+    """
+    The run directory that appeared while a run was going on, when that is unambiguous.
+
+    A pipeline that does not write the handoff still creates its run directory
+    during the run, so comparing snapshots taken before and after the run finds
+    it. When concurrent runs also created directories, only a single new
+    directory whose path contains every hint (case, model, ...) is accepted.
+
+    Returns:
+        The directory, or None when none or several candidates remain
+    """
+    new = sorted(after - before)
+    if len(new) > 1:
+        hints = [hint.lower() for hint in hints if hint]
+        new = [path for path in new if all(hint in path.lower() for hint in hints)]
+    return new[0] if len(new) == 1 else None
+
+
+def configure_mock_llm(base_url: str) -> None:
+    """
+    Point both pipelines at an OpenAI-compatible mock server (see mock_llm_server.py).
+
+    Child pipelines inherit os.environ, and the OpenAI SDK honours OPENAI_BASE_URL.
+    """
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "sk-mock-offline"
+
+
+# Output collection modes: "auto" tries hardlink, then reflink, then
+# copy_file_range, then a plain copy; the explicit modes fall back to a copy.
+COLLECT_MODES = ("auto", "hardlink", "reflink", "copy")
+COLLECT_MODE_ENV = "EXPERIMENT_COLLECT_MODE"
+COLLECTION_MANIFEST_FILE = "collection_manifest.json"
+_FICLONE = 0x40049409  # Linux ioctl cloning a file's extents (btrfs, xfs, ...)
+
+
+def _reflink(source_file: str, target_file: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(source_file, "rb") as src, open(target_file, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return True
+        except OSError:
+            return False
+
+
+def _copy_file_range(source_file: str, target_file: str) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    with open(source_file, "rb") as src, open(target_file, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except OSError:
+            return False
+    return remaining == 0
+
+
+def _collect_file(source_file: str, target_file: str, link_mode: str) -> str:
+    """Place source_file at target_file and return the method used."""
+    if os.path.lexists(target_file):
+        os.remove(target_file)
+    if link_mode in ("auto", "hardlink"):
+        try:
+            os.link(source_file, target_file)
+            return "hardlink"
+        except OSError:
+            pass
+    if link_mode in ("auto", "reflink") and _reflink(source_file, target_file):
+        shutil.copystat(source_file, target_file)
+        return "reflink"
+    if link_mode != "copy" and _copy_file_range(source_file, target_file):
+        shutil.copystat(source_file, target_file)
+        return "copy_file_range"
+    shutil.copy2(source_file, target_file)
+    return "copy"
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def copy_output_files_to_experimentation(source_dir: str, target_dir: str, mode: str, case: Optional[str] = None,
+                                         model: Optional[str] = None, reasoning: Optional[str] = None,
+                                         verbosity: Optional[str] = None, link_mode: Optional[str] = None,
+                                         quiet: bool = False) -> List[Dict[str, Any]]:
+    """
+    Collect all generated output files from orchestration/single-agent into the experimentation output folder.
     
     Args:
         source_dir: Source directory where files were generated
         target_dir: Target experimentation output directory
         mode: "orchestrated" or "single_agent"
+        case, model, reasoning, verbosity: Parameter combination (selects the combination subfolder)
+        link_mode: One of COLLECT_MODES; defaults to $EXPERIMENT_COLLECT_MODE or "auto".
+            Hardlinks share data with the pipeline's run directory, which is never
+            rewritten once the run has finished.
+        quiet: Print one summary line instead of one line per file
+        
+    Returns:
+        Manifest of collected files: [{"path", "size", "sha256", "method"}], also
+        written to collection_manifest.json in the combination folder
     """
-    # Create target subdirectory for this mode
-    mode_dir = os.path.join(target_dir, f"{mode}_output")
+    link_mode = link_mode or os.environ.get(COLLECT_MODE_ENV, "auto")
+    if link_mode not in COLLECT_MODES:
+        raise ValueError(f"Invalid collection mode '{link_mode}', expected one of {COLLECT_MODES}")
+    
+    # Create target subdirectory for this mode with parameter-specific naming
+    mode_dir = combination_output_dir(target_dir, mode, case, model, reasoning, verbosity)
     os.makedirs(mode_dir, exist_ok=True)
     
-    # Copy all files from source to target
+    manifest = []
+    start = time.perf_counter()
+    # Collect all files from source to target
     if os.path.exists(source_dir):
         for root, dirs, files in os.walk(source_dir):
             for file in files:
@@ -28,8 +225,179 @@ def copy_output_files_to_experimentation(source_dir: str, target_dir: str, mode:
                 # Create target directory if needed
                 os.makedirs(os.path.dirname(target_file), exist_ok=True)
                 
-                # Copy file
-                shutil.copy2(source_file, target_file)
-                print(f"Copied: {rel_path} -> {target_file}")
+                method = _collect_file(source_file, target_file, link_mode)
+                manifest.append({
+                    "path": rel_path.replace(os.sep, "/"),
+                    "size": os.path.getsize(target_file),
+                    "sha256": _sha256_file(target_file),
+                    "method": method
+                })
+                if not quiet:
+                    print(f"Collected ({method}): {rel_path} -> {target_file}")
+    
+    with open(os.path.join(mode_dir, COLLECTION_MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    
+    if quiet:
+        methods = {}
+        for item in manifest:
+            methods[item["method"]] = methods.get(item["method"], 0) + 1
+        method_summary = ", ".join(f"{name}: {count}" for name, count in sorted(methods.items())) or "none"
+        total_bytes = sum(item["size"] for item in manifest)
+        print(f"Collected {len(manifest)} file(s), {total_bytes} bytes -> {mode_dir} "
+              f"[{method_summary}] in {time.perf_counter() - start:.2f}s")
+    return manifest
+
+
+# Watchdog limits for pipeline subprocesses in seconds (unset or 0 = no limit):
+# whole run, one stage (no new stage metrics record), and no new output line.
+RUN_TIMEOUT_ENV = "EXPERIMENT_RUN_TIMEOUT"
+STAGE_TIMEOUT_ENV = "EXPERIMENT_STAGE_TIMEOUT"
+IDLE_TIMEOUT_ENV = "EXPERIMENT_IDLE_TIMEOUT"
+WATCHDOG_EXIT_CODE = 124  # Exit code reported for a run stopped by the watchdog, as timeout(1)
+WATCHDOG_POLL_INTERVAL = 1.0
+KILL_GRACE_PERIOD = 10.0  # Seconds between SIGTERM and SIGKILL
+
+
+def watchdog_limits(env: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """{"run", "stage", "idle"} limits in seconds from the environment; 0 disables a limit."""
+    env = os.environ if env is None else env
+    limits = {}
+    for name, variable in (("run", RUN_TIMEOUT_ENV), ("stage", STAGE_TIMEOUT_ENV), ("idle", IDLE_TIMEOUT_ENV)):
+        try:
+            limits[name] = max(0.0, float(env.get(variable) or 0))
+        except ValueError:
+            limits[name] = 0.0
+    return limits
+
 
+def _file_size(path: Optional[str]) -> int:
+    try:
+        return os.path.getsize(path) if path else -1
+    except OSError:
+        return -1
 
+
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    """Terminate the process and everything it spawned; SIGKILL after KILL_GRACE_PERIOD."""
+    for sig in (signal.SIGTERM, getattr(signal, "SIGKILL", signal.SIGTERM)):
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, sig)
+            elif sig == signal.SIGTERM:
+                proc.terminate()
+            else:
+                proc.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            proc.wait(timeout=KILL_GRACE_PERIOD)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+    proc.wait()
+
+
+def _pump_output(stream: TextIO, logf: TextIO, prefix: str, echo: bool,
+                 activity: Optional[List[float]] = None) -> None:
+    """Copy child output line by line to the log file (and the console when echo is set)."""
+    for line in iter(stream.readline, ""):
+        if activity is not None:
+            activity[0] = time.monotonic()
+        logf.write(line)
+        logf.flush()
+        if echo:
+            with _PRINT_LOCK:
+                print(f"{prefix} {line}", end="", flush=True)
+    stream.close()
+
+
+def run_logged_subprocess(cmd: List[str], cwd: str, env: Dict[str, str], log_file: str, prefix: str, echo: bool = True,
+                          timings: Optional[Dict[str, float]] = None,
+                          watchdog: Optional[Dict[str, Any]] = None, stage_file: Optional[str] = None) -> int:
+    """
+    Run a pipeline subprocess, streaming its merged stdout/stderr to log_file.
+
+    Output is drained by a reader thread so that several pipelines can run side
+    by side from different threads; console lines carry the prefix and are
+    never interleaved mid-line. When timings is given, "spawn" (Popen) and
+    "pipeline" (spawn to exit) durations in seconds are recorded into it.
+
+    The child runs in its own process group under the watchdog_limits() of env:
+    when the run exceeds the run limit, a stage exceeds the stage limit (no
+    growth of stage_file, the metrics sidecar) or no output line arrives within
+    the idle limit, the whole group is killed and WATCHDOG_EXIT_CODE returned.
+    watchdog, when given, receives {"reason", "limit", "elapsed"} in that case.
+
+    Returns:
+        The process exit code
+    """
+    limits = watchdog_limits(env)
+    with open(log_file, "w", encoding="utf-8") as logf:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env,
+                                text=True, bufsize=1, start_new_session=hasattr(os, "killpg"))
+        spawned = time.perf_counter()
+        activity = [time.monotonic()]
+        reader = threading.Thread(target=_pump_output, args=(proc.stdout, logf, prefix, echo, activity), daemon=True)
+        reader.start()
+        timed_out = None
+        stage_size, stage_start = _file_size(stage_file), time.monotonic()
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=WATCHDOG_POLL_INTERVAL if any(limits.values()) else None)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                now = time.monotonic()
+                size = _file_size(stage_file)
+                if size != stage_size:
+                    stage_size, stage_start = size, now
+                for reason, elapsed in (("run", time.perf_counter() - spawned), ("stage", now - stage_start),
+                                        ("idle", now - activity[0])):
+                    if limits[reason] and elapsed > limits[reason]:
+                        timed_out = {"reason": reason, "limit": limits[reason], "elapsed": round(elapsed, 1)}
+                        break
+                if timed_out:
+                    _kill_process_group(proc)
+                    break
+        except BaseException:
+            # Ctrl-C does not reach a child in its own session
+            _kill_process_group(proc)
+            raise
+        reader.join(KILL_GRACE_PERIOD if timed_out else None)
+        if timed_out:
+            message = (f"[WATCHDOG] Killed after {timed_out['elapsed']:.0f}s: {timed_out['reason']} limit "
+                       f"of {timed_out['limit']:.0f}s exceeded")
+            logf.write(message + "\n")
+            with _PRINT_LOCK:
+                print(f"{prefix} {message}", flush=True)
+            if watchdog is not None:
+                watchdog.update(timed_out)
+        if timings is not None:
+            timings["spawn"] = spawned - start
+            timings["pipeline"] = time.perf_counter() - spawned
+    return WATCHDOG_EXIT_CODE if timed_out else proc.returncode
+
+
+def salvage_partial_outputs(handoff_file: str, run_id: str, target_dir: str, mode: str, case: Optional[str] = None,
+                            model: Optional[str] = None, reasoning: Optional[str] = None,
+                            verbosity: Optional[str] = None, quiet: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """
+    Collect what a killed run produced into its combination folder.
+
+    Only the run directory reported through the handoff is trusted: after a
+    timeout the newest directory may well belong to another run.
+
+    Returns:
+        The collection manifest, or None when the run never reported its directory
+    """
+    run_dir = read_run_handoff(handoff_file, run_id)
+    if not run_dir:
+        print(f"No run directory reported by {mode} run {run_id}; nothing to salvage")
+        return None
+    manifest = copy_output_files_to_experimentation(run_dir, target_dir, mode, case, model, reasoning, verbosity,
+                                                    quiet=quiet)
+    print(f"Salvaged {len(manifest)} partial output file(s) of {mode} run {run_id}")
+    return manifest